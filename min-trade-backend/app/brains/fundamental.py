@@ -27,11 +27,15 @@ La logique est prete, il suffit de brancher les vraies donnees pour debloquer
 toute la puissance du scoring.
 """
 
-from typing import List, Optional, Tuple
+from typing import List, NamedTuple, Optional, Tuple
+from dataclasses import dataclass
 from datetime import datetime
+import heapq
 import logging
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from ..models.fund import (
     Fund, FundMetrics, FundData, AssetClass, InvestmentHorizon,
     Priority, BrainFundScore, BrainOutput as LegacyBrainOutput
@@ -39,6 +43,95 @@ from ..models.fund import (
 from ..models.brain import (
     BrainOutput, FundScoreEntry, BrainType, BrainRole, BrainHorizon
 )
+from ..data.columns import FundColumns, ASSET_CLASSES
+from .score_cache import ScoreCache, score_cache as default_score_cache
+
+
+# Priority codes used in UniverseScores.priority
+PRIORITY_ORDER = [Priority.HIGH, Priority.MEDIUM, Priority.LOW]
+
+
+def _py_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    Vectorized Python round(). np.round scales by 10**ndigits in floating point,
+    which can tip values sitting next to a .5 tie the other way, so those few
+    are re-rounded with round() to stay bit-for-bit with the scalar code.
+    """
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    with np.errstate(invalid="ignore"):
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-6 * np.maximum(1.0, np.abs(scaled))
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+@dataclass(frozen=True)
+class UniverseScores:
+    """
+    Scores for every row of a FundColumns table (row i == fund i).
+    Reasoning strings are generated on demand for the rows actually returned.
+    """
+    score: np.ndarray
+    quality_score: np.ndarray
+    valuation_score: np.ndarray
+    stability_score: np.ndarray
+    confidence: np.ndarray
+    priority: np.ndarray  # int8 codes into PRIORITY_ORDER
+    top_week_score: np.ndarray
+    # Unrounded components, as passed to _generate_reasoning by analyze_fund
+    quality_raw: np.ndarray
+    valuation_raw: np.ndarray
+    stability_raw: np.ndarray
+    
+    def __post_init__(self):
+        # Results are memoized and shared between requests
+        for array in vars(self).values():
+            array.flags.writeable = False
+
+
+class ScoreRecord(NamedTuple):
+    """Scores of one fund, named after the Fund score fields"""
+    fundamental_score: float
+    quality_score: float
+    valuation_score: float
+    stability_score: float
+    confidence: float
+    priority: Priority
+    reasoning: str
+    top_week_score: float
+
+
+@dataclass(frozen=True)
+class ScoredUniverse:
+    """
+    Immutable per-request result view: fund index -> ScoreRecord, layered over
+    the read-only fund columns. Scored Funds are built for the returned rows
+    only, so concurrent requests can score the same universe safely.
+    """
+    columns: FundColumns
+    scores: UniverseScores
+    brain: "CerveauFondamental"
+    
+    def record(self, i: int) -> ScoreRecord:
+        scores = self.scores
+        return ScoreRecord(
+            fundamental_score=float(scores.score[i]),
+            quality_score=float(scores.quality_score[i]),
+            valuation_score=float(scores.valuation_score[i]),
+            stability_score=float(scores.stability_score[i]),
+            confidence=float(scores.confidence[i]),
+            priority=PRIORITY_ORDER[scores.priority[i]],
+            reasoning=self.brain.reasoning_at(self.columns, scores, i),
+            top_week_score=float(scores.top_week_score[i])
+        )
+    
+    def fund(self, i: int) -> Fund:
+        """Scored Fund for row i, built for a response"""
+        return self.columns.to_fund(i, **self.record(i)._asdict())
+    
+    def funds_at(self, indices) -> List[Fund]:
+        return [self.fund(i) for i in indices]
 
 
 class AbstractBrain(ABC):
@@ -63,7 +156,8 @@ class AbstractBrain(ABC):
         brain_type: BrainType = BrainType.FUNDAMENTAL,
         version: str = "1.0.0",
         horizon: BrainHorizon = BrainHorizon.MEDIUM_TERM,
-        role: BrainRole = BrainRole.CORE
+        role: BrainRole = BrainRole.CORE,
+        score_cache: Optional[ScoreCache] = None
     ):
         self.brain_id = brain_id
         self.label = label or brain_id
@@ -71,6 +165,7 @@ class AbstractBrain(ABC):
         self.version = version
         self.horizon = horizon
         self.role = role
+        self.score_cache = score_cache or default_score_cache
         self.logger = logging.getLogger(brain_id)
     
     @abstractmethod
@@ -157,6 +252,59 @@ class CerveauFondamental(AbstractBrain):
     
     def analyze_all_funds(self, funds: List[FundData]) -> LegacyBrainOutput:
         """Analyze all funds and return BrainOutput"""
+        result = self._analyze_fund_data(funds)
+        scores = result['score'].tolist()
+        confidences = result['confidence'].tolist()
+        priorities = [PRIORITY_ORDER[code] for code in result['priority']]
+        q_scores = result['quality_raw'].tolist()
+        v_scores = result['valuation_raw'].tolist()
+        s_scores = result['stability_raw'].tolist()
+        
+        fund_scores = [
+            BrainFundScore(
+                fund_id=fund.fund_id,
+                score=scores[i],
+                confidence=confidences[i],
+                reasoning=self._generate_reasoning(fund, q_scores[i], v_scores[i], s_scores[i], priorities[i]),
+                priority=priorities[i],
+                quality_score=round(q_scores[i], 2),
+                valuation_score=round(v_scores[i], 2),
+                stability_score=round(s_scores[i], 2)
+            )
+            for i, fund in enumerate(funds)
+        ]
+        
+        return LegacyBrainOutput(
+            brain_id=self.brain_id,
+            timestamp=datetime.utcnow().isoformat(),
+            fund_scores=fund_scores
+        )
+    
+    def analyze_all_funds_modular(self, funds: List[FundData]) -> BrainOutput:
+        """
+        Standardized BrainOutput for Tronc Commun, scored in batch.
+        Skips the reasoning text, which the Tronc Commun does not use.
+        """
+        result = self._analyze_fund_data(funds)
+        
+        fund_scores = [
+            FundScoreEntry(fund_id=fund.fund_id, score=score, confidence=confidence)
+            for fund, score, confidence in zip(funds, result['score'].tolist(), result['confidence'].tolist())
+        ]
+        
+        return BrainOutput(
+            brain_id=self.brain_id,
+            label=self.label,
+            brain_type=self.brain_type,
+            version=self.version,
+            horizon=self.horizon,
+            role=self.role,
+            timestamp=datetime.utcnow().isoformat(),
+            fund_scores=fund_scores
+        )
+    
+    def _analyze_fund_data(self, funds: List[FundData]) -> dict:
+        """Batch-score a list of FundData with _score_arrays"""
         # Calculate median expense ratio for priority determination
         expense_ratios = [f.expense_ratio for f in funds if f.expense_ratio is not None]
         if expense_ratios:
@@ -164,12 +312,24 @@ class CerveauFondamental(AbstractBrain):
             mid = len(expense_ratios) // 2
             self._median_expense_ratio = expense_ratios[mid]
         
-        fund_scores = [self.analyze_fund(fund) for fund in funds]
+        def column(field: str) -> np.ndarray:
+            return np.array(
+                [np.nan if (v := getattr(f, field)) is None else v for f in funds],
+                dtype=np.float64
+            )
         
-        return LegacyBrainOutput(
-            brain_id=self.brain_id,
-            timestamp=datetime.utcnow().isoformat(),
-            fund_scores=fund_scores
+        return self._score_arrays(
+            pe_benchmark=np.array(
+                [np.nan if (b := self.PE_BENCHMARKS.get(f.category)) is None else b for f in funds],
+                dtype=np.float64
+            ),
+            sharpe_ratio=column('sharpe_ratio'),
+            sortino_ratio=column('sortino_ratio'),
+            expense_ratio=column('expense_ratio'),
+            pe_ratio=column('pe_ratio'),
+            max_drawdown=column('max_drawdown'),
+            aum=column('aum'),
+            returns_1y=column('returns_1y')
         )
     
     def analyze_fund(self, fund: FundData) -> BrainFundScore:
@@ -212,7 +372,7 @@ class CerveauFondamental(AbstractBrain):
                 valuation_score=round(v_score, 2),
                 stability_score=round(s_score, 2)
             )
-            
+        
         except Exception as e:
             self.logger.error(f"Error analyzing fund {fund.fund_id}: {e}")
             return BrainFundScore(
@@ -365,6 +525,175 @@ class CerveauFondamental(AbstractBrain):
         
         return ", ".join(parts) if parts else "Profil equilibre"
     
+    # === Columnar scoring ===
+    
+    def _fund_data_at(self, columns: FundColumns, i: int) -> FundData:
+        """Scoring inputs of row i, in the same shape calculate_score builds"""
+        def value(column: np.ndarray) -> Optional[float]:
+            v = column[i]
+            return None if np.isnan(v) else float(v)
+        
+        metrics = columns.metrics
+        return FundData.model_construct(
+            fund_id=columns.isin[i],
+            fund_name="",
+            isin=columns.isin[i],
+            category=ASSET_CLASSES[columns.asset_class_codes[i]],
+            sri=int(columns.sri[i]),
+            volatility_annualized=value(metrics['vol_60d']),
+            max_drawdown=value(metrics['max_drawdown']),
+            sharpe_ratio=value(metrics['sharpe_ratio']),
+            sortino_ratio=value(metrics['sortino_ratio']),
+            returns_1y=value(metrics['perf_1y']),
+            returns_3y=value(metrics['perf_3y']),
+            pe_ratio=value(columns.fundamentals['pe_ratio']),
+            expense_ratio=value(columns.fundamentals['expense_ratio']),
+            aum=value(columns.fundamentals['aum'])
+        )
+    
+    def _score_arrays(
+        self,
+        pe_benchmark: np.ndarray,
+        sharpe_ratio: np.ndarray,
+        sortino_ratio: np.ndarray,
+        expense_ratio: np.ndarray,
+        pe_ratio: np.ndarray,
+        max_drawdown: np.ndarray,
+        aum: np.ndarray,
+        returns_1y: np.ndarray
+    ) -> dict:
+        """
+        Vectorized analyze_fund: same V1.1 formulas and fallbacks, NaN = None.
+        `x or default` in the scalar code treats 0 like None, hence the == 0 checks.
+        """
+        def or_default(values: np.ndarray, default) -> np.ndarray:
+            return np.where(np.isnan(values) | (values == 0), default, values)
+        
+        # 1. Quality Management: Q_mgmt = [(Sharpe + Sortino) / 2] x [1 - (expense_ratio / 100)]
+        sharpe = or_default(sharpe_ratio, 0.5)
+        sortino = or_default(sortino_ratio, sharpe)
+        expense = or_default(expense_ratio, 1.5)
+        q_mgmt_raw = ((sharpe + sortino) / 2) * (1 - (expense / 100))
+        q_mgmt_score = ((np.clip(q_mgmt_raw, -2, 4) + 2) / 6) * 100
+        
+        # 2. Valuation: V_score = 100 - 50 x (PE_fund / PE_benchmark), neutral 50 without data
+        has_pe = ~np.isnan(pe_ratio) & ~np.isnan(pe_benchmark) & (pe_benchmark != 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            v_score = np.where(has_pe, np.clip(100 - 50 * (pe_ratio / pe_benchmark), 0, 100), 50.0)
+        
+        # 3. Stability: S_stability = 1 / (1 + max_drawdown^2), neutral 50 without data
+        dd_decimal = max_drawdown / 100.0
+        s_score = np.where(np.isnan(max_drawdown), 50.0, (1 / (1 + dd_decimal ** 2)) * 100)
+        
+        # 4. Final Score: S_F = 0.4 x Q + 0.3 x V + 0.3 x S
+        score_fundamental = (
+            self.WEIGHTS['quality'] * q_mgmt_score +
+            self.WEIGHTS['valuation'] * v_score +
+            self.WEIGHTS['stability'] * s_score
+        )
+        
+        # 5. Priority Classification
+        is_high = (
+            (or_default(aum, 0) > self.AUM_THRESHOLD) &
+            (or_default(expense_ratio, 2.0) < self._median_expense_ratio) &
+            (or_default(sharpe_ratio, 0) > self.SHARPE_THRESHOLD)
+        )
+        is_low = or_default(max_drawdown, 0) > self.MAX_DD_THRESHOLD
+        priority = np.select(
+            [is_high, is_low],
+            [PRIORITY_ORDER.index(Priority.HIGH), PRIORITY_ORDER.index(Priority.LOW)],
+            default=PRIORITY_ORDER.index(Priority.MEDIUM)
+        ).astype(np.int8)
+        
+        # 6. Confidence: only 7 possible values, take them from the scalar formula
+        available = sum(
+            (~np.isnan(field)).astype(np.int8)
+            for field in (sharpe_ratio, sortino_ratio, max_drawdown, expense_ratio, aum, returns_1y)
+        )
+        confidence_table = np.array([
+            round(min(0.95, 0.5 + (k / 6) * 0.4), 2) for k in range(7)
+        ])
+        
+        return {
+            'score': _py_round(np.clip(score_fundamental, 0, 100), 2),
+            'quality_raw': q_mgmt_score,
+            'valuation_raw': v_score,
+            'stability_raw': s_score,
+            'confidence': confidence_table[available],
+            'priority': priority
+        }
+    
+    def analyze_universe(self, columns: FundColumns) -> UniverseScores:
+        """
+        Score every fund of a FundColumns table.
+        Memoized on the columns' content hash: repeated requests on the same
+        data are lookups, re-enriched metrics produce a new key.
+        """
+        inputs_key = ("universe", columns.fingerprint, self._median_expense_ratio)
+        return self.score_cache.get_or_compute(
+            self.brain_id, self.version, inputs_key,
+            lambda: self._analyze_universe(columns)
+        )
+    
+    def _analyze_universe(self, columns: FundColumns) -> UniverseScores:
+        """
+        Score every fund of a FundColumns table in a few NumPy expressions.
+        Bit-for-bit the same results as calculate_score / calculate_top_week_score per fund.
+        """
+        pe_benchmarks = np.array(
+            [np.nan if self.PE_BENCHMARKS.get(ac) is None else self.PE_BENCHMARKS[ac] for ac in ASSET_CLASSES]
+        )
+        metrics = columns.metrics
+        fundamentals = columns.fundamentals
+        result = self._score_arrays(
+            pe_benchmark=pe_benchmarks[columns.asset_class_codes],
+            sharpe_ratio=metrics['sharpe_ratio'],
+            sortino_ratio=metrics['sortino_ratio'],
+            expense_ratio=fundamentals['expense_ratio'],
+            pe_ratio=fundamentals['pe_ratio'],
+            max_drawdown=metrics['max_drawdown'],
+            aum=fundamentals['aum'],
+            returns_1y=metrics['perf_1y']
+        )
+        
+        # calculate_score returns `component or 50.0`, so a rounded 0 becomes 50
+        def legacy_component(raw: np.ndarray) -> np.ndarray:
+            rounded = _py_round(raw, 2)
+            return np.where(rounded == 0, 50.0, rounded)
+        
+        # Top of the Week: perf_1w / (1 + vol_60d/100), 0 without metrics
+        perf_1w = np.nan_to_num(metrics['perf_1w'], nan=0.0)
+        vol_60d = metrics['vol_60d']
+        vol_60d = np.where(np.isnan(vol_60d) | (vol_60d == 0), 15.0, vol_60d)
+        top_week = np.where(columns.has_metrics, _py_round(perf_1w / (1 + vol_60d / 100), 4), 0.0)
+        
+        return UniverseScores(
+            score=result['score'],
+            quality_score=legacy_component(result['quality_raw']),
+            valuation_score=legacy_component(result['valuation_raw']),
+            stability_score=legacy_component(result['stability_raw']),
+            confidence=result['confidence'],
+            priority=result['priority'],
+            top_week_score=top_week,
+            quality_raw=result['quality_raw'],
+            valuation_raw=result['valuation_raw'],
+            stability_raw=result['stability_raw']
+        )
+    
+    def reasoning_at(self, columns: FundColumns, scores: UniverseScores, i: int) -> str:
+        """Reasoning text for row i, generated only for returned funds"""
+        return self._generate_reasoning(
+            self._fund_data_at(columns, i),
+            scores.quality_raw[i],
+            scores.valuation_raw[i],
+            scores.stability_raw[i],
+            PRIORITY_ORDER[scores.priority[i]]
+        )
+    
+    def score_universe(self, columns: FundColumns) -> ScoredUniverse:
+        """Score the universe (memoized) and return a read-only result view"""
+        return ScoredUniverse(columns, self.analyze_universe(columns), self)
+    
     # === Legacy compatibility methods ===
     
     def calculate_score(
@@ -377,6 +706,23 @@ class CerveauFondamental(AbstractBrain):
         Calculate score for legacy Fund model.
         Returns: (total_score, quality_score, valuation_score, stability_score, confidence, priority, reasoning)
         """
+        metrics = fund.metrics
+        category = fund.asset_class if isinstance(fund.asset_class, str) else fund.asset_class.value
+        inputs_key = (
+            "fund",
+            category,
+            metrics.sharpe_ratio if metrics else None,
+            metrics.sortino_ratio if metrics else None,
+            metrics.max_drawdown if metrics else None,
+            metrics.perf_1y if metrics else None,
+            self._median_expense_ratio
+        )
+        return self.score_cache.get_or_compute(
+            self.brain_id, self.version, inputs_key,
+            lambda: self._calculate_score(fund)
+        )
+    
+    def _calculate_score(self, fund: Fund) -> Tuple[float, float, float, float, float, Priority, str]:
         # Convert Fund to FundData for analysis
         fund_data = FundData(
             fund_id=fund.isin,
@@ -425,36 +771,25 @@ class CerveauFondamental(AbstractBrain):
         target_sri: int = 4,
         horizon: InvestmentHorizon = InvestmentHorizon.MEDIUM
     ) -> List[Fund]:
-        """Score all funds with HiTrade V1 algorithm"""
-        for fund in funds:
-            score_data = self.calculate_score(fund, target_sri, horizon)
-            fund.fundamental_score = score_data[0]
-            fund.quality_score = score_data[1]
-            fund.valuation_score = score_data[2]
-            fund.stability_score = score_data[3]
-            fund.confidence = score_data[4]
-            fund.priority = score_data[5]
-            fund.reasoning = score_data[6]
-            fund.top_week_score = self.calculate_top_week_score(fund)
-        
-        return sorted(funds, key=lambda f: f.fundamental_score or 0, reverse=True)
+        """Score all funds with HiTrade V1 algorithm (returns scored copies)"""
+        scored = [self._scored_copy(fund, target_sri, horizon) for fund in funds]
+        return sorted(scored, key=lambda f: f.fundamental_score or 0, reverse=True)
     
     def get_top_week_funds(self, funds: List[Fund], limit: int = 20) -> List[Fund]:
         """Get top funds for the week based on risk-adjusted weekly performance"""
-        for fund in funds:
-            fund.top_week_score = self.calculate_top_week_score(fund)
-            # Also calculate fundamental scores
-            score_data = self.calculate_score(fund)
-            fund.fundamental_score = score_data[0]
-            fund.quality_score = score_data[1]
-            fund.valuation_score = score_data[2]
-            fund.stability_score = score_data[3]
-            fund.confidence = score_data[4]
-            fund.priority = score_data[5]
-            fund.reasoning = score_data[6]
-        
-        sorted_funds = sorted(funds, key=lambda f: f.top_week_score or 0, reverse=True)
-        return sorted_funds[:limit]
+        scored = [self._scored_copy(fund) for fund in funds]
+        return heapq.nlargest(limit, scored, key=lambda f: f.top_week_score or 0)
+    
+    def _scored_copy(
+        self,
+        fund: Fund,
+        target_sri: int = 4,
+        horizon: InvestmentHorizon = InvestmentHorizon.MEDIUM
+    ) -> Fund:
+        """Copy of fund with score fields set; the input Fund is not mutated"""
+        score_data = self.calculate_score(fund, target_sri, horizon)
+        record = ScoreRecord(*score_data, top_week_score=self.calculate_top_week_score(fund))
+        return fund.model_copy(update=record._asdict())
     
     def get_explanation(self, fund: Fund, target_sri: int, horizon: InvestmentHorizon) -> str:
         """Generate explanation for fund score"""
@@ -0,0 +1,80 @@
+"""
+Score Cache - memoization of brain scores
+
+Entries are keyed by (brain_id, brain version, inputs key), where the inputs
+key is derived from the fund data the brain actually reads. When the data
+provider refreshes metrics the inputs change, so the key changes and stale
+entries are simply never hit again (and age out of the LRU).
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import logging
+import threading
+
+
+class ScoreCache:
+    """
+    Thread-safe LRU cache of brain scores with hit/miss counters.
+    Shared by all brain instances of the process (keys include the brain_id).
+    """
+    
+    def __init__(self, max_entries: int = 100_000):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, Hashable], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self.logger = logging.getLogger("ScoreCache")
+    
+    def get_or_compute(
+        self,
+        brain_id: str,
+        version: str,
+        inputs_key: Hashable,
+        compute: Callable[[], Any]
+    ) -> Any:
+        """Return the cached value for the key, computing and storing it on a miss"""
+        key = (brain_id, version, inputs_key)
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+        
+        value = compute()
+        
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        
+        return value
+    
+    def invalidate(self, brain_id: Optional[str] = None) -> None:
+        """Drop all entries, or only those of one brain"""
+        with self._lock:
+            if brain_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == brain_id]:
+                    del self._entries[key]
+        self.logger.info(f"Score cache invalidated ({brain_id or 'all brains'})")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "entries": len(self._entries)
+            }
+
+
+# Process-wide cache used by default by all brains
+score_cache = ScoreCache()
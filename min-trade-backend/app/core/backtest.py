@@ -0,0 +1,115 @@
+"""
+Backtest - vectorized historical simulation of portfolio allocations
+
+Runs many portfolios at once on one aligned ReturnMatrix:
+weights (portfolios x funds) are reset to their targets at the start of
+each rebalancing period and drift with the funds' returns in between.
+
+Within a period the value of a portfolio is growth @ weights, where growth
+is each fund's cumulative growth since the period start (one cumulative
+sum of log returns for the whole matrix), so every portfolio and every
+period is a single matrix product. Missing returns (before a fund's first
+NAV) count as 0 (the weight is held as cash).
+
+Metrics follow the provider's conventions (252 trading days, population
+volatility, 2% risk-free rate for the Sharpe ratio, percentages).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..models.fund import RebalanceFrequency
+
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.02
+
+
+def rebalance_periods(dates: np.ndarray, frequency: RebalanceFrequency) -> np.ndarray:
+    """Period number of each date (weights are reset when it changes)"""
+    months = np.asarray(dates, dtype="datetime64[M]").astype(np.int64)
+    if frequency == RebalanceFrequency.MONTHLY:
+        return months
+    if frequency == RebalanceFrequency.QUARTERLY:
+        return months // 3
+    if frequency == RebalanceFrequency.YEARLY:
+        return months // 12
+    return np.zeros(len(months), dtype=np.int64)
+
+
+def simulate(returns: np.ndarray, weights: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    Equity curves of the portfolios, starting at 1.
+    returns: (dates, funds) daily returns, weights: (portfolios, funds)
+    summing to 1, periods: (dates,) rebalancing period of each date.
+    Returns (dates + 1, portfolios).
+    """
+    returns = np.nan_to_num(returns, nan=0.0)
+    days, portfolios = len(returns), len(weights)
+    if days == 0:
+        return np.ones((1, portfolios))
+    
+    log_growth = np.cumsum(np.log1p(returns), axis=0)
+    is_start = np.r_[True, periods[1:] != periods[:-1]]
+    starts = np.flatnonzero(is_start)
+    period_of_day = np.cumsum(is_start) - 1
+    
+    # Growth of each fund since the start of its period, then portfolio value
+    # relative to the period start
+    before_start = np.vstack([np.zeros(returns.shape[1]), log_growth])[starts]
+    growth = np.exp(log_growth - before_start[period_of_day])
+    value = growth @ weights.T
+    
+    # Chain the periods: value carried into each period
+    ends = np.r_[starts[1:] - 1, days - 1]
+    carried = np.vstack([np.ones(portfolios), np.cumprod(value[ends], axis=0)[:-1]])
+    equity = value * carried[period_of_day]
+    return np.vstack([np.ones(portfolios), equity])
+
+
+@dataclass(frozen=True)
+class BacktestMetrics:
+    """Per-portfolio metrics (arrays of length portfolios), in percent except Sharpe"""
+    total_return: np.ndarray
+    annualized_return: np.ndarray
+    annualized_volatility: np.ndarray
+    max_drawdown: np.ndarray
+    sharpe_ratio: np.ndarray
+
+
+def compute_metrics(equity: np.ndarray, risk_free_rate: float = RISK_FREE_RATE) -> BacktestMetrics:
+    """Metrics of equity curves (dates + 1, portfolios) starting at 1"""
+    daily = equity[1:] / equity[:-1] - 1
+    days = len(daily)
+    years = days / TRADING_DAYS if days else np.nan
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annualized_return = equity[-1] ** (1 / years) - 1
+        mean = daily.mean(axis=0) if days else np.zeros(equity.shape[1])
+        volatility = daily.std(axis=0) * np.sqrt(TRADING_DAYS) if days else np.zeros(equity.shape[1])
+        sharpe = np.where(volatility > 0, (mean * TRADING_DAYS - risk_free_rate) / volatility, np.nan)
+    drawdown = 1 - (equity / np.maximum.accumulate(equity, axis=0)).min(axis=0)
+    
+    return BacktestMetrics(
+        total_return=(equity[-1] - 1) * 100,
+        annualized_return=annualized_return * 100,
+        annualized_volatility=volatility * 100,
+        max_drawdown=drawdown * 100,
+        sharpe_ratio=sharpe
+    )
+
+
+def backtest(
+    returns: np.ndarray,
+    dates: np.ndarray,
+    weights: np.ndarray,
+    frequency: RebalanceFrequency,
+    risk_free_rate: float = RISK_FREE_RATE
+) -> tuple[np.ndarray, BacktestMetrics]:
+    """Equity curves and metrics of the portfolios (weights rows are normalized)"""
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+    equity = simulate(returns, weights, rebalance_periods(dates, frequency))
+    return equity, compute_metrics(equity, risk_free_rate)
@@ -0,0 +1,231 @@
+"""
+Portfolio Plans - memoized portfolio suggestions per risk profile
+
+A suggestion only depends on the profile (target SRI, SRI tolerance, horizon,
+allocation method): the amount just scales amount_eur. A PortfolioPlan keeps the selected funds
+and their allocation percentages; a request only turns them into amounts.
+
+Plans are valid for one (data version, brain version, weights version); the
+cache drops them all when that version changes. There are at most 7 x 3 x 3
+profiles per allocation method, so the cache is a plain dict; only the
+default (score) method is pre-warmed, optimized plans need NAV histories.
+
+select_diversified picks the funds of a plan on row indices (FundColumns),
+so Fund models are only built for the selected funds.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+import heapq
+import itertools
+import logging
+import threading
+
+import numpy as np
+
+from ..data.columns import FundColumns
+from ..models.fund import AllocationMethod, Fund, FundAllocation, InvestmentHorizon
+
+
+# (target_sri, sri_tolerance, horizon, allocation_method)
+Profile = Tuple[int, int, InvestmentHorizon, AllocationMethod]
+
+ALL_PROFILES: List[Profile] = list(
+    itertools.product(range(1, 8), range(0, 3), InvestmentHorizon, [AllocationMethod.SCORE])
+)
+
+
+def select_diversified(
+    columns: FundColumns,
+    order: np.ndarray,
+    target_classes: Sequence[int],
+    max_funds: int,
+    min_funds: int,
+    max_per_class: int,
+    per_target_class: int = 2,
+    max_per_company: Optional[int] = None,
+    max_per_platform: Optional[int] = None
+) -> List[int]:
+    """
+    Diversified selection over candidate rows sorted best first (`order`).
+    Returns positions in `order`, in selection order:
+    1. the best `per_target_class` funds of each target asset class (codes)
+    2. then the best remaining funds while their class holds < max_per_class,
+       up to max_funds
+    3. then the best remaining funds regardless of caps, up to min_funds
+    Company / platform caps (None = no cap) apply to steps 1 and 2.
+    """
+    class_codes = columns.asset_class_codes[order]
+    # Candidates grouped by asset class once, each group in `order` order
+    by_class = np.argsort(class_codes, kind="stable")
+    bounds = np.searchsorted(class_codes[by_class], np.arange(class_codes.max(initial=-1) + 2))
+    groups = {
+        code: by_class[bounds[code]:bounds[code + 1]].tolist()
+        for code in range(len(bounds) - 1)
+        if bounds[code + 1] > bounds[code]
+    }
+    
+    selected: List[int] = []
+    chosen: Set[int] = set()
+    class_counts: Counter = Counter()
+    company_counts: Counter = Counter()
+    platform_counts: Counter = Counter()
+    
+    def platforms(position: int) -> np.ndarray:
+        row = order[position]
+        return columns.platform_codes[columns.platform_offsets[row]:columns.platform_offsets[row + 1]]
+    
+    def fits(position: int) -> bool:
+        if max_per_company is not None:
+            company = columns.company_codes[order[position]]
+            if company >= 0 and company_counts[company] >= max_per_company:
+                return False
+        if max_per_platform is not None:
+            if any(platform_counts[p] >= max_per_platform for p in platforms(position)):
+                return False
+        return True
+    
+    def take(position: int, code: int) -> None:
+        selected.append(position)
+        chosen.add(position)
+        class_counts[code] += 1
+        if max_per_company is not None:
+            company_counts[columns.company_codes[order[position]]] += 1
+        if max_per_platform is not None:
+            platform_counts.update(platforms(position).tolist())
+    
+    for code in target_classes:
+        taken = 0
+        for position in groups.get(code, []):
+            if taken == per_target_class:
+                break
+            if fits(position):
+                take(position, code)
+                taken += 1
+    
+    # k-way merge of the class groups; a full class drops out of the merge
+    heap = [(group[0], code, 0) for code, group in groups.items()]
+    heapq.heapify(heap)
+    while heap and len(selected) < max_funds:
+        position, code, i = heapq.heappop(heap)
+        if class_counts[code] >= max_per_class:
+            continue
+        if position not in chosen and fits(position):
+            take(position, code)
+        group = groups[code]
+        if i + 1 < len(group):
+            heapq.heappush(heap, (group[i + 1], code, i + 1))
+    
+    position = 0
+    while len(selected) < min_funds and position < len(order):
+        if position not in chosen:
+            take(position, int(class_codes[position]))
+        position += 1
+    
+    return selected
+
+
+@dataclass(frozen=True)
+class PortfolioPlan:
+    """Amount-independent part of a PortfolioSuggestion"""
+    funds: List[Fund]
+    # Rounded percentages shown to the user
+    allocation_percents: List[float]
+    # Percentages the amounts are computed from (before or after rounding,
+    # as in the original allocation algorithm)
+    amount_percents: List[float]
+    average_sri: float
+    asset_class_distribution: Dict[str, float]
+    average_confidence: float
+    consensus_summary: str
+    # Method actually used (optimized plans fall back to SCORE without NAV data)
+    allocation_method: AllocationMethod = AllocationMethod.SCORE
+    
+    def allocations(self, amount: float) -> List[FundAllocation]:
+        return [
+            FundAllocation(
+                fund=fund,
+                allocation_percent=percent,
+                amount_eur=round(amount * amount_percent / 100, 2)
+            )
+            for fund, percent, amount_percent in zip(self.funds, self.allocation_percents, self.amount_percents)
+        ]
+
+
+class PortfolioPlanCache:
+    """
+    Thread-safe PortfolioPlan store for a single version at a time.
+    Looking up another version drops every plan of the previous one.
+    """
+    
+    def __init__(self):
+        self._version: Optional[Hashable] = None
+        self._plans: Dict[Hashable, PortfolioPlan] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self.logger = logging.getLogger("PortfolioPlanCache")
+    
+    def is_current(self, version: Hashable) -> bool:
+        return self._version == version
+    
+    def get_or_compute(
+        self,
+        version: Hashable,
+        profile: Hashable,
+        compute: Callable[[], PortfolioPlan]
+    ) -> PortfolioPlan:
+        """
+        Return the plan of the profile for this version, computing it on a miss
+        (`profile` may carry extra key parts, e.g. the risk model state)
+        """
+        with self._lock:
+            self._reset_if_stale(version)
+            plan = self._plans.get(profile)
+            if plan is not None:
+                self._hits += 1
+                return plan
+            self._misses += 1
+        
+        plan = compute()
+        
+        with self._lock:
+            # A newer version may have been published meanwhile
+            if self._version == version:
+                self._plans[profile] = plan
+        return plan
+    
+    def warm(self, version: Hashable, compute: Callable[[Profile], PortfolioPlan]) -> None:
+        """Compute the plans of every profile missing for this version"""
+        with self._lock:
+            self._reset_if_stale(version)
+        for profile in ALL_PROFILES:
+            with self._lock:
+                # Superseded by a newer version: stop warming this one
+                if self._version != version:
+                    return
+                if profile in self._plans:
+                    continue
+            plan = compute(profile)
+            with self._lock:
+                if self._version != version:
+                    return
+                self._plans.setdefault(profile, plan)
+        self.logger.info(f"Portfolio plans warmed for version {version}")
+    
+    def _reset_if_stale(self, version: Hashable) -> None:
+        if self._version != version:
+            self._version = version
+            self._plans = {}
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "entries": len(self._plans)
+            }
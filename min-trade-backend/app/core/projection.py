@@ -0,0 +1,158 @@
+"""
+Projection - Monte Carlo outcomes of an allocation over an investment horizon
+
+Paths are built by a moving block bootstrap of the allocation's historical
+daily returns (monthly rebalanced, see backtest): each step draws one
+PROJECTION_BLOCK-day window of history at random. Resampling whole dates of
+the portfolio keeps the correlations between its funds, and whole months
+keep their short-term autocorrelation, without estimating a covariance.
+
+All paths are simulated at once: (paths, steps) block draws, one cumulative
+sum of log returns, one running maximum for the drawdowns. 10k paths over
+10 years take a few milliseconds.
+
+Projections are deterministic (the generator is seeded from the allocation)
+and memoized per (allocation hash, years) by ProjectionCache for the
+current NAV window.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import hashlib
+import threading
+
+import numpy as np
+
+from ..models.fund import InvestmentHorizon
+
+
+HORIZON_YEARS = {
+    InvestmentHorizon.SHORT: 3,
+    InvestmentHorizon.MEDIUM: 7,
+    InvestmentHorizon.LONG: 10,
+}
+PROJECTION_PATHS = 10_000
+PROJECTION_BLOCK = 21  # trading days per step (one month)
+TRADING_DAYS = 252
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def allocation_key(weights: Dict[str, float]) -> str:
+    """Stable hash of an allocation (ISIN -> weight, any scale)"""
+    total = sum(weights.values())
+    normalized = sorted((isin, round(w / total, 9)) for isin, w in weights.items() if w > 0)
+    return hashlib.blake2b(repr(normalized).encode(), digest_size=8).hexdigest()
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Outcome distribution per 1 EUR invested, percentiles as in PERCENTILES"""
+    years: int
+    paths: int
+    final_values: np.ndarray        # (percentiles,) value multiple at the horizon
+    annualized_returns: np.ndarray  # (percentiles,) in percent
+    max_drawdowns: np.ndarray       # (percentiles,) in percent, positive
+    yearly_values: np.ndarray       # (years, percentiles) value multiple at each year end
+    probability_of_loss: float      # in percent
+
+
+def block_log_returns(daily_returns: np.ndarray, block: int = PROJECTION_BLOCK) -> np.ndarray:
+    """Log return of every window of `block` consecutive days"""
+    log_growth = np.concatenate([[0.0], np.cumsum(np.log1p(daily_returns))])
+    return log_growth[block:] - log_growth[:-block]
+
+
+def simulate_paths(blocks: np.ndarray, steps: int, paths: int, rng: np.random.Generator) -> np.ndarray:
+    """Value paths (paths, steps + 1) starting at 1, one random block per step"""
+    draws = blocks[rng.integers(0, len(blocks), size=(paths, steps))]
+    values = np.empty((paths, steps + 1))
+    values[:, 0] = 1.0
+    np.exp(np.cumsum(draws, axis=1), out=values[:, 1:])
+    return values
+
+
+def project(
+    daily_returns: np.ndarray,
+    years: int,
+    paths: int = PROJECTION_PATHS,
+    seed: Optional[int] = None
+) -> Projection:
+    """Bootstrap `paths` paths of `years` years from a daily return history"""
+    daily_returns = np.nan_to_num(np.asarray(daily_returns, dtype=np.float64), nan=0.0)
+    if len(daily_returns) < PROJECTION_BLOCK:
+        raise ValueError(f"{len(daily_returns)} daily returns, at least {PROJECTION_BLOCK} needed")
+    
+    steps_per_year = TRADING_DAYS // PROJECTION_BLOCK
+    values = simulate_paths(
+        block_log_returns(daily_returns), years * steps_per_year, paths, np.random.default_rng(seed)
+    )
+    
+    final = values[:, -1]
+    drawdowns = 1 - (values / np.maximum.accumulate(values, axis=1)).min(axis=1)
+    yearly = values[:, steps_per_year::steps_per_year]
+    percentiles = np.array(PERCENTILES)
+    final_values = np.percentile(final, percentiles)
+    
+    return Projection(
+        years=years,
+        paths=paths,
+        final_values=final_values,
+        annualized_returns=(final_values ** (1 / years) - 1) * 100,
+        max_drawdowns=np.percentile(drawdowns, percentiles) * 100,
+        yearly_values=np.percentile(yearly, percentiles, axis=0).T,
+        probability_of_loss=float((final < 1).mean() * 100)
+    )
+
+
+class ProjectionCache:
+    """
+    Thread-safe LRU of projections keyed by (allocation hash, years), for a
+    single version (NAV window) at a time. Custom allocations make the key
+    space unbounded, hence the size limit.
+    """
+    
+    def __init__(self, max_entries: int = 512):
+        self._max_entries = max_entries
+        self._version: Optional[Hashable] = None
+        self._entries: "OrderedDict[Tuple[str, int], Projection]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+    
+    def get_or_compute(
+        self,
+        version: Hashable,
+        key: Tuple[str, int],
+        compute: Callable[[], Projection]
+    ) -> Projection:
+        with self._lock:
+            if self._version != version:
+                self._version = version
+                self._entries.clear()
+            projection = self._entries.get(key)
+            if projection is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return projection
+            self._misses += 1
+        
+        projection = compute()
+        
+        with self._lock:
+            if self._version == version:
+                self._entries[key] = projection
+                if len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return projection
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "entries": len(self._entries)
+            }
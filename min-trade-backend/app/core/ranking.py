@@ -0,0 +1,92 @@
+"""
+Ranking - top-K selection and ranking indexes for the ranking endpoints
+
+Endpoints return the best `limit` funds out of the whole universe, so a full
+sort (O(n log n)) is wasted work. These helpers select the top K by partial
+selection (O(n + k log k)) and return them in the same order as a stable
+descending sort: higher values first, ties kept in original order, NaN last.
+
+RankingIndex holds secondary indexes over an already sorted ranking (per-SRI
+buckets, score array) so filtered views cost O(log n + k), not O(n).
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+import heapq
+import itertools
+
+import numpy as np
+
+
+T = TypeVar("T")
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest values, best first.
+    Same result as np.argsort(-values, kind="stable")[:k].
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    neg = -values
+    if k >= n:
+        return np.argsort(neg, kind="stable")
+    
+    # k-th smallest of -values; NaN sorts last in both partition and argsort
+    threshold = np.partition(neg, k - 1)[k - 1]
+    if np.isnan(threshold):
+        above = np.flatnonzero(~np.isnan(neg))
+        ties = np.flatnonzero(np.isnan(neg))
+    else:
+        above = np.flatnonzero(neg < threshold)
+        ties = np.flatnonzero(neg == threshold)
+    
+    # Ties at the cut keep the lowest indices, as a stable sort would
+    candidates = np.concatenate([above, ties[:k - len(above)]])
+    candidates.sort()
+    return candidates[np.argsort(neg[candidates], kind="stable")]
+
+
+def top_k(items: Iterable[T], k: int, key: Callable[[T], float]) -> List[T]:
+    """
+    The k items with the largest key, best first.
+    Same result as sorted(items, key=key, reverse=True)[:k].
+    """
+    if k <= 0:
+        return []
+    return heapq.nlargest(k, items, key=key)
+
+
+SRI_VALUES = range(1, 8)
+
+
+class RankingIndex:
+    """
+    Secondary indexes over a ranking sorted by descending score.
+    Positions refer to the ranking list the index was built from.
+    """
+    
+    def __init__(self, scores: Sequence[float], sris: Sequence[int]):
+        # Ascending -score, for bisection
+        self._neg_scores = -np.asarray(scores, dtype=np.float64)
+        sris = np.asarray(sris, dtype=np.int64)
+        # One score-sorted bucket of positions per SRI value
+        self._by_sri: Dict[int, List[int]] = {
+            sri: np.flatnonzero(sris == sri).tolist() for sri in SRI_VALUES
+        }
+    
+    def count_at_least(self, min_score: float) -> int:
+        """Number of leading entries with score >= min_score (bisect)"""
+        return int(np.searchsorted(self._neg_scores, -min_score, side="right"))
+    
+    def sri_range_positions(self, sri_min: int, sri_max: int, limit: Optional[int] = None) -> List[int]:
+        """
+        Positions of the entries with sri_min <= SRI <= sri_max, in ranking
+        order: a k-way merge of the SRI buckets, stopped after `limit`.
+        """
+        buckets = [self._by_sri[sri] for sri in SRI_VALUES if sri_min <= sri <= sri_max]
+        merged: Iterator[int] = heapq.merge(*buckets)
+        if limit is not None:
+            merged = itertools.islice(merged, limit)
+        return list(merged)
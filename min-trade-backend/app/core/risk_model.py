@@ -0,0 +1,144 @@
+"""
+Risk Model - PCA factor covariance model of the whole fund universe
+
+A full sample covariance of ~3k funds is 9M noisy entries and has to be
+rebuilt for every candidate set. The factor model keeps instead, per fund,
+its loadings on the first RISK_FACTORS principal components of the daily
+returns (unit factor variance) and a specific variance:
+
+    cov(i, j) = B_i . B_j + (i == j) * specific_i
+
+so the covariance of any k funds is assembled on demand in O(k^2 f) from
+O(n f) stored numbers.
+
+The model is built from provider NAV histories in a background thread,
+once per version (data version, NAV window end date), by RiskModelStore.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+import logging
+import threading
+
+import numpy as np
+
+from ..data.nav import ReturnMatrix
+
+
+RISK_FACTORS = 10
+MIN_OBSERVATIONS = 60
+# Specific variance floor, relative to the fund's total variance
+SPECIFIC_VARIANCE_FLOOR = 0.01
+
+
+@dataclass(frozen=True)
+class FactorRiskModel:
+    """Factor loadings and specific variances, row i == isins[i]"""
+    version: Hashable
+    isins: List[str]
+    loadings: np.ndarray            # (funds, factors), unit factor variance
+    specific_variances: np.ndarray  # (funds,)
+    positions: Dict[str, int] = field(repr=False, default_factory=dict)
+    
+    def __post_init__(self):
+        if not self.positions:
+            self.positions.update((isin, i) for i, isin in enumerate(self.isins))
+    
+    @property
+    def factors(self) -> int:
+        return self.loadings.shape[1]
+    
+    def rows(self, isins: Sequence[str]) -> np.ndarray:
+        """Model rows of the ISINs, -1 for funds outside the model"""
+        return np.array([self.positions.get(isin, -1) for isin in isins], dtype=np.intp)
+    
+    def covariance(self, rows: Sequence[int]) -> np.ndarray:
+        """Daily return covariance of the funds at these rows, O(k^2 f)"""
+        loadings = self.loadings[rows]
+        cov = loadings @ loadings.T
+        cov[np.diag_indices_from(cov)] += self.specific_variances[rows]
+        return cov
+    
+    def volatility(self, rows: Sequence[int]) -> np.ndarray:
+        """Daily return volatility of the funds at these rows"""
+        loadings = self.loadings[rows]
+        return np.sqrt((loadings * loadings).sum(axis=1) + self.specific_variances[rows])
+    
+    @classmethod
+    def from_returns(cls, returns: ReturnMatrix, version: Hashable, factors: int = RISK_FACTORS) -> "FactorRiskModel":
+        """PCA of the demeaned daily returns of the funds with enough history"""
+        keep = np.flatnonzero(returns.observations >= MIN_OBSERVATIONS)
+        x = returns.subset(keep).demeaned()
+        dates = max(len(x) - 1, 1)
+        factors = min(factors, *x.shape)
+        if factors == 0:
+            return cls(version=version, isins=[], loadings=np.zeros((0, 0)), specific_variances=np.zeros(0))
+        
+        # x = U S V': the first components explain cov = V S^2 V' / (dates - 1)
+        _, singular, components = np.linalg.svd(x, full_matrices=False)
+        loadings = (components[:factors].T * singular[:factors]) / np.sqrt(dates)
+        variances = (x * x).sum(axis=0) / dates
+        specific = np.maximum(variances - (loadings * loadings).sum(axis=1), SPECIFIC_VARIANCE_FLOOR * variances)
+        
+        return cls(
+            version=version,
+            isins=[returns.isins[j] for j in keep],
+            loadings=loadings,
+            specific_variances=specific
+        )
+
+
+class RiskModelStore:
+    """
+    Holds the FactorRiskModel of the current version.
+    get() never blocks: on a new version it starts the build in a background
+    thread and returns None until the model is published.
+    """
+    
+    def __init__(self, build: Callable[[Hashable], FactorRiskModel]):
+        self._build = build
+        self._model: Optional[FactorRiskModel] = None
+        self._building: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("RiskModelStore")
+    
+    def current(self, version: Hashable) -> Optional[FactorRiskModel]:
+        """Model of this version if already built (does not start a build)"""
+        model = self._model
+        return model if model is not None and model.version == version else None
+    
+    def get(self, version: Hashable) -> Optional[FactorRiskModel]:
+        """Model of this version, scheduling its build if needed"""
+        model = self.current(version)
+        if model is not None:
+            return model
+        with self._lock:
+            if self._building == version:
+                return None
+            self._building = version
+        threading.Thread(target=self._run, args=(version,), name="risk-model-build", daemon=True).start()
+        return None
+    
+    def build_now(self, version: Hashable) -> FactorRiskModel:
+        """Build and publish synchronously (scripts, benchmarks)"""
+        model = self._build(version)
+        with self._lock:
+            self._building = version
+            self._model = model
+        return model
+    
+    def _run(self, version: Hashable) -> None:
+        try:
+            model = self._build(version)
+        except Exception as e:
+            self.logger.error(f"Risk model {version} build failed: {e}")
+            with self._lock:
+                if self._building == version:
+                    self._building = None
+            return
+        with self._lock:
+            # A newer version was requested meanwhile: keep waiting for that one
+            if self._building != version:
+                return
+            self._model = model
+        self.logger.info(f"Risk model {version} published: {len(model.isins)} funds, {model.factors} factors")
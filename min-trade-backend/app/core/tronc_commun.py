@@ -9,19 +9,32 @@ Based on the HiTrade V1 technical specification:
 """
 
 from typing import List, Optional, Dict, Set
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import logging
 import statistics
-import os
+import threading
+
+import numpy as np
 
 from ..models.fund import (
-    Fund, FundMetrics, FundData, AssetClass, InvestmentHorizon,
+    Fund, FundMetrics, FundData, AssetClass, InvestmentHorizon, AllocationMethod,
     PortfolioRequest, PortfolioSuggestion, FundAllocation,
+    BacktestRequest, BacktestResult, RebalanceFrequency,
+    ProjectionRequest, ProjectionResult, ProjectionBand,
     BrainOutput, BrainFundScore, FundCompositeScore, BrainWeights, TrunkOutput, Priority
 )
-from ..data.ingestion import DataIngestion
-from ..data.provider import FundDataProvider, MockDataProvider, TwelveDataProvider, TWELVEDATA_API_KEY
-from ..brains.fundamental import CerveauFondamental, AbstractBrain
+from ..data.columns import ASSET_CLASSES, FundColumns
+from ..data.nav import load_return_matrix
+from ..data.provider import FundDataProvider
+from ..data.search import normalize
+from ..data.universe import FundUniverse, get_fund_universe
+from ..brains.fundamental import CerveauFondamental, AbstractBrain, ScoredUniverse
+from .backtest import BacktestMetrics, backtest
+from .optimizer import optimize_weights
+from .portfolio import PortfolioPlan, PortfolioPlanCache, Profile, select_diversified
+from .projection import HORIZON_YEARS, PERCENTILES, Projection, ProjectionCache, allocation_key, project
+from .risk_model import FactorRiskModel, RiskModelStore
+from .ranking import top_k_indices
 
 
 class BrainRegistry:
@@ -121,6 +134,11 @@ class BrainWeightsStore:
         
         self.logger.info(f"Weights updated: {new_weights} (reason: {reason})")
     
+    @property
+    def version(self) -> int:
+        """Incremented on every weights update"""
+        return len(self._history)
+    
     def get_history(self) -> List[BrainWeights]:
         """Return history of weight modifications"""
         return self._history.copy()
@@ -210,24 +228,25 @@ class TroncCommun:
     MAX_ALLOCATION_PER_FUND = 0.20  # 20% max per fund
     MIN_FUNDS_IN_PORTFOLIO = 5
     MAX_FUNDS_IN_PORTFOLIO = 15
+    MAX_FUNDS_PER_ASSET_CLASS = 4
+    # Optional diversification caps (None = no cap)
+    MAX_FUNDS_PER_COMPANY: Optional[int] = None
+    MAX_FUNDS_PER_PLATFORM: Optional[int] = None
+    # Optimized allocations: best-scored candidates and NAV window
+    OPTIMIZER_CANDIDATES = 100
+    NAV_HISTORY_DAYS = 365
+    MIN_NAV_OBSERVATIONS = 60
+    BACKTEST_YEARS = 3
+    PROJECTION_HISTORY_YEARS = 5
     
-    def __init__(self, data_file_path: str):
+    def __init__(self, data_file_path: str, universe: Optional[FundUniverse] = None):
         self._data_file_path = data_file_path
-        self._ingestion = DataIngestion(data_file_path)
-        
-        # Select data provider based on environment
-        # TwelveData free plan has only 8 API credits/minute - too limited for 2916 funds
-        # Use MockDataProvider by default, TwelveDataProvider only with paid plan (HITRADE_ENV=prod_paid)
-        hitrade_env = os.getenv("HITRADE_ENV", "dev")
-        
-        # TODO: Switch to TwelveDataProvider when user upgrades to paid Twelve Data plan
-        # For now, use MockDataProvider to avoid API rate limits
-        if TWELVEDATA_API_KEY and hitrade_env == "prod_paid":
-            self._provider: FundDataProvider = TwelveDataProvider()
-            self._provider_name = "TwelveData"
-        else:
-            self._provider: FundDataProvider = MockDataProvider()
-            self._provider_name = "Mock"
+        
+        # Shared fund store: ingestion and enrichment run once per process,
+        # the /trunk router reads the same universe
+        self._universe = universe or get_fund_universe(data_file_path)
+        self._provider: FundDataProvider = self._universe.provider
+        self._provider_name = self._universe.provider_name
         
         # HiTrade V1 architecture components
         self._brain_registry = BrainRegistry()
@@ -244,7 +263,16 @@ class TroncCommun:
         # Legacy compatibility
         self._brain = self._fundamental_brain
         
-        self._funds: List[Fund] = []
+        # Portfolio suggestions per risk profile, for the current data/weights version
+        self._portfolio_plans = PortfolioPlanCache()
+        self._projections = ProjectionCache()
+        self._warmup_lock = threading.Lock()
+        self._warmup_version: Optional[tuple] = None
+        
+        # Universe factor risk model, built in the background on the first
+        # optimized allocation (score plans never need it)
+        self._risk_models = RiskModelStore(self._build_risk_model)
+        
         self._initialized = False
     
     def initialize(self) -> None:
@@ -252,12 +280,16 @@ class TroncCommun:
         if self._initialized:
             return
         
-        self._ingestion.load_data()
-        self._funds = self._ingestion.normalize_and_parse()
-        self._funds = self._provider.enrich_funds(self._funds)
+        self._universe.load()
         
         self._initialized = True
-        self.logger.info(f"Initialized with {len(self._funds)} funds")
+        self.logger.info(f"Initialized with {self._universe.columns.size} funds")
+        self._schedule_plan_warmup(self._plan_version())
+    
+    @property
+    def universe(self) -> FundUniverse:
+        """Shared fund universe backing this instance"""
+        return self._universe
     
     @property
     def brain_registry(self) -> BrainRegistry:
@@ -271,9 +303,15 @@ class TroncCommun:
     
     @property
     def funds(self) -> List[Fund]:
+        """Every fund as a pydantic Fund, built on each call (the universe keeps columns only)"""
+        columns = self.columns
+        return [columns.to_fund(i) for i in range(columns.size)]
+    
+    @property
+    def columns(self) -> FundColumns:
         if not self._initialized:
             self.initialize()
-        return self._funds
+        return self._universe.columns
     
     def get_all_funds(
         self,
@@ -282,43 +320,108 @@ class TroncCommun:
         asset_class: Optional[AssetClass] = None,
         max_sri: Optional[int] = None,
         min_sri: Optional[int] = None,
-        search: Optional[str] = None
-    ) -> tuple[List[Fund], int]:
-        """Get paginated list of funds with optional filters."""
-        filtered = self.funds.copy()
+        search: Optional[str] = None,
+        platform: Optional[str] = None,
+        label: Optional[str] = None
+    ) -> tuple[List[Fund], int, Dict[str, Dict[str, int]]]:
+        """
+        Get paginated list of funds with optional filters, plus facet counts.
+        With a search, funds come from the search index ordered by relevance.
+        Filters and facets are bitset operations on the filter index.
+        """
+        snapshot = self._universe.snapshot()
+        index = snapshot.filter_index
         
+        selection = {}
         if asset_class:
-            filtered = [f for f in filtered if f.asset_class == asset_class]
-        
-        if max_sri is not None:
-            filtered = [f for f in filtered if f.sri <= max_sri]
+            selection["asset_class"] = [asset_class.value]
+        if max_sri is not None or min_sri is not None:
+            selection["sri"] = range(min_sri or 1, (max_sri or 7) + 1)
+        if platform:
+            selection["platform"] = [platform]
+        if label:
+            selection["label"] = [label]
+        
+        # A blank or punctuation-only query is no search filter
+        if not normalize(search):
+            search = None
+        if search:
+            ranked = snapshot.search_index.search(search)
+            base = index.from_rows(ranked)
+        else:
+            base = None
         
-        if min_sri is not None:
-            filtered = [f for f in filtered if f.sri >= min_sri]
+        bits = index.select(selection, base)
+        rows = ranked[index.mask(bits)[ranked]] if search else index.rows(bits)
         
-        if search:
-            search_lower = search.lower()
-            filtered = [
-                f for f in filtered
-                if search_lower in f.name.lower() or search_lower in f.isin.lower()
-            ]
+        facets = {
+            dimension: {str(value): count for value, count in counts.items()}
+            for dimension, counts in index.facets(selection, base).items()
+        }
         
-        total = len(filtered)
+        total = len(rows)
         start = (page - 1) * page_size
         end = start + page_size
         
-        return filtered[start:end], total
+        return [snapshot.columns.to_fund(i) for i in rows[start:end]], total, facets
     
     def get_fund_by_isin(self, isin: str) -> Optional[Fund]:
         """Get a single fund by ISIN."""
-        for fund in self.funds:
-            if fund.isin == isin:
-                return fund
-        return None
+        snapshot = self._universe.snapshot()
+        position = snapshot.columns.position(isin)
+        return snapshot.columns.to_fund(position) if position is not None else None
+    
+    def get_funds_by_isins(self, isins: List[str], with_scores: bool = False) -> tuple[List[Fund], List[str]]:
+        """
+        Resolve many ISINs in one call, in request order (duplicates once).
+        Returns (funds, missing ISINs).
+        """
+        scored = self._score_universe() if with_scores else None
+        columns = scored.columns if scored else self._universe.snapshot().columns
+        
+        positions, missing = [], []
+        for isin in dict.fromkeys(isins):
+            position = columns.position(isin)
+            if position is None:
+                missing.append(isin)
+            else:
+                positions.append(position)
+        
+        if scored:
+            return scored.funds_at(positions), missing
+        return [columns.to_fund(i) for i in positions], missing
+    
+    def get_universe_stats(self) -> dict:
+        """Universe totals and distributions, read off the filter index"""
+        snapshot = self._universe.snapshot()
+        facets = snapshot.filter_index.facets({})
+        standard = int(snapshot.columns.is_standard_isin.sum())
+        platforms = sorted(facets["platform"].items(), key=lambda x: x[1], reverse=True)
+        return {
+            "total_funds": snapshot.columns.size,
+            "standard_isin_funds": standard,
+            "special_funds": snapshot.columns.size - standard,
+            "sri_distribution": facets["sri"],
+            "asset_class_distribution": facets["asset_class"],
+            "top_platforms": dict(platforms[:10])
+        }
+    
+    def get_score_cache_stats(self) -> dict:
+        """Hit/miss counters of the brain score cache"""
+        return self._brain.score_cache.stats()
+    
+    def _score_universe(self) -> ScoredUniverse:
+        """
+        Per-request scoring view over the shared universe.
+        Scores live in the view, the shared columns are never mutated.
+        """
+        return self._brain.score_universe(self._universe.snapshot().columns)
     
     def get_top_week_investments(self, limit: int = 20) -> List[Fund]:
         """Get top investments of the week based on risk-adjusted performance."""
-        return self._brain.get_top_week_funds(self.funds, limit)
+        scored = self._score_universe()
+        order = top_k_indices(scored.scores.top_week_score, limit)
+        return scored.funds_at(order)
     
     def get_ranked_funds(
         self,
@@ -326,115 +429,354 @@ class TroncCommun:
         horizon: InvestmentHorizon = InvestmentHorizon.MEDIUM,
         limit: int = 100
     ) -> List[Fund]:
-        """Get funds ranked by fundamental score."""
-        scored_funds = self._brain.score_funds(
-            self.funds.copy(),
-            target_sri=target_sri,
-            horizon=horizon
-        )
-        return scored_funds[:limit]
+        """
+        Get funds ranked by fundamental score.
+        Scoring and top-K selection run on the column arrays; Fund models
+        are only built for the returned rows.
+        """
+        scored = self._score_universe()
+        order = top_k_indices(scored.scores.score, limit)
+        return scored.funds_at(order)
     
     def suggest_portfolio(self, request: PortfolioRequest) -> PortfolioSuggestion:
         """
         Generate a portfolio suggestion based on user requirements.
         
+        The fund selection and percentages come from the plan of the request's
+        risk profile (see _build_portfolio_plan); only the amounts and the
+        explanation are computed per request.
+        """
+        profile = (request.target_sri, request.sri_tolerance, request.horizon, request.allocation_method)
+        plan = self._portfolio_plan(profile)
+        
+        allocations = plan.allocations(request.amount)
+        explanation = self._generate_explanation(request, allocations, plan.average_sri, plan.allocation_method)
+        
+        return PortfolioSuggestion(
+            allocations=allocations,
+            total_amount=request.amount,
+            average_sri=round(plan.average_sri, 2),
+            num_funds=len(allocations),
+            asset_class_distribution=dict(plan.asset_class_distribution),
+            explanation=explanation,
+            average_confidence=round(plan.average_confidence, 2),
+            consensus_summary=plan.consensus_summary
+        )
+    
+    def backtest_portfolio(self, request: BacktestRequest) -> BacktestResult:
+        """
+        Simulate a risk profile's suggested allocation (or explicit weights)
+        over past NAV histories, rebalanced at the requested frequency.
+        Raises ValueError for a range without at least two trading days.
+        """
+        end_date = request.end_date or date.today()
+        start_date = request.start_date or end_date - timedelta(days=365 * self.BACKTEST_YEARS)
+        if start_date >= end_date:
+            raise ValueError(f"start_date ({start_date}) must be before end_date ({end_date})")
+        # One daily return needs two quotes
+        if np.busday_count(start_date, end_date + timedelta(days=1)) < 2:
+            raise ValueError(f"No trading days to backtest between {start_date} and {end_date}")
+        
+        weights = self._requested_weights(request)
+        returns = load_return_matrix(self._provider, list(weights), start_date, end_date)
+        equity, metrics = backtest(returns.returns, returns.dates, list(weights.values()), request.rebalance)
+        
+        sharpe = metrics.sharpe_ratio[0]
+        return BacktestResult(
+            start_date=start_date,
+            end_date=end_date,
+            rebalance=request.rebalance,
+            weights=weights,
+            dates=returns.dates.tolist(),
+            equity=np.round(equity[1:, 0] * request.initial_amount, 2).tolist(),
+            total_return=round(float(metrics.total_return[0]), 2),
+            annualized_return=round(float(metrics.annualized_return[0]), 2),
+            annualized_volatility=round(float(metrics.annualized_volatility[0]), 2),
+            max_drawdown=round(float(metrics.max_drawdown[0]), 2),
+            sharpe_ratio=None if np.isnan(sharpe) else round(float(sharpe), 2)
+        )
+    
+    def project_portfolio(self, request: ProjectionRequest) -> ProjectionResult:
+        """
+        Monte Carlo projection of a risk profile's suggested allocation (or
+        explicit weights) over the horizon, bootstrapped from the last
+        PROJECTION_HISTORY_YEARS of NAV history (see core.projection).
+        """
+        weights = self._requested_weights(request)
+        years = request.years or HORIZON_YEARS[request.horizon]
+        history_end = date.today()
+        history_start = history_end - timedelta(days=365 * self.PROJECTION_HISTORY_YEARS)
+        key = allocation_key(weights)
+        
+        def compute() -> Projection:
+            returns = load_return_matrix(self._provider, list(weights), history_start, history_end)
+            equity, _ = backtest(returns.returns, returns.dates, list(weights.values()), RebalanceFrequency.MONTHLY)
+            return project(equity[1:, 0] / equity[:-1, 0] - 1, years, seed=int(key, 16))
+        
+        projection = self._projections.get_or_compute(history_end, (key, years), compute)
+        amount = request.initial_amount
+        
+        return ProjectionResult(
+            horizon=request.horizon,
+            years=years,
+            paths=projection.paths,
+            initial_amount=amount,
+            weights=weights,
+            history_start=history_start,
+            history_end=history_end,
+            probability_of_loss=round(projection.probability_of_loss, 2),
+            bands=[
+                ProjectionBand(
+                    percentile=percentile,
+                    final_value=round(float(projection.final_values[i] * amount), 2),
+                    annualized_return=round(float(projection.annualized_returns[i]), 2),
+                    max_drawdown=round(float(projection.max_drawdowns[i]), 2)
+                )
+                for i, percentile in enumerate(PERCENTILES)
+            ],
+            yearly_values={
+                percentile: np.round(projection.yearly_values[:, i] * amount, 2).tolist()
+                for i, percentile in enumerate(PERCENTILES)
+            }
+        )
+    
+    def get_projection_stats(self) -> dict:
+        """Hit/miss counters of the projection cache"""
+        return self._projections.stats()
+    
+    def _requested_weights(self, request) -> Dict[str, float]:
+        """Explicit weights of a backtest/projection request, else its profile's plan"""
+        if request.weights is not None:
+            return dict(request.weights)
+        profile = (request.target_sri, request.sri_tolerance, request.horizon, request.allocation_method)
+        plan = self._portfolio_plan(profile)
+        return {f.isin: p for f, p in zip(plan.funds, plan.allocation_percents)}
+    
+    def backtest_profiles(
+        self,
+        profiles: List[Profile],
+        start_date: date,
+        end_date: date,
+        rebalance: RebalanceFrequency = RebalanceFrequency.MONTHLY
+    ) -> tuple[np.ndarray, BacktestMetrics]:
+        """
+        Backtest the suggested allocation of many risk profiles in one pass
+        (to compare brain or weight changes). Returns the equity curves
+        (dates + 1, profiles) starting at 1 and the metrics per profile.
+        """
+        plans = [self._portfolio_plan(profile) for profile in profiles]
+        isins = list(dict.fromkeys(f.isin for plan in plans for f in plan.funds))
+        column = {isin: j for j, isin in enumerate(isins)}
+        
+        weights = np.zeros((len(plans), len(isins)))
+        for i, plan in enumerate(plans):
+            for fund, percent in zip(plan.funds, plan.allocation_percents):
+                weights[i, column[fund.isin]] = percent
+        
+        returns = load_return_matrix(self._provider, isins, start_date, end_date)
+        return backtest(returns.returns, returns.dates, weights, rebalance)
+    
+    def warm_portfolio_plans(self) -> None:
+        """Compute the portfolio plans of every risk profile for the current version"""
+        self._portfolio_plans.warm(self._plan_version(), lambda profile: self._build_portfolio_plan(*profile))
+    
+    def get_portfolio_plan_stats(self) -> dict:
+        """Hit/miss counters of the portfolio plan cache"""
+        return self._portfolio_plans.stats()
+    
+    def _plan_version(self) -> tuple:
+        """Everything a plan depends on besides the profile (NAV windows end today)"""
+        return (
+            self._universe.version, self._brain.brain_id, self._brain.version,
+            self._weights_store.version, date.today()
+        )
+    
+    def _plan_key(self, profile: Profile) -> tuple:
+        """
+        Cache key of a profile's plan. Optimized plans also depend on whether
+        the risk model is published (they are redone once it is); score plans
+        never look at it.
+        """
+        if profile[3] == AllocationMethod.SCORE:
+            return profile
+        return (*profile, self._risk_models.current(self._risk_model_version()) is not None)
+    
+    def _risk_model_version(self) -> tuple:
+        return (self._universe.version, date.today())
+    
+    def _nav_window(self) -> tuple[date, date]:
+        end_date = date.today()
+        return end_date - timedelta(days=self.NAV_HISTORY_DAYS), end_date
+    
+    def _build_risk_model(self, version: tuple) -> FactorRiskModel:
+        """Factor model over every fund's NAV history (runs in the background)"""
+        columns = self._universe.columns
+        returns = load_return_matrix(self._provider, list(columns.isin), *self._nav_window())
+        return FactorRiskModel.from_returns(returns, version)
+    
+    def get_risk_model(self) -> Optional[FactorRiskModel]:
+        """
+        Current universe risk model, None while it is being built. The first
+        call of the day starts the build: only optimized allocations call it.
+        """
+        self._universe.load()
+        return self._risk_models.get(self._risk_model_version())
+    
+    def _portfolio_plan(self, profile: Profile) -> PortfolioPlan:
+        self._universe.load()
+        version = self._plan_version()
+        if not self._portfolio_plans.is_current(version):
+            # New data or weights: pre-warm the other profiles in the background
+            self._schedule_plan_warmup(version)
+        return self._portfolio_plans.get_or_compute(version, self._plan_key(profile), lambda: self._build_portfolio_plan(*profile))
+    
+    def _schedule_plan_warmup(self, version: tuple) -> None:
+        with self._warmup_lock:
+            if self._warmup_version == version:
+                return
+            self._warmup_version = version
+        threading.Thread(target=self.warm_portfolio_plans, name="portfolio-plan-warmup", daemon=True).start()
+    
+    def _build_portfolio_plan(
+        self,
+        target_sri: int,
+        sri_tolerance: int,
+        horizon: InvestmentHorizon,
+        allocation_method: AllocationMethod = AllocationMethod.SCORE
+    ) -> PortfolioPlan:
+        """
+        Amount-independent portfolio suggestion for a risk profile.
+        
         Algorithm:
         1. Filter funds by SRI range (target +/- tolerance)
         2. Score remaining funds with Cerveau Fondamental
         3. Select top funds ensuring diversification
-        4. Allocate amounts based on scores
+        4. Allocate percentages based on scores
+        Optimizer methods replace 3-4 with optimize_weights over the NAV
+        return covariance of the best candidates.
         """
-        sri_min = max(1, request.target_sri - request.sri_tolerance)
-        sri_max = min(7, request.target_sri + request.sri_tolerance)
-        
-        eligible_funds = [
-            f for f in self.funds
-            if sri_min <= f.sri <= sri_max and f.is_standard_isin
-        ]
+        sri_min = max(1, target_sri - sri_tolerance)
+        sri_max = min(7, target_sri + sri_tolerance)
         
-        scored_funds = self._brain.score_funds(
-            eligible_funds.copy(),
-            target_sri=request.target_sri,
-            horizon=request.horizon
+        scored = self._score_universe()
+        columns = scored.columns
+        eligible = np.flatnonzero(
+            (columns.sri >= sri_min) & (columns.sri <= sri_max) & columns.is_standard_isin
         )
+        order = eligible[np.argsort(-scored.scores.score[eligible], kind="stable")]
+        
+        optimized = None
+        if allocation_method != AllocationMethod.SCORE:
+            optimized = self._optimized_allocations(scored, order, horizon, allocation_method)
+        if optimized is None:
+            allocation_method = AllocationMethod.SCORE
+            selected = self._select_diversified_funds(columns, order, horizon)
+            selected_funds = scored.funds_at(order[selected])
+            funds, percents, amount_percents = self._calculate_allocations(selected_funds)
+        else:
+            funds, percents, amount_percents = optimized
         
-        selected_funds = self._select_diversified_funds(scored_funds, request.horizon)
-        
-        allocations = self._calculate_allocations(selected_funds, request.amount)
-        
-        avg_sri = sum(a.fund.sri * a.allocation_percent for a in allocations) / 100
+        avg_sri = sum(f.sri * p for f, p in zip(funds, percents)) / 100
         
         asset_distribution = {}
-        for alloc in allocations:
-            asset_class = alloc.fund.asset_class if isinstance(alloc.fund.asset_class, str) else alloc.fund.asset_class.value
-            asset_distribution[asset_class] = asset_distribution.get(asset_class, 0) + alloc.allocation_percent
+        for fund, percent in zip(funds, percents):
+            asset_class = fund.asset_class if isinstance(fund.asset_class, str) else fund.asset_class.value
+            asset_distribution[asset_class] = asset_distribution.get(asset_class, 0) + percent
         
         # Calculate average confidence and consensus summary
-        confidences = [a.fund.confidence for a in allocations if a.fund.confidence is not None]
+        confidences = [f.confidence for f in funds if f.confidence is not None]
         avg_confidence = sum(confidences) / len(confidences) if confidences else 0.85
         
         # Count priorities
         priority_counts = {"high": 0, "medium": 0, "low": 0}
-        for alloc in allocations:
-            if alloc.fund.priority:
-                priority_counts[alloc.fund.priority.value] = priority_counts.get(alloc.fund.priority.value, 0) + 1
+        for fund in funds:
+            if fund.priority:
+                priority_counts[fund.priority.value] = priority_counts.get(fund.priority.value, 0) + 1
         
         consensus_summary = f"{priority_counts['high']} fonds priorite haute, {priority_counts['medium']} moyenne, {priority_counts['low']} basse"
         
-        explanation = self._generate_explanation(request, allocations, avg_sri)
-        
-        return PortfolioSuggestion(
-            allocations=allocations,
-            total_amount=request.amount,
-            average_sri=round(avg_sri, 2),
-            num_funds=len(allocations),
+        return PortfolioPlan(
+            funds=funds,
+            allocation_percents=percents,
+            amount_percents=amount_percents,
+            average_sri=avg_sri,
             asset_class_distribution=asset_distribution,
-            explanation=explanation,
-            average_confidence=round(avg_confidence, 2),
-            consensus_summary=consensus_summary
+            average_confidence=avg_confidence,
+            consensus_summary=consensus_summary,
+            allocation_method=allocation_method
         )
     
     def _select_diversified_funds(
         self,
-        scored_funds: List[Fund],
+        columns: FundColumns,
+        order: np.ndarray,
         horizon: InvestmentHorizon
-    ) -> List[Fund]:
+    ) -> List[int]:
         """
         Select funds ensuring diversification across asset classes.
+        Works on the candidate rows sorted by score; returns positions in `order`.
         """
-        selected = []
-        asset_class_counts: dict[AssetClass, int] = {}
-        max_per_class = 4
-        
-        target_classes = self._get_target_asset_classes(horizon)
-        
-        for asset_class in target_classes:
-            class_funds = [f for f in scored_funds if f.asset_class == asset_class]
-            for fund in class_funds[:2]:
-                if fund not in selected:
-                    selected.append(fund)
-                    asset_class_counts[asset_class] = asset_class_counts.get(asset_class, 0) + 1
-        
-        for fund in scored_funds:
-            if len(selected) >= self.MAX_FUNDS_IN_PORTFOLIO:
-                break
-            if fund in selected:
-                continue
-            
-            class_count = asset_class_counts.get(fund.asset_class, 0)
-            if class_count < max_per_class:
-                selected.append(fund)
-                asset_class_counts[fund.asset_class] = class_count + 1
-        
-        while len(selected) < self.MIN_FUNDS_IN_PORTFOLIO and scored_funds:
-            for fund in scored_funds:
-                if fund not in selected:
-                    selected.append(fund)
-                    break
-            else:
-                break
+        target_classes = [ASSET_CLASSES.index(ac.value) for ac in self._get_target_asset_classes(horizon)]
+        return select_diversified(
+            columns,
+            order,
+            target_classes,
+            max_funds=self.MAX_FUNDS_IN_PORTFOLIO,
+            min_funds=self.MIN_FUNDS_IN_PORTFOLIO,
+            max_per_class=self.MAX_FUNDS_PER_ASSET_CLASS,
+            max_per_company=self.MAX_FUNDS_PER_COMPANY,
+            max_per_platform=self.MAX_FUNDS_PER_PLATFORM
+        )
+    
+    def _optimized_allocations(
+        self,
+        scored: ScoredUniverse,
+        order: np.ndarray,
+        horizon: InvestmentHorizon,
+        method: AllocationMethod
+    ) -> Optional[tuple[List[Fund], List[float], List[float]]]:
+        """
+        Covariance-aware allocation over the best-scored candidates (risk
+        parity weights the diversified selection instead).
+        Covariances come from the universe risk model, or while it is being
+        built from a Ledoit-Wolf estimate on the candidates' NAV histories.
+        Returns (funds, rounded percents, percents the amounts use), largest
+        weight first, or None when too few funds have a NAV history.
+        """
+        if method == AllocationMethod.RISK_PARITY:
+            positions = np.sort(self._select_diversified_funds(scored.columns, order, horizon))
+        else:
+            positions = np.arange(min(len(order), self.OPTIMIZER_CANDIDATES))
+        rows = order[positions]
+        isins = [scored.columns.isin[r] for r in rows]
+        
+        model = self.get_risk_model()
+        if model is not None:
+            model_rows = model.rows(isins)
+            keep = np.flatnonzero(model_rows >= 0)
+            cov = model.covariance(model_rows[keep])
+        else:
+            returns = load_return_matrix(self._provider, isins, *self._nav_window())
+            keep = np.flatnonzero(returns.observations >= self.MIN_NAV_OBSERVATIONS)
+            cov = returns.subset(keep).shrunk_covariance()
+        if len(keep) < self.MIN_FUNDS_IN_PORTFOLIO:
+            self.logger.warning(f"{len(keep)} funds with NAV history, {method.value} falls back to score allocation")
+            return None
+        rows = rows[keep]
+        
+        weights = optimize_weights(
+            method,
+            cov,
+            scored.scores.score[rows],
+            cap=self.MAX_ALLOCATION_PER_FUND,
+            max_funds=self.MAX_FUNDS_IN_PORTFOLIO,
+            min_funds=self.MIN_FUNDS_IN_PORTFOLIO
+        )
         
-        return selected
+        picked = np.flatnonzero(weights)
+        picked = picked[np.argsort(-weights[picked], kind="stable")]
+        amount_percents = (weights[picked] * 100).tolist()
+        return scored.funds_at(rows[picked]), [round(p, 2) for p in amount_percents], amount_percents
     
     def _get_target_asset_classes(self, horizon: InvestmentHorizon) -> List[AssetClass]:
         """Get prioritized asset classes based on investment horizon."""
@@ -447,19 +789,19 @@ class TroncCommun:
     
     def _calculate_allocations(
         self,
-        funds: List[Fund],
-        total_amount: float
-    ) -> List[FundAllocation]:
+        funds: List[Fund]
+    ) -> tuple[List[Fund], List[float], List[float]]:
         """
         Calculate allocation percentages based on fundamental scores.
         Uses score-weighted allocation with max cap per fund.
+        Returns (allocated funds, rounded percents, percents the amounts use).
         """
         if not funds:
-            return []
+            return [], [], []
         
         total_score = sum(f.fundamental_score or 50 for f in funds)
         
-        allocations = []
+        allocated, percents, amount_percents = [], [], []
         remaining_percent = 100.0
         
         for fund in funds:
@@ -470,28 +812,26 @@ class TroncCommun:
             capped_percent = min(capped_percent, remaining_percent)
             
             if capped_percent > 0:
-                allocations.append(FundAllocation(
-                    fund=fund,
-                    allocation_percent=round(capped_percent, 2),
-                    amount_eur=round(total_amount * capped_percent / 100, 2)
-                ))
+                allocated.append(fund)
+                percents.append(round(capped_percent, 2))
+                amount_percents.append(capped_percent)
                 remaining_percent -= capped_percent
         
-        if remaining_percent > 0.01 and allocations:
-            per_fund_extra = remaining_percent / len(allocations)
-            for alloc in allocations:
-                new_percent = min(alloc.allocation_percent + per_fund_extra, self.MAX_ALLOCATION_PER_FUND * 100)
-                extra = new_percent - alloc.allocation_percent
-                alloc.allocation_percent = round(new_percent, 2)
-                alloc.amount_eur = round(total_amount * alloc.allocation_percent / 100, 2)
+        if remaining_percent > 0.01 and allocated:
+            per_fund_extra = remaining_percent / len(allocated)
+            for i, percent in enumerate(percents):
+                new_percent = min(percent + per_fund_extra, self.MAX_ALLOCATION_PER_FUND * 100)
+                percents[i] = round(new_percent, 2)
+                amount_percents[i] = percents[i]
         
-        return allocations
+        return allocated, percents, amount_percents
     
     def _generate_explanation(
         self,
         request: PortfolioRequest,
         allocations: List[FundAllocation],
-        avg_sri: float
+        avg_sri: float,
+        allocation_method: AllocationMethod = AllocationMethod.SCORE
     ) -> str:
         """Generate a human-readable explanation of the portfolio."""
         horizon_text = {
@@ -517,4 +857,15 @@ class TroncCommun:
             f"Qualite de Gestion (40%), Valorisation (30%), et Stabilite (30%)."
         )
         
+        method_text = {
+            AllocationMethod.MIN_VARIANCE: "minimisation de la variance",
+            AllocationMethod.RISK_PARITY: "parite de risque",
+            AllocationMethod.SCORE_TILTED: "minimisation de la variance orientee vers les meilleurs scores"
+        }
+        if allocation_method in method_text:
+            explanation += (
+                f" Les poids sont optimises par {method_text[allocation_method]} "
+                f"sur la covariance des rendements ({self.NAV_HISTORY_DAYS} jours, max 20% par fonds)."
+            )
+        
         return explanation
@@ -18,12 +18,15 @@ from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
+import numpy as np
+
 from ..models.brain import (
     BrainRegistryItem, BrainOutput, FundScoreEntry,
     FundScoreComposite, TrunkRankingEntry, TrunkOutput,
     AdaptiveWeights, ContradictionLog, ConsensusLevel,
     BrainType, BrainRole, BrainHorizon
 )
+from .ranking import RankingIndex
 
 
 class BrainRegistryLoader:
@@ -54,7 +57,7 @@ class BrainRegistryLoader:
                 self._registry[brain_item.brain_id] = brain_item
             
             self.logger.info(f"Loaded {len(self._registry)} brains from registry")
-            
+        
         except FileNotFoundError:
             self.logger.warning(f"Registry file not found: {self._registry_path}")
             self._registry = {}
@@ -398,11 +401,13 @@ class TrunkEngine:
                 sri=sri
             ))
         
-        # Step 4: Generate global ranking
-        sorted_scores = sorted(composite_scores, key=lambda x: x.score_composite, reverse=True)
+        # Step 4: Generate global ranking. Every fund is ranked (the allocation
+        # view filters it by SRI), so this is a full stable sort, not a top-K
+        composites = np.fromiter((c.score_composite for c in composite_scores), dtype=np.float64, count=len(composite_scores))
+        order = np.argsort(-composites, kind="stable")
         
         ranking: List[TrunkRankingEntry] = []
-        for rank, score in enumerate(sorted_scores, start=1):
+        for rank, score in enumerate((composite_scores[i] for i in order), start=1):
             ranking.append(TrunkRankingEntry(
                 fund_id=score.fund_id,
                 score_composite=score.score_composite,
@@ -414,7 +419,7 @@ class TrunkEngine:
         if self._contradiction_logs:
             self.logger.warning(f"Detected {len(self._contradiction_logs)} contradictions")
         
-        return TrunkOutput(
+        trunk_output = TrunkOutput(
             timestamp=timestamp,
             fund_composite_scores=composite_scores,
             global_ranking=ranking,
@@ -422,6 +427,9 @@ class TrunkEngine:
             active_brains=list(active_brain_ids),
             total_funds=len(composite_scores)
         )
+        self.ranking_index(trunk_output)
+        self.fund_positions(trunk_output)
+        return trunk_output
     
     def _normalize_weights_for_active(self, active_brain_ids: Set[str]) -> Dict[str, float]:
         """Normalize weights for active brains only"""
@@ -440,6 +448,31 @@ class TrunkEngine:
         
         return {bid: w/total for bid, w in active_weights.items()}
     
+    def ranking_index(self, trunk_output: TrunkOutput) -> RankingIndex:
+        """Secondary indexes of a TrunkOutput, built on first use and kept on it"""
+        index = trunk_output._ranking_index
+        if index is None:
+            ranking = trunk_output.global_ranking
+            index = RankingIndex(
+                scores=[r.score_composite for r in ranking],
+                sris=[r.sri for r in ranking]
+            )
+            trunk_output._ranking_index = index
+        return index
+    
+    def fund_positions(self, trunk_output: TrunkOutput) -> Dict[str, int]:
+        """fund_id -> position in fund_composite_scores, built on first use and kept on it"""
+        positions = trunk_output._fund_positions
+        if positions is None:
+            positions = {c.fund_id: i for i, c in enumerate(trunk_output.fund_composite_scores)}
+            trunk_output._fund_positions = positions
+        return positions
+    
+    def get_composite(self, trunk_output: TrunkOutput, fund_id: str) -> Optional[FundScoreComposite]:
+        """Composite score of one fund (O(1))"""
+        position = self.fund_positions(trunk_output).get(fund_id)
+        return trunk_output.fund_composite_scores[position] if position is not None else None
+    
     def get_ranking(
         self,
         trunk_output: TrunkOutput,
@@ -455,20 +488,23 @@ class TrunkEngine:
             min_score: Minimum composite score
         """
         ranking = trunk_output.global_ranking
+        end = len(ranking)
         
+        # Ranking is sorted by score: min_score is a bisect, top_n a slice
         if min_score is not None:
-            ranking = [r for r in ranking if r.score_composite >= min_score]
+            end = self.ranking_index(trunk_output).count_at_least(min_score)
         
         if top_n is not None:
-            ranking = ranking[:top_n]
+            end = min(end, top_n)
         
-        return ranking
+        return ranking[:end]
     
     def get_funds_for_allocation(
         self,
         trunk_output: TrunkOutput,
         sri_target: int,
-        tolerance: float = 0.5
+        tolerance: float = 0.5,
+        limit: Optional[int] = None
     ) -> List[TrunkRankingEntry]:
         """
         Get funds eligible for allocation based on SRI target.
@@ -479,14 +515,15 @@ class TrunkEngine:
             trunk_output: Output from process_brain_outputs
             sri_target: Target SRI (1-7)
             tolerance: Tolerance around target (e.g., 0.5 means +/- 0.5)
+            limit: Limit to the best N eligible funds
         """
         sri_min = max(1, int(sri_target - tolerance))
         sri_max = min(7, int(sri_target + tolerance + 0.99))  # Round up
         
-        eligible = [
-            r for r in trunk_output.global_ranking
-            if sri_min <= r.sri <= sri_max
-        ]
+        # Merge of the per-SRI buckets, already in ranking order
+        ranking = trunk_output.global_ranking
+        positions = self.ranking_index(trunk_output).sri_range_positions(sri_min, sri_max, limit)
+        eligible = [ranking[i] for i in positions]
         
         self.logger.debug(f"Found {len(eligible)} funds for SRI {sri_target} (+/- {tolerance})")
         return eligible
@@ -0,0 +1,341 @@
+"""
+Columnar Tronc Commun Engine - fund x brain matrix aggregation
+
+Same pipeline and same TrunkOutput as TrunkEngine, but all BrainOutputs are
+packed into dense (funds x brains) score and confidence matrices (NaN where
+a brain did not score a fund). Composites, consensus sigma/levels and
+contradiction pairs are then computed column-wise instead of per fund.
+
+Brain columns keep the order of the brain outputs and funds keep their
+first-appearance order, so results match the per-fund engine exactly.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import statistics
+
+import numpy as np
+
+from ..models.brain import (
+    BrainOutput, FundScoreComposite, TrunkRankingEntry, TrunkOutput,
+    ContradictionLog, ConsensusLevel
+)
+from ..brains.fundamental import _py_round
+from .ranking import RankingIndex
+from .trunk_engine import TrunkEngine, ConsensusAnalyzer
+
+
+# Consensus level codes, by increasing sigma
+CONSENSUS_ORDER = [
+    ConsensusLevel.STRONG, ConsensusLevel.MODERATE,
+    ConsensusLevel.WEAK, ConsensusLevel.DIVERGENCE
+]
+
+
+@dataclass
+class BrainScoreMatrix:
+    """
+    Dense fund x brain view of a list of BrainOutputs.
+    scores[i, b] / confidences[i, b] are NaN when brain b did not score fund i.
+    """
+    fund_ids: List[str]
+    brain_ids: List[str]
+    scores: np.ndarray
+    confidences: np.ndarray
+    fund_index: Dict[str, int]  # fund_id -> row
+    
+    @classmethod
+    def from_outputs(cls, brain_outputs: List[BrainOutput]) -> "BrainScoreMatrix":
+        brain_index: Dict[str, int] = {}
+        for output in brain_outputs:
+            brain_index.setdefault(output.brain_id, len(brain_index))
+        
+        fund_index: Dict[str, int] = {}
+        cells: List[Tuple[int, int, float, float]] = []
+        for output in brain_outputs:
+            b = brain_index[output.brain_id]
+            for fund_score in output.fund_scores:
+                i = fund_index.setdefault(fund_score.fund_id, len(fund_index))
+                cells.append((i, b, fund_score.score, fund_score.confidence))
+        
+        shape = (len(fund_index), len(brain_index))
+        scores = np.full(shape, np.nan)
+        confidences = np.full(shape, np.nan)
+        if cells:
+            rows, cols, values, confs = zip(*cells)
+            # Later entries win, like the dict assignment of AggregationService
+            scores[rows, cols] = values
+            confidences[rows, cols] = confs
+        
+        return cls(list(fund_index), list(brain_index), scores, confidences, fund_index)
+    
+    @property
+    def present(self) -> np.ndarray:
+        return ~np.isnan(self.scores)
+
+
+@dataclass
+class MatrixAggregate:
+    """
+    Weight-independent part of a trunk run: the matrix, the contradictions
+    and one FundScoreComposite per fund with everything but score_composite.
+    Reused as long as the brain outputs and the SRI map do not change.
+    """
+    brain_outputs: List[BrainOutput]
+    fund_sri_map: Dict[str, int]
+    matrix: BrainScoreMatrix
+    composites: List[FundScoreComposite]
+    sri: np.ndarray
+    contradictions: List[ContradictionLog]
+    
+    def matches(self, brain_outputs: List[BrainOutput], fund_sri_map: Dict[str, int]) -> bool:
+        """Same output objects (brain outputs are never mutated) and same SRI map"""
+        return (
+            fund_sri_map is self.fund_sri_map
+            and len(brain_outputs) == len(self.brain_outputs)
+            and all(a is b for a, b in zip(brain_outputs, self.brain_outputs))
+        )
+
+
+class CompositeScores(Sequence):
+    """
+    TrunkOutput.fund_composite_scores of a columnar run: the aggregate's
+    weight-independent composites with this run's score_composite. A
+    FundScoreComposite is only built when a fund is accessed (once), so a
+    weight change does not copy every composite.
+    """
+    
+    def __init__(self, base: List[FundScoreComposite], scores: List[float]):
+        self.base = base
+        self._scores = scores
+        self._built: Dict[int, FundScoreComposite] = {}
+    
+    def __len__(self) -> int:
+        return len(self.base)
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        composite = self._built.get(i)
+        if composite is None:
+            if not 0 <= i < len(self):
+                raise IndexError(i)
+            composite = self.base[i].model_copy(update={"score_composite": self._scores[i]})
+            self._built[i] = composite
+        return composite
+
+
+class ColumnarTrunkEngine(TrunkEngine):
+    """
+    TrunkEngine computing on a BrainScoreMatrix.
+    Registry, weights and the filtered views are inherited unchanged.
+    
+    Brain outputs do not depend on trunk weights: the matrix and everything
+    derived from it are kept between runs, so a weight or activation change
+    only redoes the weighted composite and the ranking.
+    """
+    
+    def __init__(self, registry_path: Optional[str] = None):
+        super().__init__(registry_path)
+        self._aggregate: Optional[MatrixAggregate] = None
+    
+    def process_brain_outputs(
+        self,
+        brain_outputs: List[BrainOutput],
+        fund_sri_map: Optional[Dict[str, int]] = None
+    ) -> TrunkOutput:
+        """Vectorized version of TrunkEngine.process_brain_outputs"""
+        timestamp = datetime.utcnow().isoformat()
+        
+        if fund_sri_map:
+            self._fund_sri_cache = fund_sri_map
+        
+        aggregate = self._aggregate
+        if aggregate is None or not aggregate.matches(brain_outputs, self._fund_sri_cache):
+            aggregate = self._build_aggregate(brain_outputs, timestamp)
+            self._aggregate = aggregate
+        else:
+            self.logger.debug("Brain outputs unchanged, reusing the aggregated matrix")
+        
+        return self._weighted_output(aggregate, timestamp)
+    
+    def _build_aggregate(self, brain_outputs: List[BrainOutput], timestamp: str) -> MatrixAggregate:
+        matrix = BrainScoreMatrix.from_outputs(brain_outputs)
+        sigma, levels = self._consensus_levels(matrix)
+        contradictions = self._contradictions(matrix, timestamp)
+        
+        if contradictions:
+            self.logger.warning(f"Detected {len(contradictions)} contradictions")
+        
+        composites = self._build_composites(matrix, sigma, levels)
+        return MatrixAggregate(
+            brain_outputs=list(brain_outputs),
+            fund_sri_map=self._fund_sri_cache,
+            matrix=matrix,
+            composites=composites,
+            sri=np.array([c.sri for c in composites], dtype=np.int8),
+            contradictions=contradictions
+        )
+    
+    def _build_composites(
+        self,
+        matrix: BrainScoreMatrix,
+        sigma: np.ndarray,
+        levels: np.ndarray
+    ) -> List[FundScoreComposite]:
+        """
+        One FundScoreComposite per fund, score_composite left neutral and set
+        per weighting (values are already validated: construct without re-validating)
+        """
+        brain_ids = matrix.brain_ids
+        present = matrix.present.tolist()
+        scores = matrix.scores.tolist()
+        confidences = matrix.confidences.tolist()
+        rounded_sigma = _py_round(sigma, 2).tolist()
+        
+        composites = []
+        for i, fund_id in enumerate(matrix.fund_ids):
+            row = present[i]
+            composites.append(FundScoreComposite.model_construct(
+                fund_id=fund_id,
+                score_composite=50.0,
+                scores_by_brain={bid: scores[i][b] for b, bid in enumerate(brain_ids) if row[b]},
+                confidences_by_brain={bid: confidences[i][b] for b, bid in enumerate(brain_ids) if row[b]},
+                consensus_sigma=rounded_sigma[i],
+                consensus_level=CONSENSUS_ORDER[levels[i]],
+                sri=self._fund_sri_cache.get(fund_id, 4)
+            ))
+        return composites
+    
+    def _weighted_output(self, aggregate: MatrixAggregate, timestamp: str) -> TrunkOutput:
+        """Composite scores and ranking for the current weights"""
+        active_brain_ids = self._registry.get_active_brain_ids()
+        weights = self._normalize_weights_for_active(active_brain_ids)
+        
+        composite = self._composite_scores(aggregate.matrix, weights)
+        self._contradiction_logs = aggregate.contradictions
+        
+        scores = composite.tolist()
+        composite_scores = CompositeScores(aggregate.composites, scores)
+        
+        # Full ranking: stable sort of every fund
+        order = np.argsort(-composite, kind="stable")
+        ranking = [
+            TrunkRankingEntry.model_construct(
+                fund_id=aggregate.matrix.fund_ids[i],
+                score_composite=scores[i],
+                sri=aggregate.composites[i].sri,
+                rank=rank
+            )
+            for rank, i in enumerate(order.tolist(), start=1)
+        ]
+        
+        # Not validated: the lazy composites would be copied into a list
+        trunk_output = TrunkOutput.model_construct(
+            timestamp=timestamp,
+            fund_composite_scores=composite_scores,
+            global_ranking=ranking,
+            brain_weights_used=weights,
+            active_brains=list(active_brain_ids),
+            total_funds=len(composite_scores)
+        )
+        trunk_output._ranking_index = RankingIndex(scores=composite[order], sris=aggregate.sri[order])
+        trunk_output._fund_positions = aggregate.matrix.fund_index
+        return trunk_output
+    
+    def get_consensus_stats(self, trunk_output: TrunkOutput) -> Dict[str, int]:
+        """Consensus levels do not depend on weights: counted on the shared composites"""
+        composites = trunk_output.fund_composite_scores
+        if not isinstance(composites, CompositeScores):
+            return super().get_consensus_stats(trunk_output)
+        
+        stats = {level.value: 0 for level in ConsensusLevel}
+        for composite in composites.base:
+            stats[composite.consensus_level.value] += 1
+        return stats
+    
+    def _composite_scores(self, matrix: BrainScoreMatrix, weights: Dict[str, float]) -> np.ndarray:
+        """
+        S_composite = sum(alpha_i * S_i * c_i) / sum(alpha_i * c_i), clipped to
+        [0, 100] and rounded. Accumulated brain by brain, in the same order as
+        CompositeScoreCalculator, so the floating point sums are identical.
+        """
+        n = len(matrix.fund_ids)
+        present = matrix.present
+        total_weighted_score = np.zeros(n)
+        total_weight = np.zeros(n)
+        
+        for b, brain_id in enumerate(matrix.brain_ids):
+            alpha = weights.get(brain_id, 0.0)
+            column = present[:, b]
+            total_weighted_score += np.where(column, alpha * matrix.scores[:, b] * matrix.confidences[:, b], 0.0)
+            total_weight += np.where(column, alpha * matrix.confidences[:, b], 0.0)
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            composite = np.clip(total_weighted_score / total_weight, 0.0, 100.0)
+        composite = np.where(total_weight == 0, 50.0, composite)
+        return _py_round(composite, 2)
+    
+    def _consensus_levels(self, matrix: BrainScoreMatrix) -> Tuple[np.ndarray, np.ndarray]:
+        """Sample standard deviation of the scores per fund and its ConsensusLevel code"""
+        present = matrix.present
+        counts = present.sum(axis=1)
+        values = np.where(present, matrix.scores, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = values.sum(axis=1) / counts
+            squares = np.where(present, (values - mean[:, None]) ** 2, 0.0).sum(axis=1)
+            sigma = np.sqrt(squares / (counts - 1))
+        sigma = np.where(counts < 2, 0.0, sigma)
+        
+        # statistics.stdev is exact; redo the rows where a last-ulp difference
+        # could move the 2-decimal rounding or cross a level threshold
+        thresholds = np.array([
+            ConsensusAnalyzer.SIGMA_STRONG, ConsensusAnalyzer.SIGMA_MODERATE, ConsensusAnalyzer.SIGMA_WEAK
+        ])
+        scaled = sigma * 100
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-6 * np.maximum(1.0, scaled)
+        near_threshold = (np.abs(sigma[:, None] - thresholds) <= 1e-9 * thresholds).any(axis=1)
+        for i in np.flatnonzero((near_tie | near_threshold) & (counts >= 2)):
+            row = matrix.scores[i]
+            sigma[i] = statistics.stdev(row[~np.isnan(row)].tolist())
+        
+        levels = np.searchsorted(thresholds, sigma, side="right").astype(np.int8)
+        return sigma, levels
+    
+    def _contradictions(self, matrix: BrainScoreMatrix, timestamp: str) -> List[ContradictionLog]:
+        """Brain pairs with score diff > threshold and both confidences high, per fund"""
+        brain_count = len(matrix.brain_ids)
+        pairs = [(b1, b2) for b1 in range(brain_count) for b2 in range(b1 + 1, brain_count)]
+        if not pairs:
+            return []
+        
+        first = np.array([p[0] for p in pairs])
+        second = np.array([p[1] for p in pairs])
+        scores, confidences = matrix.scores, matrix.confidences
+        diff = np.abs(scores[:, first] - scores[:, second])
+        confident = confidences > ConsensusAnalyzer.CONTRADICTION_CONFIDENCE_MIN
+        hits = (
+            (diff > ConsensusAnalyzer.CONTRADICTION_THRESHOLD)
+            & confident[:, first] & confident[:, second]
+        )
+        
+        # Row-major: funds in order, then pairs in (brain_1, brain_2) order
+        logs = []
+        for i, p in zip(*np.nonzero(hits)):
+            b1, b2 = pairs[p]
+            logs.append(ContradictionLog.model_construct(
+                fund_id=matrix.fund_ids[i],
+                brain_1=matrix.brain_ids[b1],
+                brain_2=matrix.brain_ids[b2],
+                score_1=float(scores[i, b1]),
+                score_2=float(scores[i, b2]),
+                confidence_1=float(confidences[i, b1]),
+                confidence_2=float(confidences[i, b2]),
+                score_diff=float(diff[i, p]),
+                timestamp=timestamp
+            ))
+        return logs
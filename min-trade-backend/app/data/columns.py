@@ -0,0 +1,141 @@
+"""
+Fund Columns - compact struct-of-arrays view of the fund universe
+
+Numeric fields live in NumPy arrays (NaN = missing), repeated strings
+(names, companies, labels, platforms) are interned into code arrays plus
+a string table. Scoring, filtering and ranking run on these arrays;
+pydantic Fund models are only built for the rows a response returns.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from ..models.fund import Fund, FundMetrics, AssetClass
+
+
+METRIC_FIELDS = list(FundMetrics.model_fields.keys())
+
+# FundData fields not available in the legacy Fund model (always missing for now)
+FUNDAMENTAL_FIELDS = ["expense_ratio", "aum", "pe_ratio"]
+
+ASSET_CLASSES = [ac.value for ac in AssetClass]
+
+
+def _intern(values: Sequence[Optional[str]]) -> tuple[np.ndarray, List[Optional[str]]]:
+    """Intern strings: returns (int32 codes, table). Missing values get code -1."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    return codes.astype(np.int32), list(uniques)
+
+
+def _to_float(values: Sequence[Optional[float]]) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+class FundColumns:
+    """
+    Struct-of-arrays fund table, one row per fund (row i == funds[i]).
+    Built once per FundUniverse data version and never mutated.
+    """
+    
+    def __init__(self, funds: List[Fund]):
+        n = len(funds)
+        self.size = n
+        
+        self.isin = np.array([f.isin for f in funds], dtype=object)
+        # ISIN -> row, built with the arrays so it always matches this version
+        self.positions: Dict[str, int] = {f.isin: i for i, f in enumerate(funds)}
+        self.description = np.array([f.description for f in funds], dtype=object)
+        self.sri = np.array([f.sri for f in funds], dtype=np.int8)
+        self.is_standard_isin = np.array([f.is_standard_isin for f in funds], dtype=bool)
+        
+        self.name_codes, self.names = _intern([f.name for f in funds])
+        self.company_codes, self.companies = _intern([f.management_company for f in funds])
+        self.label_codes, self.labels = _intern([f.label for f in funds])
+        
+        asset_class_index = {ac: i for i, ac in enumerate(ASSET_CLASSES)}
+        self.asset_class_codes = np.array(
+            [asset_class_index[f.asset_class if isinstance(f.asset_class, str) else f.asset_class.value] for f in funds],
+            dtype=np.int8
+        )
+        
+        # Platforms: CSR layout, row i owns platform_codes[platform_offsets[i]:platform_offsets[i + 1]]
+        lengths = np.array([len(f.available_platforms) for f in funds], dtype=np.int32)
+        self.platform_offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(lengths, out=self.platform_offsets[1:])
+        self.platform_codes, self.platforms = _intern([p for f in funds for p in f.available_platforms])
+        
+        self.has_metrics = np.array([f.metrics is not None for f in funds], dtype=bool)
+        self.metrics: Dict[str, np.ndarray] = {
+            field: _to_float([getattr(f.metrics, field) if f.metrics else None for f in funds])
+            for field in METRIC_FIELDS
+        }
+        self.fundamentals: Dict[str, np.ndarray] = {
+            field: np.full(n, np.nan) for field in FUNDAMENTAL_FIELDS
+        }
+        
+        for array in self._numeric_arrays():
+            array.flags.writeable = False
+        self._fingerprint: Optional[str] = None
+    
+    def _numeric_arrays(self) -> List[np.ndarray]:
+        return [
+            self.sri, self.is_standard_isin, self.asset_class_codes, self.has_metrics,
+            *self.metrics.values(), *self.fundamentals.values()
+        ]
+    
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the numeric columns (the scoring inputs), computed once"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for array in self._numeric_arrays():
+                digest.update(array.tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+    
+    def position(self, isin: str) -> Optional[int]:
+        """Row of an ISIN, None if unknown (O(1))"""
+        return self.positions.get(isin)
+    
+    @property
+    def asset_class(self) -> np.ndarray:
+        """Asset class values per row (object array of str)"""
+        return np.array(ASSET_CLASSES, dtype=object)[self.asset_class_codes]
+    
+    def _platforms_at(self, i: int) -> List[str]:
+        codes = self.platform_codes[self.platform_offsets[i]:self.platform_offsets[i + 1]]
+        return [self.platforms[c] for c in codes]
+    
+    def _metrics_at(self, i: int) -> Optional[FundMetrics]:
+        if not self.has_metrics[i]:
+            return None
+        values = {}
+        for field, column in self.metrics.items():
+            value = column[i]
+            values[field] = None if np.isnan(value) else float(value)
+        return FundMetrics.model_construct(**values)
+    
+    def to_fund(self, i: int, **scores) -> Fund:
+        """
+        Materialize row i as a pydantic Fund (API edge only).
+        Extra keyword arguments set score fields on the returned model.
+        """
+        i = int(i)
+        company = self.company_codes[i]
+        label = self.label_codes[i]
+        return Fund.model_construct(
+            isin=self.isin[i],
+            name=self.names[self.name_codes[i]],
+            management_company=self.companies[company] if company >= 0 else None,
+            sri=int(self.sri[i]),
+            asset_class=ASSET_CLASSES[self.asset_class_codes[i]],
+            description=self.description[i],
+            available_platforms=self._platforms_at(i),
+            is_standard_isin=bool(self.is_standard_isin[i]),
+            label=self.labels[label] if label >= 0 else None,
+            metrics=self._metrics_at(i),
+            **scores
+        )
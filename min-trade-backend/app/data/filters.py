@@ -0,0 +1,115 @@
+"""
+Fund Filters - bitset indexes and facet counts over the fund universe
+
+Built once per FundUniverse data version, next to the FundColumns.
+One bitset (packed uint64 words, bit i == fund i) per asset class, SRI,
+platform and label. A filter is an OR of the selected values' bitsets per
+dimension, AND-ed across dimensions; facet counts are popcounts of the
+filter AND each value's bitset.
+"""
+
+from typing import Any, Collection, Dict, Hashable, Mapping, Optional
+
+import numpy as np
+
+from .columns import ASSET_CLASSES, FundColumns
+
+
+DIMENSIONS = ("asset_class", "sri", "platform", "label")
+
+SRI_VALUES = range(1, 8)
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    """Boolean mask -> bitset of uint64 words"""
+    bits = np.packbits(mask, bitorder="little")
+    bits = np.pad(bits, (0, -len(bits) % 8))
+    return bits.view(np.uint64)
+
+
+def popcount(bits: np.ndarray) -> int:
+    return int(np.bitwise_count(bits).sum())
+
+
+class FundFilterIndex:
+    """
+    Bitset indexes of a FundColumns table (row i == fund i).
+    A selection maps a dimension to the accepted values, e.g.
+    {"asset_class": ["actions"], "sri": [3, 4, 5]}.
+    """
+    
+    def __init__(self, columns: FundColumns):
+        n = columns.size
+        self.size = n
+        self.all = _pack(np.ones(n, dtype=bool))
+        
+        # Row of each (row, platform) pair of the CSR platform layout
+        platform_rows = np.repeat(np.arange(n), np.diff(columns.platform_offsets))
+        
+        self.bitsets: Dict[str, Dict[Hashable, np.ndarray]] = {
+            "asset_class": {
+                value: _pack(columns.asset_class_codes == code)
+                for code, value in enumerate(ASSET_CLASSES)
+            },
+            "sri": {
+                value: _pack(columns.sri == value)
+                for value in SRI_VALUES
+            },
+            "platform": {
+                value: self.from_rows(platform_rows[columns.platform_codes == code])
+                for code, value in enumerate(columns.platforms)
+            },
+            "label": {
+                value: _pack(columns.label_codes == code)
+                for code, value in enumerate(columns.labels)
+            }
+        }
+        self._empty = np.zeros_like(self.all)
+    
+    def select(self, selection: Mapping[str, Collection[Any]], base: Optional[np.ndarray] = None) -> np.ndarray:
+        """Bitset of the funds matching every dimension of the selection (within base)"""
+        bits = (self.all if base is None else base).copy()
+        for dimension, values in selection.items():
+            bitsets = self.bitsets[dimension]
+            accepted = self._empty.copy()
+            for value in values:
+                if value in bitsets:
+                    accepted |= bitsets[value]
+            bits &= accepted
+        return bits
+    
+    def rows(self, bits: np.ndarray) -> np.ndarray:
+        """Row numbers of the set bits, ascending"""
+        mask = np.unpackbits(bits.view(np.uint8), bitorder="little", count=self.size)
+        return np.flatnonzero(mask)
+    
+    def mask(self, bits: np.ndarray) -> np.ndarray:
+        """Boolean mask of a bitset"""
+        return np.unpackbits(bits.view(np.uint8), bitorder="little", count=self.size).astype(bool)
+    
+    def from_rows(self, rows: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return _pack(mask)
+    
+    def facets(
+        self,
+        selection: Mapping[str, Collection[Any]],
+        base: Optional[np.ndarray] = None
+    ) -> Dict[str, Dict[Hashable, int]]:
+        """
+        Non-zero counts per value of every dimension. Each dimension is
+        counted under the other dimensions' filters only, so the counts show
+        what selecting another value of that dimension would return.
+        """
+        facets = {}
+        for dimension in DIMENSIONS:
+            others = {d: v for d, v in selection.items() if d != dimension}
+            bits = self.select(others, base)
+            counts = {}
+            for value, value_bits in self.bitsets[dimension].items():
+                count = popcount(bits & value_bits)
+                if count:
+                    counts[value] = count
+            facets[dimension] = counts
+        return facets
@@ -1,35 +1,245 @@
+import numpy as np
 import pandas as pd
+import hashlib
+import logging
+import os
+import pickle
 import re
 from typing import List, Optional
 from pathlib import Path
 from ..models.fund import Fund, AssetClass, FundMetrics
 
+# Set HITRADE_REFRESH_SNAPSHOT=1 to ignore any existing snapshot and re-parse the xlsx
+HITRADE_REFRESH_SNAPSHOT = os.getenv("HITRADE_REFRESH_SNAPSHOT", "") == "1"
+
 
 class DataIngestion:
     STANDARD_ISIN_PREFIXES = {'FR', 'LU', 'IE', 'BE', 'DE', 'AT', 'GB', 'NL', 'XS', 'LI', 'SC'}
     
-    def __init__(self, file_path: str):
+    # Keyword rules for asset class detection, checked in order (first match wins)
+    ASSET_CLASS_KEYWORDS = [
+        (AssetClass.IMMOBILIER, ['immobilier', 'scpi', 'opci', 'pierre']),
+        (AssetClass.ACTIONS, ['action', 'equity', 'stock', 'cap.']),
+        (AssetClass.OBLIGATIONS, ['obligation', 'bond', 'taux', 'fixed income', 'crédit']),
+        (AssetClass.MONETAIRE, ['monétaire', 'money market', 'liquidité']),
+        (AssetClass.DIVERSIFIE, ['diversifié', 'mixte', 'flexible', 'allocation']),
+    ]
+    
+    # Bump when _normalize_columns output changes so old snapshots are rebuilt
+    SNAPSHOT_VERSION = 1
+    
+    def __init__(
+        self,
+        file_path: str,
+        snapshot_path: Optional[str] = None,
+        use_snapshot: bool = True,
+        refresh_snapshot: bool = HITRADE_REFRESH_SNAPSHOT
+    ):
         self.file_path = file_path
+        source = Path(file_path)
+        self.snapshot_path = snapshot_path or str(source.with_name(f".{source.stem}.snapshot.pkl"))
+        self.use_snapshot = use_snapshot
+        self._refresh_snapshot = refresh_snapshot
         self._raw_data: Optional[pd.DataFrame] = None
+        self._normalized: Optional[pd.DataFrame] = None
         self._funds: List[Fund] = []
+        self.logger = logging.getLogger("DataIngestion")
     
     def load_data(self) -> pd.DataFrame:
         self._raw_data = pd.read_excel(self.file_path)
         return self._raw_data
     
-    def normalize_and_parse(self) -> List[Fund]:
+    def _source_key(self) -> dict:
+        """Identity of the source file: content hash and mtime"""
+        with open(self.file_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return {
+            'version': self.SNAPSHOT_VERSION,
+            'sha256': digest,
+            'mtime': os.path.getmtime(self.file_path),
+        }
+    
+    def _read_snapshot(self, key: dict) -> Optional[pd.DataFrame]:
+        """Return the snapshotted normalized frame if it matches the source key"""
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Unreadable snapshot {self.snapshot_path}: {e}")
+            return None
+        
+        if snapshot.get('key') != key:
+            return None
+        return snapshot.get('frame')
+    
+    def _write_snapshot(self, key: dict, frame: pd.DataFrame) -> None:
+        """Atomically write the normalized frame next to the source file"""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'key': key, 'frame': frame}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            self.logger.warning(f"Could not write snapshot {self.snapshot_path}: {e}")
+    
+    def invalidate_snapshot(self) -> None:
+        """Delete the snapshot so the next load re-parses the xlsx"""
+        try:
+            os.remove(self.snapshot_path)
+            self.logger.info(f"Snapshot invalidated: {self.snapshot_path}")
+        except FileNotFoundError:
+            pass
+        self._normalized = None
+    
+    def load_normalized(self) -> pd.DataFrame:
+        """
+        Normalized fund frame, served from the binary snapshot when the source
+        file is unchanged. Falls back to parsing the xlsx and refreshes the
+        snapshot on a miss.
+        """
+        if not self.use_snapshot:
+            if self._raw_data is None:
+                self.load_data()
+            self._normalized = self._normalize_columns(self._raw_data)
+            return self._normalized
+        
+        key = self._source_key()
+        
+        if self._raw_data is None and not self._refresh_snapshot:
+            frame = self._read_snapshot(key)
+            if frame is not None:
+                self.logger.info(f"Snapshot cache hit for {self.file_path} ({len(frame)} funds)")
+                self._normalized = frame
+                return frame
+        
+        reason = "refresh forced" if self._refresh_snapshot else "source changed or no snapshot"
+        self.logger.info(f"Snapshot cache miss for {self.file_path} ({reason}), parsing xlsx")
+        
         if self._raw_data is None:
             self.load_data()
+        self._normalized = self._normalize_columns(self._raw_data)
+        self._write_snapshot(key, self._normalized)
+        self._refresh_snapshot = False
+        return self._normalized
+    
+    def normalize_and_parse(self, columnar: bool = True) -> List[Fund]:
+        """
+        Parse the raw sheet into Fund objects.
         
-        funds = []
-        for _, row in self._raw_data.iterrows():
-            fund = self._parse_row(row)
-            if fund:
-                funds.append(fund)
+        The columnar path normalizes whole columns at once and only builds
+        Fund objects at the end; the row path (columnar=False) is kept as the
+        reference implementation and produces the same output.
+        
+        The columnar path goes through load_normalized(), so an unchanged
+        source file is served from the snapshot without touching openpyxl.
+        """
+        if columnar:
+            funds = self._build_funds(self.load_normalized())
+        else:
+            if self._raw_data is None:
+                self.load_data()
+            funds = []
+            for _, row in self._raw_data.iterrows():
+                fund = self._parse_row(row)
+                if fund:
+                    funds.append(fund)
         
         self._funds = funds
         return funds
     
+    def _column(self, df: pd.DataFrame, name: str, default: str = '') -> pd.Series:
+        """Column as stripped strings, mirroring str(row.get(name, default)).strip()"""
+        if name not in df.columns:
+            return pd.Series(default, index=df.index, dtype=object)
+        return df[name].astype(str).str.strip()
+    
+    @staticmethod
+    def _parse_sri(value) -> Optional[int]:
+        try:
+            return int(value)
+        except (TypeError, ValueError, OverflowError):
+            return None
+    
+    def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized equivalent of _parse_row over the whole sheet.
+        Returns one row per valid fund with the Fund field names as columns.
+        """
+        isin = self._column(df, 'CODE ISIN')
+        name = self._column(df, 'Nom du fonds')
+        
+        if 'SRI' in df.columns:
+            # Same int() as the row path: "5.0" or "4.7" strings are rejected, 4.7 numbers truncated
+            sri = df['SRI'].map(self._parse_sri)
+        else:
+            sri = pd.Series(4, index=df.index, dtype=object)
+        
+        # Rows the row path rejects: missing ISIN/name, or an SRI int() cannot parse
+        valid = (isin != '') & (name != '') & (isin != 'nan') & sri.notna()
+        df = df[valid]
+        isin = isin[valid]
+        name = name[valid]
+        sri = sri[valid].astype(int).clip(1, 7)
+        
+        management_company = self._column(df, 'Société de gestion')
+        management_company = management_company.where(management_company != 'nan', None)
+        
+        description = self._column(df, 'Descriptif')
+        description_missing = description == 'nan'
+        description = (
+            description
+            .str.replace(r'<[^>]+>', '', regex=True)
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip()
+            .where(~description_missing, None)
+        )
+        
+        platforms = self._column(df, 'Disponible chez')
+        platforms = platforms.where(platforms != 'nan', '').str.split(';').map(
+            lambda parts: [p.strip() for p in parts if p.strip()]
+        )
+        
+        label = self._column(df, 'LABELL')
+        label = label.where(label != 'nan', None)
+        
+        is_standard = isin.str[:2].str.upper().isin(self.STANDARD_ISIN_PREFIXES)
+        
+        text = (
+            label.fillna('') + ' ' + description.fillna('') + ' ' + name
+        ).str.lower()
+        
+        conditions = [text.str.contains('fond', regex=False) & text.str.contains('euro', regex=False)]
+        choices = [AssetClass.FONDS_EUROS.value]
+        for asset_class, keywords in self.ASSET_CLASS_KEYWORDS:
+            pattern = '|'.join(re.escape(kw) for kw in keywords)
+            conditions.append(text.str.contains(pattern, regex=True))
+            choices.append(asset_class.value)
+        asset_class = np.select(conditions, choices, default=AssetClass.AUTRES.value)
+        
+        return pd.DataFrame({
+            'isin': isin,
+            'name': name,
+            'management_company': management_company,
+            'sri': sri,
+            'asset_class': asset_class,
+            'description': description,
+            'available_platforms': platforms,
+            'is_standard_isin': is_standard,
+            'label': label,
+        }).reset_index(drop=True)
+    
+    def _build_funds(self, normalized: pd.DataFrame) -> List[Fund]:
+        """Build Fund objects from a frame produced by _normalize_columns"""
+        funds = []
+        for record in normalized.to_dict('records'):
+            try:
+                funds.append(Fund(**record))
+            except Exception as e:
+                self.logger.warning(f"Error building fund {record.get('isin')}: {e}")
+        return funds
+    
     def _parse_row(self, row: pd.Series) -> Optional[Fund]:
         try:
             isin = str(row.get('CODE ISIN', '')).strip()
@@ -100,16 +310,9 @@ class DataIngestion:
         
         if 'fond' in text and 'euro' in text:
             return AssetClass.FONDS_EUROS
-        if any(kw in text for kw in ['immobilier', 'scpi', 'opci', 'pierre']):
-            return AssetClass.IMMOBILIER
-        if any(kw in text for kw in ['action', 'equity', 'stock', 'cap.']):
-            return AssetClass.ACTIONS
-        if any(kw in text for kw in ['obligation', 'bond', 'taux', 'fixed income', 'crédit']):
-            return AssetClass.OBLIGATIONS
-        if any(kw in text for kw in ['monétaire', 'money market', 'liquidité']):
-            return AssetClass.MONETAIRE
-        if any(kw in text for kw in ['diversifié', 'mixte', 'flexible', 'allocation']):
-            return AssetClass.DIVERSIFIE
+        for asset_class, keywords in self.ASSET_CLASS_KEYWORDS:
+            if any(kw in text for kw in keywords):
+                return asset_class
         
         return AssetClass.AUTRES
     
@@ -0,0 +1,101 @@
+"""
+NAV Returns - aligned daily return matrices from provider NAV histories
+
+Correlation-aware features (portfolio optimization, risk) need the funds'
+returns on a common calendar. NAV histories are aligned on the union of
+their dates, forward-filled (a fund without a quote that day did not move)
+and turned into simple daily returns. Returns before a fund's first NAV
+are NaN.
+
+Covariances: pairwise sample covariance, or Ledoit-Wolf shrinkage towards
+a scaled identity (well conditioned even with more funds than dates).
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Sequence
+
+import numpy as np
+
+from .provider import FundDataProvider
+
+
+@dataclass(frozen=True)
+class ReturnMatrix:
+    """Daily returns, one column per fund (column j == isins[j])"""
+    isins: List[str]
+    dates: np.ndarray    # datetime64[D], date of each return row
+    returns: np.ndarray  # (dates, funds), NaN before a fund's first NAV
+    
+    @property
+    def observations(self) -> np.ndarray:
+        """Number of returns available per fund"""
+        return np.count_nonzero(~np.isnan(self.returns), axis=0)
+    
+    def covariance(self) -> np.ndarray:
+        """Sample covariance (pairwise over the dates both funds are quoted)"""
+        present = ~np.isnan(self.returns)
+        counts = present.sum(axis=0)
+        means = np.where(counts > 0, np.nansum(self.returns, axis=0) / np.maximum(counts, 1), 0.0)
+        centered = np.where(present, self.returns - means, 0.0)
+        pairs = present.T.astype(np.float64) @ present
+        return (centered.T @ centered) / np.maximum(pairs - 1, 1)
+    
+    def demeaned(self) -> np.ndarray:
+        """Returns minus each fund's mean, missing returns set to 0"""
+        present = ~np.isnan(self.returns)
+        counts = present.sum(axis=0)
+        means = np.nansum(self.returns, axis=0) / np.maximum(counts, 1)
+        return np.where(present, self.returns - means, 0.0)
+    
+    def shrunk_covariance(self) -> np.ndarray:
+        """
+        Ledoit-Wolf (2004) shrinkage of the sample covariance S towards mu * I:
+        (1 - d) S + d mu I, with the optimal intensity d estimated from the data.
+        """
+        x = self.demeaned()
+        t, n = x.shape
+        if t == 0 or n == 0:
+            return np.zeros((n, n))
+        sample = x.T @ x / t
+        mu = np.trace(sample) / n
+        target_distance = ((sample - mu * np.eye(n)) ** 2).sum() / n
+        # Mean over dates of ||x_t x_t' - S||^2, without building the outer products
+        estimation_error = (((x * x).sum(axis=1) ** 2).sum() / t - (sample ** 2).sum()) / (t * n)
+        intensity = min(estimation_error, target_distance) / target_distance if target_distance > 0 else 1.0
+        return (1 - intensity) * sample + intensity * mu * np.eye(n)
+    
+    def subset(self, columns: Sequence[int]) -> "ReturnMatrix":
+        columns = list(columns)
+        return ReturnMatrix([self.isins[j] for j in columns], self.dates, self.returns[:, columns])
+
+
+def load_return_matrix(
+    provider: FundDataProvider,
+    isins: Sequence[str],
+    start_date: date,
+    end_date: date
+) -> ReturnMatrix:
+    """Fetch the NAV histories of the funds and align them into a ReturnMatrix"""
+    by_isin = provider.get_nav_histories(isins, start_date, end_date)
+    histories = [by_isin[isin] for isin in isins]
+    
+    dates = np.unique(np.concatenate([h.dates for h in histories] or [np.empty(0, dtype="datetime64[D]")]))
+    nav = np.full((len(dates), len(isins)), np.nan)
+    for j, history in enumerate(histories):
+        nav[np.searchsorted(dates, history.dates), j] = history.values
+    
+    # Forward fill: each cell takes the last quoted row of its column
+    quoted = np.where(~np.isnan(nav), np.arange(len(dates))[:, None], 0)
+    np.maximum.accumulate(quoted, axis=0, out=quoted)
+    nav = nav[quoted, np.arange(len(isins))]
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = nav[1:] / nav[:-1] - 1.0
+    returns[~np.isfinite(returns)] = np.nan
+    
+    return ReturnMatrix(
+        isins=list(isins),
+        dates=dates[1:],
+        returns=returns
+    )
@@ -0,0 +1,104 @@
+"""
+NAV Series - columnar daily NAV history of one fund
+
+A history is two parallel NumPy arrays, dates (datetime64[D], ascending)
+and values (float64), instead of a list of pydantic NavPoint objects:
+3 years of daily data is 2 arrays rather than ~780 objects per fund.
+Metric helpers work on the arrays directly; NavPoint objects are only
+built when a history is serialized (to_points).
+
+Arrays are read-only, so series (and their slices, which are views) can
+be shared between funds and callers without copies. A writeable array
+passed in is copied before freezing: the caller's buffer stays writeable.
+"""
+
+from datetime import date
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from ..models.fund import NavPoint
+
+
+def _frozen(data, dtype) -> np.ndarray:
+    """Read-only array of data; read-only inputs are shared, writeable ones copied"""
+    array = np.asarray(data, dtype=dtype)
+    if not array.flags.writeable:
+        return array
+    if isinstance(data, np.ndarray) and np.may_share_memory(array, data):
+        array = array.copy()
+    array.flags.writeable = False
+    return array
+
+
+class NavSeries:
+    """Immutable (dates, values) NAV history, sorted by date"""
+    
+    __slots__ = ("dates", "values")
+    
+    def __init__(self, dates: np.ndarray, values: np.ndarray):
+        dates = _frozen(dates, "datetime64[D]")
+        values = _frozen(values, np.float64)
+        if dates.shape != values.shape or dates.ndim != 1:
+            raise ValueError(f"NAV dates and values must be 1-d arrays of the same length: {dates.shape} != {values.shape}")
+        self.dates = dates
+        self.values = values
+    
+    @classmethod
+    def empty(cls) -> "NavSeries":
+        return cls(np.empty(0, dtype="datetime64[D]"), np.empty(0))
+    
+    @classmethod
+    def from_points(cls, points: Iterable[NavPoint]) -> "NavSeries":
+        points = list(points)
+        return cls(
+            np.array([p.date for p in points], dtype="datetime64[D]"),
+            np.array([p.value for p in points], dtype=np.float64)
+        )
+    
+    @classmethod
+    def from_pairs(cls, pairs: Sequence[Tuple[str, float]]) -> "NavSeries":
+        """From (ISO date, value) rows, e.g. a database query"""
+        if not pairs:
+            return cls.empty()
+        dates, values = zip(*pairs)
+        return cls(np.array(dates, dtype="datetime64[D]"), np.array(values, dtype=np.float64))
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, NavSeries):
+            return NotImplemented
+        return np.array_equal(self.dates, other.dates) and np.array_equal(self.values, other.values)
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        if not len(self):
+            return "NavSeries([])"
+        return f"NavSeries({len(self)} points, {self.dates[0]} .. {self.dates[-1]})"
+    
+    @property
+    def first_date(self) -> date:
+        return self.dates[0].item()
+    
+    @property
+    def last_date(self) -> date:
+        return self.dates[-1].item()
+    
+    def between(self, start_date: date, end_date: date) -> "NavSeries":
+        """Points within [start_date, end_date] (a view, no copy)"""
+        lo = np.searchsorted(self.dates, np.datetime64(start_date, "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(end_date, "D"), side="right")
+        return NavSeries(self.dates[lo:hi], self.values[lo:hi])
+    
+    def iso_dates(self) -> List[str]:
+        return np.datetime_as_string(self.dates, unit="D").tolist()
+    
+    def to_points(self) -> List[NavPoint]:
+        """NavPoint objects, for serialization"""
+        return [
+            NavPoint(date=d, value=v)
+            for d, v in zip(self.dates.tolist(), self.values.tolist())
+        ]
@@ -0,0 +1,128 @@
+"""
+NAV Store - persistent daily NAVs per fund (SQLite)
+
+Keeps every NAV point fetched from the provider, keyed by (ISIN, date), and
+per ISIN the date range already fetched (coverage). A provider with a store
+only requests, per fund, the dates after its coverage: after a restart or
+on the daily refresh, that is a few days instead of 3 years of history.
+
+Coverage starts at the requested start date, so funds without quotes at
+the start of the window (recent launches) are not refetched, but ends at
+the fund's last quoted date: NAVs published a day or more late are
+requested again on the next refresh. Ranges without any business day are
+not requested at all.
+"""
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+
+from .nav_series import NavSeries
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nav (
+    isin TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (isin, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    isin TEXT PRIMARY KEY,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL
+);
+"""
+
+
+class NavStore:
+    """SQLite NAV history store, safe to share between threads"""
+    
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._coverage: Dict[str, Tuple[date, date]] = {
+            isin: (date.fromisoformat(start), date.fromisoformat(end))
+            for isin, start, end in self._connection.execute("SELECT isin, start_date, end_date FROM coverage")
+        }
+        self.logger = logging.getLogger("NavStore")
+        self.logger.info(f"NAV store {path}: {len(self._coverage)} funds")
+    
+    def coverage(self, isin: str) -> Optional[Tuple[date, date]]:
+        """Date range already fetched for the fund, None if never fetched"""
+        return self._coverage.get(isin)
+    
+    def missing_ranges(self, isins: Sequence[str], start_date: date, end_date: date) -> Dict[date, List[str]]:
+        """
+        Funds to fetch for [start_date, end_date], grouped by the first date
+        to request (each group needs [key, end_date])
+        """
+        groups: Dict[date, List[str]] = {}
+        for isin in dict.fromkeys(isins):
+            covered = self._coverage.get(isin)
+            if covered is None or start_date < covered[0]:
+                fetch_start = start_date
+            elif covered[1] >= end_date:
+                continue
+            else:
+                fetch_start = covered[1] + timedelta(days=1)
+                if not np.busday_count(fetch_start, end_date + timedelta(days=1)):
+                    continue
+            groups.setdefault(fetch_start, []).append(isin)
+        return groups
+    
+    def append(self, histories: Dict[str, NavSeries], start_date: date, end_date: date) -> None:
+        """
+        Store the points fetched for [start_date, end_date] and extend the
+        funds' coverage up to their last quoted date
+        """
+        rows = [
+            row
+            for isin, nav in histories.items()
+            for row in zip([isin] * len(nav), nav.iso_dates(), nav.values.tolist())
+        ]
+        coverage = {}
+        for isin, nav in histories.items():
+            if not len(nav):
+                continue
+            last_quoted = min(nav.last_date, end_date)
+            covered = self._coverage.get(isin)
+            if covered is None:
+                coverage[isin] = (start_date, last_quoted)
+            else:
+                coverage[isin] = (min(covered[0], start_date), max(covered[1], last_quoted))
+        
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO nav VALUES (?, ?, ?)", rows)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?)",
+                [(isin, start.isoformat(), end.isoformat()) for isin, (start, end) in coverage.items()]
+            )
+            self._coverage.update(coverage)
+    
+    def load(self, isins: Sequence[str], start_date: date, end_date: date) -> Dict[str, NavSeries]:
+        """Stored points of each fund within [start_date, end_date], by date"""
+        start, end = start_date.isoformat(), end_date.isoformat()
+        histories = {}
+        with self._lock:
+            for isin in isins:
+                rows = self._connection.execute(
+                    "SELECT date, value FROM nav WHERE isin = ? AND date BETWEEN ? AND ? ORDER BY date",
+                    (isin, start, end)
+                ).fetchall()
+                histories[isin] = NavSeries.from_pairs(rows)
+        return histories
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            points = self._connection.execute("SELECT COUNT(*) FROM nav").fetchone()[0]
+        return {"funds": len(self._coverage), "points": points}
@@ -1,16 +1,31 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import date, datetime, timedelta
+import asyncio
 import random
+import time
 import math
 import os
 import logging
+import weakref
 import httpx
-from ..models.fund import Fund, FundMetrics, NavPoint
+import numpy as np
+from ..models.fund import Fund, FundMetrics
+from .nav_series import NavSeries
+from .nav_store import NavStore
+from .symbol_store import SymbolStore
+from .scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE, RequestScheduler
 
 # Configuration from environment variables
 TWELVEDATA_API_KEY = os.getenv("TWELVEDATA_API_KEY", "")
 TWELVEDATA_BASE_URL = os.getenv("TWELVEDATA_BASE_URL", "https://api.twelvedata.com")
+# Plan limits: 8 credits/minute on the free plan
+TWELVEDATA_CREDITS_PER_MINUTE = int(os.getenv("TWELVEDATA_CREDITS_PER_MINUTE", "8"))
+TWELVEDATA_MAX_CONCURRENCY = int(os.getenv("TWELVEDATA_MAX_CONCURRENCY", "8"))
+NAV_STORE_PATH = os.getenv("NAV_STORE_PATH", os.path.join(os.path.dirname(__file__), "files", "nav_store.sqlite"))
+SYMBOL_STORE_PATH = os.getenv("SYMBOL_STORE_PATH", os.path.join(os.path.dirname(__file__), "files", "symbols.sqlite"))
+# Optional CSV (isin,symbol) of known resolutions loaded at startup
+SYMBOL_PRELOAD_PATH = os.getenv("SYMBOL_PRELOAD_PATH", "")
 
 
 class FundDataProvider(ABC):
@@ -19,9 +34,13 @@ class FundDataProvider(ABC):
         pass
     
     @abstractmethod
-    def get_nav_history(self, isin: str, start_date: date, end_date: date) -> List[NavPoint]:
+    def get_nav_history(self, isin: str, start_date: date, end_date: date) -> NavSeries:
         pass
     
+    def get_nav_histories(self, isins: List[str], start_date: date, end_date: date) -> Dict[str, NavSeries]:
+        """NAV histories of many funds (providers may batch the requests)"""
+        return {isin: self.get_nav_history(isin, start_date, end_date) for isin in isins}
+    
     @abstractmethod
     def get_fund_metrics(self, isin: str) -> Optional[FundMetrics]:
         pass
@@ -35,43 +54,44 @@ class MockDataProvider(FundDataProvider):
     def __init__(self, seed: int = 42):
         self._seed = seed
         random.seed(seed)
-        self._fund_cache: dict[str, Fund] = {}
+        # Weak: the FundUniverse keeps columns only, enriched Funds must not stay pinned here
+        self._fund_cache: weakref.WeakValueDictionary[str, Fund] = weakref.WeakValueDictionary()
         self._metrics_cache: dict[str, FundMetrics] = {}
     
     def get_fund_by_isin(self, isin: str) -> Optional[Fund]:
         return self._fund_cache.get(isin)
     
-    def get_nav_history(self, isin: str, start_date: date, end_date: date) -> List[NavPoint]:
-        random.seed(hash(isin) % (2**32))
+    def get_nav_history(self, isin: str, start_date: date, end_date: date) -> NavSeries:
+        # Per-call generator: same series as seeding the global one, thread-safe
+        rng = random.Random(hash(isin) % (2**32))
         
-        nav_points = []
-        current_date = start_date
+        days = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + np.timedelta64(1, "D"))
+        dates = days[np.is_busday(days)]
+        values = np.empty(len(dates))
         base_value = 100.0
         
-        while current_date <= end_date:
-            if current_date.weekday() < 5:
-                daily_return = random.gauss(0.0002, 0.01)
-                base_value *= (1 + daily_return)
-                nav_points.append(NavPoint(date=current_date, value=round(base_value, 4)))
-            current_date += timedelta(days=1)
+        for i in range(len(dates)):
+            daily_return = rng.gauss(0.0002, 0.01)
+            base_value *= (1 + daily_return)
+            values[i] = round(base_value, 4)
         
-        return nav_points
+        return NavSeries(dates, values)
     
     def get_fund_metrics(self, isin: str) -> Optional[FundMetrics]:
         if isin in self._metrics_cache:
             return self._metrics_cache[isin]
         
-        random.seed(hash(isin) % (2**32))
+        rng = random.Random(hash(isin) % (2**32))
         
-        base_perf = random.gauss(0.05, 0.15)
-        vol = abs(random.gauss(0.12, 0.08))
+        base_perf = rng.gauss(0.05, 0.15)
+        vol = abs(rng.gauss(0.12, 0.08))
         
         metrics = FundMetrics(
-            perf_1w=round(random.gauss(base_perf / 52, vol / math.sqrt(52)) * 100, 2),
-            perf_1m=round(random.gauss(base_perf / 12, vol / math.sqrt(12)) * 100, 2),
-            perf_3m=round(random.gauss(base_perf / 4, vol / 2) * 100, 2),
-            perf_1y=round(random.gauss(base_perf, vol) * 100, 2),
-            perf_3y=round(random.gauss(base_perf * 3, vol * 1.5) * 100, 2),
+            perf_1w=round(rng.gauss(base_perf / 52, vol / math.sqrt(52)) * 100, 2),
+            perf_1m=round(rng.gauss(base_perf / 12, vol / math.sqrt(12)) * 100, 2),
+            perf_3m=round(rng.gauss(base_perf / 4, vol / 2) * 100, 2),
+            perf_1y=round(rng.gauss(base_perf, vol) * 100, 2),
+            perf_3y=round(rng.gauss(base_perf * 3, vol * 1.5) * 100, 2),
             vol_60d=round(vol * 100, 2),
             sharpe_ratio=round((base_perf - 0.02) / vol if vol > 0 else 0, 2)
         )
@@ -97,18 +117,28 @@ class TwelveDataProvider(FundDataProvider):
     Twelve Data API docs: https://twelvedata.com/docs
     """
     
+    # Symbols per /time_series request (the API accepts comma-separated lists)
+    TIME_SERIES_BATCH_SIZE = 120
+    # Funds whose histories are fetched together by enrich_funds
+    ENRICH_CHUNK = 500
+    
     def __init__(
         self, 
         api_key: str = TWELVEDATA_API_KEY, 
         base_url: str = TWELVEDATA_BASE_URL,
-        fallback_provider: Optional[FundDataProvider] = None
+        fallback_provider: Optional[FundDataProvider] = None,
+        nav_store: Optional[NavStore] = None,
+        symbol_store: Optional[SymbolStore] = None
     ):
         self.api_key = api_key
         self.base_url = base_url
         self._client = httpx.Client(timeout=30.0)
+        self._nav_store = nav_store
+        self._symbol_store = symbol_store
         self._symbol_cache: dict[str, str] = {}
         self._metrics_cache: dict[str, FundMetrics] = {}
-        self._fund_cache: dict[str, Fund] = {}
+        # Weak, as in MockDataProvider
+        self._fund_cache: weakref.WeakValueDictionary[str, Fund] = weakref.WeakValueDictionary()
         self._fallback = fallback_provider or MockDataProvider()
         self.logger = logging.getLogger("TwelveDataProvider")
         
@@ -120,7 +150,7 @@ class TwelveDataProvider(FundDataProvider):
         if not self.api_key:
             self.logger.warning("No API key configured")
             return None
-            
+        
         params = {**params, "apikey": self.api_key}
         url = f"{self.base_url}{path}"
         
@@ -150,120 +180,208 @@ class TwelveDataProvider(FundDataProvider):
         Resolve ISIN to Twelve Data symbol.
         Uses symbol search endpoint to find matching instruments.
         """
+        known, symbol = self._known_symbol(isin)
+        if known:
+            return symbol
+        
+        candidates: List[str] = []
+        answered = True
+        for params in self._symbol_searches(isin):
+            data = self._get("/symbol_search", params)
+            answered = answered and data is not None
+            candidates = self._symbol_candidates(data)
+            if candidates:
+                break
+        return self._record_symbol(isin, candidates, answered)
+    
+    def _symbol_searches(self, isin: str) -> List[dict]:
+        """symbol_search queries to try in order: the ISIN directly, then as a query"""
+        return [{"symbol": isin}, {"symbol": isin, "outputsize": 10}]
+    
+    def _symbol_candidates(self, data: Optional[dict]) -> List[str]:
+        """Symbols of a symbol_search response, best match first"""
+        if data and "data" in data:
+            return [item["symbol"] for item in data["data"] if item.get("symbol")]
+        return []
+    
+    def _known_symbol(self, isin: str) -> tuple[bool, Optional[str]]:
+        """(known, symbol) from the memory cache, then the symbol store (negative results included)"""
         if isin in self._symbol_cache:
-            return self._symbol_cache[isin]
-        
-        # Try searching by ISIN directly
-        data = self._get("/symbol_search", {"symbol": isin})
-        
-        if data and "data" in data and len(data["data"]) > 0:
-            # Find best match - prefer exact ISIN match or first result
-            for item in data["data"]:
-                symbol = item.get("symbol")
-                if symbol:
-                    self._symbol_cache[isin] = symbol
-                    self.logger.info(f"Resolved ISIN {isin} to symbol {symbol}")
-                    return symbol
-        
-        # Try searching by ISIN as a query
-        data = self._get("/symbol_search", {"symbol": isin, "outputsize": 10})
-        
-        if data and "data" in data and len(data["data"]) > 0:
-            symbol = data["data"][0].get("symbol")
-            if symbol:
-                self._symbol_cache[isin] = symbol
-                self.logger.info(f"Resolved ISIN {isin} to symbol {symbol} (search)")
-                return symbol
-        
-        self.logger.warning(f"Could not resolve ISIN {isin} to Twelve Data symbol")
-        return None
+            return True, self._symbol_cache[isin]
+        if self._symbol_store is None:
+            return False, None
+        known, symbol = self._symbol_store.lookup(isin)
+        if symbol:
+            self._symbol_cache[isin] = symbol
+        return known, symbol
+    
+    def _record_symbol(self, isin: str, candidates: List[str], answered: bool) -> Optional[str]:
+        """
+        Cache the outcome of a resolution; a miss is only stored when every
+        search was answered (not after a request error)
+        """
+        symbol = candidates[0] if candidates else None
+        if symbol:
+            self._symbol_cache[isin] = symbol
+            self.logger.info(f"Resolved ISIN {isin} to symbol {symbol}")
+        else:
+            self.logger.warning(f"Could not resolve ISIN {isin} to Twelve Data symbol")
+        if self._symbol_store is not None and (symbol or answered):
+            self._symbol_store.record(isin, symbol, candidates)
+        return symbol
     
     def get_fund_by_isin(self, isin: str) -> Optional[Fund]:
         """Get fund from cache."""
         return self._fund_cache.get(isin)
     
-    def get_nav_history(self, isin: str, start_date: date, end_date: date) -> List[NavPoint]:
+    def get_nav_history(self, isin: str, start_date: date, end_date: date) -> NavSeries:
         """
         Get NAV history from Twelve Data time series API.
         Falls back to mock data if API call fails.
         """
-        symbol = self._resolve_symbol(isin)
-        
-        if not symbol:
-            self.logger.warning(f"Using fallback for NAV history: {isin}")
-            return self._fallback.get_nav_history(isin, start_date, end_date)
+        return self.get_nav_histories([isin], start_date, end_date)[isin]
+    
+    def get_nav_histories(self, isins: List[str], start_date: date, end_date: date) -> Dict[str, NavSeries]:
+        """
+        NAV histories of many funds. With a NavStore, only the dates after
+        each fund's stored history are requested, then the window is read
+        back from the store. Unavailable histories fall back to mock data.
+        """
+        if self._nav_store is None:
+            return self._with_fallbacks(isins, self._fetch_nav_histories(isins, start_date, end_date), start_date, end_date)
         
-        params = {
+        for fetch_start, group in self._nav_store.missing_ranges(isins, start_date, end_date).items():
+            self._nav_store.append(self._fetch_nav_histories(group, fetch_start, end_date), fetch_start, end_date)
+        return self._stored_histories(isins, start_date, end_date)
+    
+    def _fetch_nav_histories(self, isins: List[str], start_date: date, end_date: date) -> Dict[str, NavSeries]:
+        """
+        Histories from the API, for the ISINs whose request succeeded:
+        resolved symbols are fetched TIME_SERIES_BATCH_SIZE per /time_series
+        request; symbols that fail within a batch are retried alone.
+        """
+        by_symbol = self._group_by_symbol(isins, [self._resolve_symbol(isin) for isin in isins])
+        histories = {}
+        for batch in self._batches(list(by_symbol)):
+            data = self._get("/time_series", self._time_series_params(",".join(batch), start_date, end_date))
+            for symbol, series in self._split_time_series(batch, data).items():
+                if series is None and len(batch) > 1:
+                    series = self._get("/time_series", self._time_series_params(symbol, start_date, end_date))
+                self._add_series(histories, by_symbol[symbol], series)
+        return histories
+    
+    def _add_series(self, histories: Dict[str, NavSeries], isins: List[str], series: Optional[dict]) -> None:
+        nav = self._parse_time_series(isins[0], series)
+        if nav is not None:
+            for isin in isins:
+                histories[isin] = nav
+    
+    def _stored_histories(self, isins: List[str], start_date: date, end_date: date) -> Dict[str, NavSeries]:
+        stored = self._nav_store.load(list(dict.fromkeys(isins)), start_date, end_date)
+        return self._with_fallbacks(isins, {isin: nav for isin, nav in stored.items() if len(nav)}, start_date, end_date)
+    
+    def _group_by_symbol(self, isins: List[str], symbols: List[Optional[str]]) -> Dict[str, List[str]]:
+        """Resolved symbol -> ISINs (several share classes may map to one symbol)"""
+        by_symbol: Dict[str, List[str]] = {}
+        for isin, symbol in zip(isins, symbols):
+            if symbol:
+                by_symbol.setdefault(symbol, []).append(isin)
+        return by_symbol
+    
+    def _batches(self, symbols: List[str]) -> List[List[str]]:
+        size = self._batch_size()
+        return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+    
+    def _batch_size(self) -> int:
+        return self.TIME_SERIES_BATCH_SIZE
+    
+    def _split_time_series(self, symbols: List[str], data: Optional[dict]) -> Dict[str, Optional[dict]]:
+        """
+        Per-symbol series of a /time_series response (keyed by symbol for a
+        multi-symbol request), None for the symbols that failed
+        """
+        if len(symbols) == 1:
+            return {symbols[0]: data}
+        series = {}
+        for symbol in symbols:
+            entry = data.get(symbol) if isinstance(data, dict) else None
+            ok = isinstance(entry, dict) and entry.get("status") != "error" and "values" in entry
+            series[symbol] = entry if ok else None
+        return series
+    
+    def _with_fallbacks(
+        self,
+        isins: List[str],
+        histories: Dict[str, NavSeries],
+        start_date: date,
+        end_date: date
+    ) -> Dict[str, NavSeries]:
+        """Histories in `isins` order, mock data for the ISINs without one"""
+        for isin in isins:
+            if isin not in histories:
+                self.logger.warning(f"Using fallback for NAV history: {isin}")
+                histories[isin] = self._fallback.get_nav_history(isin, start_date, end_date)
+        return {isin: histories[isin] for isin in isins}
+    
+    def _time_series_params(self, symbol: str, start_date: date, end_date: date) -> dict:
+        return {
             "symbol": symbol,
             "interval": "1day",
             "start_date": start_date.strftime("%Y-%m-%d"),
             "end_date": end_date.strftime("%Y-%m-%d"),
             "order": "ASC",
         }
-        
-        data = self._get("/time_series", params)
-        
+    
+    def _parse_time_series(self, isin: str, data: Optional[dict]) -> Optional[NavSeries]:
+        """NAV series of a time_series response, None if unusable"""
         if not data or "values" not in data:
-            self.logger.warning(f"No time series data for {isin}, using fallback")
-            return self._fallback.get_nav_history(isin, start_date, end_date)
+            self.logger.warning(f"No time series data for {isin}")
+            return None
         
-        nav_points: List[NavPoint] = []
+        dates: List[date] = []
+        values: List[float] = []
         for item in data["values"]:
             try:
                 nav_date = datetime.strptime(item["datetime"], "%Y-%m-%d").date()
                 nav_value = float(item["close"])
-                nav_points.append(NavPoint(date=nav_date, value=nav_value))
             except (KeyError, ValueError) as e:
                 self.logger.warning(f"Error parsing NAV point: {e}")
                 continue
+            dates.append(nav_date)
+            values.append(nav_value)
         
-        if not nav_points:
-            self.logger.warning(f"No valid NAV points for {isin}, using fallback")
-            return self._fallback.get_nav_history(isin, start_date, end_date)
+        if not values:
+            self.logger.warning(f"No valid NAV points for {isin}")
+            return None
         
-        self.logger.info(f"Retrieved {len(nav_points)} NAV points for {isin}")
-        return nav_points
+        self.logger.info(f"Retrieved {len(values)} NAV points for {isin}")
+        return NavSeries(np.array(dates, dtype="datetime64[D]"), np.array(values))
     
-    def _calculate_returns(self, nav_points: List[NavPoint]) -> List[float]:
-        """Calculate daily returns from NAV points."""
-        if len(nav_points) < 2:
-            return []
-        
-        returns = []
-        for i in range(1, len(nav_points)):
-            prev_nav = nav_points[i - 1].value
-            curr_nav = nav_points[i].value
-            if prev_nav > 0:
-                daily_return = (curr_nav - prev_nav) / prev_nav
-                returns.append(daily_return)
-        
-        return returns
+    def _calculate_returns(self, nav: NavSeries) -> np.ndarray:
+        """Calculate daily returns from a NAV series."""
+        if len(nav) < 2:
+            return np.empty(0)
+        
+        prev_nav, curr_nav = nav.values[:-1], nav.values[1:]
+        valid = prev_nav > 0
+        return (curr_nav[valid] - prev_nav[valid]) / prev_nav[valid]
     
-    def _calculate_performance(self, nav_points: List[NavPoint], days: int) -> Optional[float]:
+    def _calculate_performance(self, nav: NavSeries, days: int) -> Optional[float]:
         """Calculate performance over a specific number of days."""
-        if len(nav_points) < 2:
+        if len(nav) < 2:
             return None
         
-        # Find the NAV point closest to 'days' ago
-        target_date = nav_points[-1].date - timedelta(days=days)
-        
-        # Find closest point to target date
-        closest_point = None
-        min_diff = float('inf')
-        
-        for point in nav_points:
-            diff = abs((point.date - target_date).days)
-            if diff < min_diff:
-                min_diff = diff
-                closest_point = point
+        # Closest point to 'days' ago (the earliest one on ties)
+        target_date = nav.dates[-1] - np.timedelta64(days, "D")
+        closest_value = nav.values[np.argmin(np.abs(nav.dates - target_date))]
         
-        if closest_point and closest_point.value > 0:
-            perf = ((nav_points[-1].value - closest_point.value) / closest_point.value) * 100
-            return round(perf, 2)
+        if closest_value > 0:
+            perf = ((nav.values[-1] - closest_value) / closest_value) * 100
+            return round(float(perf), 2)
         
         return None
     
-    def _calculate_volatility(self, returns: List[float], window: int = 60) -> Optional[float]:
+    def _calculate_volatility(self, returns: np.ndarray, window: int = 60) -> Optional[float]:
         """Calculate annualized volatility from daily returns."""
         if len(returns) < window:
             window = len(returns)
@@ -271,38 +389,27 @@ class TwelveDataProvider(FundDataProvider):
         if window < 5:
             return None
         
-        recent_returns = returns[-window:]
-        
-        # Calculate standard deviation
-        mean = sum(recent_returns) / len(recent_returns)
-        variance = sum((r - mean) ** 2 for r in recent_returns) / len(recent_returns)
-        std_dev = math.sqrt(variance)
+        std_dev = float(np.std(returns[-window:]))
         
         # Annualize (assuming 252 trading days)
         annualized_vol = std_dev * math.sqrt(252) * 100
         return round(annualized_vol, 2)
     
-    def _calculate_max_drawdown(self, nav_points: List[NavPoint]) -> Optional[float]:
+    def _calculate_max_drawdown(self, nav: NavSeries) -> Optional[float]:
         """Calculate maximum drawdown from NAV history."""
-        if len(nav_points) < 2:
+        if len(nav) < 2:
             return None
         
-        peak = nav_points[0].value
-        max_dd = 0.0
-        
-        for point in nav_points:
-            if point.value > peak:
-                peak = point.value
-            
-            if peak > 0:
-                drawdown = (peak - point.value) / peak
-                max_dd = max(max_dd, drawdown)
+        peaks = np.maximum.accumulate(nav.values)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = np.where(peaks > 0, (peaks - nav.values) / peaks, 0.0)
+        max_dd = max(float(drawdowns.max()), 0.0)
         
         return round(max_dd * 100, 2)
     
     def _calculate_sharpe_ratio(
         self, 
-        returns: List[float], 
+        returns: np.ndarray, 
         risk_free_rate: float = 0.02
     ) -> Optional[float]:
         """Calculate Sharpe ratio from daily returns."""
@@ -310,13 +417,10 @@ class TwelveDataProvider(FundDataProvider):
             return None
         
         # Annualized return
-        mean_daily = sum(returns) / len(returns)
-        annualized_return = mean_daily * 252
+        annualized_return = float(returns.mean()) * 252
         
         # Annualized volatility
-        variance = sum((r - mean_daily) ** 2 for r in returns) / len(returns)
-        std_dev = math.sqrt(variance)
-        annualized_vol = std_dev * math.sqrt(252)
+        annualized_vol = float(returns.std()) * math.sqrt(252)
         
         if annualized_vol == 0:
             return None
@@ -326,7 +430,7 @@ class TwelveDataProvider(FundDataProvider):
     
     def _calculate_sortino_ratio(
         self, 
-        returns: List[float], 
+        returns: np.ndarray, 
         risk_free_rate: float = 0.02
     ) -> Optional[float]:
         """Calculate Sortino ratio (downside deviation only)."""
@@ -334,16 +438,15 @@ class TwelveDataProvider(FundDataProvider):
             return None
         
         # Annualized return
-        mean_daily = sum(returns) / len(returns)
-        annualized_return = mean_daily * 252
+        annualized_return = float(returns.mean()) * 252
         
         # Downside deviation (only negative returns)
-        negative_returns = [r for r in returns if r < 0]
+        negative_returns = returns[returns < 0]
         
-        if not negative_returns:
+        if not len(negative_returns):
             return None
         
-        downside_variance = sum(r ** 2 for r in negative_returns) / len(returns)
+        downside_variance = float((negative_returns ** 2).sum()) / len(returns)
         downside_dev = math.sqrt(downside_variance)
         annualized_downside = downside_dev * math.sqrt(252)
         
@@ -361,31 +464,36 @@ class TwelveDataProvider(FundDataProvider):
         if isin in self._metrics_cache:
             return self._metrics_cache[isin]
         
+        start_date, end_date = self._metrics_window()
+        nav = self.get_nav_history(isin, start_date, end_date)
+        return self._metrics_from_nav(isin, nav)
+    
+    def _metrics_window(self) -> tuple[date, date]:
         # Get 3+ years of history for comprehensive metrics
         end_date = date.today()
-        start_date = end_date - timedelta(days=365 * 3 + 30)
-        
-        nav_points = self.get_nav_history(isin, start_date, end_date)
-        
-        if not nav_points or len(nav_points) < 10:
+        return end_date - timedelta(days=365 * 3 + 30), end_date
+    
+    def _metrics_from_nav(self, isin: str, nav: NavSeries) -> Optional[FundMetrics]:
+        """Compute (and cache) the metrics of a fund from its NAV history"""
+        if len(nav) < 10:
             self.logger.warning(f"Insufficient NAV data for {isin}, using fallback metrics")
             return self._fallback.get_fund_metrics(isin)
         
         # Calculate daily returns
-        returns = self._calculate_returns(nav_points)
+        returns = self._calculate_returns(nav)
         
-        if not returns:
+        if not len(returns):
             return self._fallback.get_fund_metrics(isin)
         
         # Calculate all metrics
         metrics = FundMetrics(
-            perf_1w=self._calculate_performance(nav_points, 7),
-            perf_1m=self._calculate_performance(nav_points, 30),
-            perf_3m=self._calculate_performance(nav_points, 90),
-            perf_1y=self._calculate_performance(nav_points, 365),
-            perf_3y=self._calculate_performance(nav_points, 365 * 3),
+            perf_1w=self._calculate_performance(nav, 7),
+            perf_1m=self._calculate_performance(nav, 30),
+            perf_3m=self._calculate_performance(nav, 90),
+            perf_1y=self._calculate_performance(nav, 365),
+            perf_3y=self._calculate_performance(nav, 365 * 3),
             vol_60d=self._calculate_volatility(returns, 60),
-            max_drawdown=self._calculate_max_drawdown(nav_points),
+            max_drawdown=self._calculate_max_drawdown(nav),
             sharpe_ratio=self._calculate_sharpe_ratio(returns),
             sortino_ratio=self._calculate_sortino_ratio(returns),
         )
@@ -402,18 +510,30 @@ class TwelveDataProvider(FundDataProvider):
         return fund
     
     def enrich_funds(self, funds: List[Fund]) -> List[Fund]:
-        """Enrich multiple funds with real metrics."""
+        """Enrich multiple funds with real metrics (NAV histories fetched in batches)."""
         enriched = []
         total = len(funds)
         
-        for i, fund in enumerate(funds):
-            if (i + 1) % 100 == 0:
-                self.logger.info(f"Enriching funds: {i + 1}/{total}")
-            enriched.append(self.enrich_fund(fund))
+        for start in range(0, total, self.ENRICH_CHUNK):
+            chunk = funds[start:start + self.ENRICH_CHUNK]
+            missing = [fund.isin for fund in chunk if fund.isin not in self._metrics_cache]
+            histories = self.get_nav_histories(missing, *self._metrics_window())
+            enriched.extend(self._apply_histories(chunk, histories))
+            self.logger.info(f"Enriching funds: {len(enriched)}/{total}")
         
         self.logger.info(f"Enriched {len(enriched)} funds")
         return enriched
     
+    def _apply_histories(self, funds: List[Fund], histories: Dict[str, NavSeries]) -> List[Fund]:
+        """Set the metrics of the funds, computed from their NAV histories unless cached"""
+        for fund in funds:
+            metrics = self._metrics_cache.get(fund.isin)
+            if metrics is None:
+                metrics = self._metrics_from_nav(fund.isin, histories[fund.isin])
+            fund.metrics = metrics
+            self._fund_cache[fund.isin] = fund
+        return funds
+    
     def health_check(self) -> dict:
         """
         Perform a health check on the Twelve Data API connection.
@@ -434,3 +554,188 @@ class TwelveDataProvider(FundDataProvider):
             }
         
         return {"status": "error", "message": "Failed to connect to Twelve Data API"}
+
+
+class AsyncTwelveDataProvider(TwelveDataProvider):
+    """
+    TwelveDataProvider on httpx.AsyncClient, within the plan's credit budget.
+    
+    Every API call goes through a RequestScheduler (token bucket of the
+    plan's credits per minute, bounded concurrency, priorities), so the
+    provider runs at full speed on a paid plan and keeps making steady
+    progress on the free plan instead of getting rate limit errors.
+    enrich_funds() enriches all funds concurrently at bulk priority; the
+    synchronous lookups used while serving requests overtake it.
+    """
+    
+    # API credits per call (per symbol for multi-symbol calls)
+    CREDIT_COSTS = {"/time_series": 1, "/symbol_search": 1, "/quote": 1}
+    MAX_RETRIES = 3
+    
+    def __init__(
+        self,
+        api_key: str = TWELVEDATA_API_KEY,
+        base_url: str = TWELVEDATA_BASE_URL,
+        fallback_provider: Optional[FundDataProvider] = None,
+        credits_per_minute: int = TWELVEDATA_CREDITS_PER_MINUTE,
+        max_concurrency: int = TWELVEDATA_MAX_CONCURRENCY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        window: float = 60.0,
+        nav_store: Optional[NavStore] = None,
+        symbol_store: Optional[SymbolStore] = None
+    ):
+        super().__init__(api_key, base_url, fallback_provider, nav_store, symbol_store)
+        # All calls go through the async client
+        self._client.close()
+        self._scheduler = RequestScheduler(credits_per_minute, max_concurrency, window)
+        self._window = window
+        self._transport = transport
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self.logger = logging.getLogger("AsyncTwelveDataProvider")
+    
+    def _http(self) -> httpx.AsyncClient:
+        # Created on the scheduler loop, which is the only one using it
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=30.0,
+                transport=self._transport,
+                limits=httpx.Limits(max_connections=self._scheduler.max_concurrency)
+            )
+        return self._async_client
+    
+    def _get(self, path: str, params: dict) -> Optional[dict]:
+        return self._scheduler.run(self._aget(path, params, PRIORITY_INTERACTIVE))
+    
+    async def _aget(self, path: str, params: dict, priority: int) -> Optional[dict]:
+        """GET through the scheduler; waits and retries on rate limit errors"""
+        if not self.api_key:
+            self.logger.warning("No API key configured")
+            return None
+        
+        params = {**params, "apikey": self.api_key}
+        url = f"{self.base_url}{path}"
+        cost = self.CREDIT_COSTS.get(path, 1) * (str(params.get("symbol", "")).count(",") + 1)
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                response = await self._scheduler.request(lambda: self._http().get(url, params=params), cost, priority)
+            except httpx.RequestError as e:
+                self.logger.error(f"Request error: {e}")
+                return None
+            
+            credits_left = response.headers.get("api-credits-left")
+            if credits_left is not None and credits_left.isdigit():
+                self._scheduler.bucket.limit(int(credits_left))
+            
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            
+            if response.status_code == 429 or (isinstance(data, dict) and data.get("code") == 429):
+                # Credits spent elsewhere (e.g. another client on the key): wait for the next minute
+                self._scheduler.bucket.pause(self._window - time.time() % self._window)
+                self.logger.warning(f"Rate limited on {path}, retry {attempt + 1}/{self.MAX_RETRIES}")
+                continue
+            
+            if response.is_error:
+                self.logger.error(f"HTTP error {response.status_code} on {path}")
+                return None
+            if isinstance(data, dict) and data.get("status") == "error":
+                self.logger.error(f"Twelve Data API error: {data.get('message', 'Unknown error')}")
+                return None
+            return data
+        
+        self.logger.error(f"Giving up on {path} after {self.MAX_RETRIES} rate limited retries")
+        return None
+    
+    async def _aresolve_symbol(self, isin: str, priority: int) -> Optional[str]:
+        known, symbol = self._known_symbol(isin)
+        if known:
+            return symbol
+        
+        candidates: List[str] = []
+        answered = True
+        for params in self._symbol_searches(isin):
+            data = await self._aget("/symbol_search", params, priority)
+            answered = answered and data is not None
+            candidates = self._symbol_candidates(data)
+            if candidates:
+                break
+        return self._record_symbol(isin, candidates, answered)
+    
+    def _batch_size(self) -> int:
+        # A batch costs one credit per symbol: never more than the bucket holds
+        return max(1, min(self.TIME_SERIES_BATCH_SIZE, self._scheduler.bucket.capacity))
+    
+    def get_nav_histories(self, isins: List[str], start_date: date, end_date: date) -> Dict[str, NavSeries]:
+        return self._scheduler.run(self._aget_nav_histories(isins, start_date, end_date, PRIORITY_INTERACTIVE))
+    
+    async def _aget_nav_histories(
+        self,
+        isins: List[str],
+        start_date: date,
+        end_date: date,
+        priority: int
+    ) -> Dict[str, NavSeries]:
+        """Concurrent get_nav_histories"""
+        if self._nav_store is None:
+            histories = await self._afetch_nav_histories(isins, start_date, end_date, priority)
+            return self._with_fallbacks(isins, histories, start_date, end_date)
+        
+        async def refresh(fetch_start: date, group: List[str]) -> None:
+            histories = await self._afetch_nav_histories(group, fetch_start, end_date, priority)
+            self._nav_store.append(histories, fetch_start, end_date)
+        
+        missing = self._nav_store.missing_ranges(isins, start_date, end_date)
+        await asyncio.gather(*(refresh(fetch_start, group) for fetch_start, group in missing.items()))
+        return self._stored_histories(isins, start_date, end_date)
+    
+    async def _afetch_nav_histories(
+        self,
+        isins: List[str],
+        start_date: date,
+        end_date: date,
+        priority: int
+    ) -> Dict[str, NavSeries]:
+        """Concurrent _fetch_nav_histories: symbols resolved, then batches fetched, all at once"""
+        symbols = await asyncio.gather(*(self._aresolve_symbol(isin, priority) for isin in isins))
+        by_symbol = self._group_by_symbol(isins, symbols)
+        histories = {}
+        
+        async def fetch(symbol: str, series: Optional[dict], retry: bool) -> None:
+            if series is None and retry:
+                params = self._time_series_params(symbol, start_date, end_date)
+                series = await self._aget("/time_series", params, priority)
+            self._add_series(histories, by_symbol[symbol], series)
+        
+        async def fetch_batch(batch: List[str]) -> None:
+            params = self._time_series_params(",".join(batch), start_date, end_date)
+            data = await self._aget("/time_series", params, priority)
+            split = self._split_time_series(batch, data)
+            await asyncio.gather(*(fetch(symbol, series, len(batch) > 1) for symbol, series in split.items()))
+        
+        await asyncio.gather(*(fetch_batch(batch) for batch in self._batches(list(by_symbol))))
+        return histories
+    
+    async def _aenrich_funds(self, funds: List[Fund]) -> List[Fund]:
+        total = len(funds)
+        done = 0
+        
+        async def enrich(chunk: List[Fund]) -> None:
+            nonlocal done
+            missing = [fund.isin for fund in chunk if fund.isin not in self._metrics_cache]
+            histories = await self._aget_nav_histories(missing, *self._metrics_window(), PRIORITY_BULK)
+            self._apply_histories(chunk, histories)
+            done += len(chunk)
+            self.logger.info(f"Enriching funds: {done}/{total}")
+        
+        chunks = [funds[i:i + self.ENRICH_CHUNK] for i in range(0, total, self.ENRICH_CHUNK)]
+        await asyncio.gather(*(enrich(chunk) for chunk in chunks))
+        return funds
+    
+    def enrich_funds(self, funds: List[Fund]) -> List[Fund]:
+        """Enrich all funds concurrently, within the plan's credit budget."""
+        enriched = self._scheduler.run(self._aenrich_funds(funds))
+        self.logger.info(f"Enriched {len(enriched)} funds")
+        return enriched
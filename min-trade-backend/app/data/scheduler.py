@@ -0,0 +1,181 @@
+"""
+Request Scheduler - API credit budget, bounded concurrency and priorities
+
+Twelve Data plans allow a number of API credits per minute (8 on the free
+plan); going over returns an error instead of data. CreditBucket is a token
+bucket sized so that no 60-second window can spend more than the plan:
+burst + refill rate * 60 <= credits per minute.
+
+RequestScheduler runs on its own event loop thread and dispatches queued
+requests by priority (lowest first, FIFO within a priority): a request is
+sent once a concurrency slot is free and the bucket holds its credits, so
+interactive lookups overtake a bulk enrichment that is already queued.
+Callers from any thread submit coroutines with run() / submit().
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional, Set, TypeVar
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+
+T = TypeVar("T")
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+# Share of the per-minute budget that may be spent at once
+BURST_FRACTION = 0.1
+
+
+class CreditBucket:
+    """
+    Token bucket of API credits (single event loop).
+    At most credits_per_window credits are spent over any `window` seconds.
+    """
+    
+    def __init__(self, credits_per_window: int, window: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.capacity = max(1, math.floor(credits_per_window * BURST_FRACTION))
+        self.rate = max(credits_per_window - self.capacity, 1) / window
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+    
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def delay(self, cost: int) -> float:
+        """Seconds until `cost` credits are available (0 if they are now)"""
+        self._refill()
+        wait = max(0.0, self._paused_until - self._clock())
+        missing = min(cost, self.capacity) - self._tokens
+        return max(wait, missing / self.rate if missing > 0 else 0.0)
+    
+    async def acquire(self, cost: int) -> None:
+        """Wait for `cost` credits and spend them"""
+        while True:
+            wait = self.delay(cost)
+            if wait <= 0:
+                self._tokens -= cost
+                return
+            await asyncio.sleep(wait)
+    
+    def refund(self, credits: int) -> None:
+        self._tokens = min(self.capacity, self._tokens + credits)
+    
+    def limit(self, credits_left: int) -> None:
+        """Never hold more than the server says is left"""
+        self._refill()
+        self._tokens = min(self._tokens, float(credits_left))
+    
+    def pause(self, seconds: float) -> None:
+        """Empty the bucket and stop spending for `seconds` (after a rate limit error)"""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    sequence: int
+    cost: int = field(compare=False)
+    call: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class RequestScheduler:
+    """
+    Background event loop dispatching API calls within a CreditBucket,
+    at most max_concurrency at a time, by priority.
+    """
+    
+    def __init__(self, credits_per_minute: int, max_concurrency: int = 8, window: float = 60.0):
+        self.credits_per_minute = credits_per_minute
+        self.max_concurrency = max_concurrency
+        self.bucket = CreditBucket(credits_per_minute, window)
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Lock()
+        self.logger = logging.getLogger("RequestScheduler")
+    
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The scheduler's event loop, started on first use"""
+        with self._started:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._serve, args=(ready,), name="request-scheduler", daemon=True)
+                self._thread.start()
+                ready.wait()
+        return self._loop
+    
+    def _serve(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._pending: List[_Job] = []
+        self._has_work = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._running: Set[asyncio.Task] = set()
+        loop.create_task(self._dispatch())
+        self._loop = loop
+        ready.set()
+        loop.run_forever()
+    
+    def submit(self, coroutine: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """Run a coroutine on the scheduler loop from any other thread"""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("submit() called from the scheduler loop, await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop)
+    
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Blocking submit()"""
+        return self.submit(coroutine).result()
+    
+    async def request(self, call: Callable[[], Awaitable[T]], cost: int = 1, priority: int = PRIORITY_INTERACTIVE) -> T:
+        """Queue an API call (on the scheduler loop) and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._pending, _Job(priority, next(self._sequence), cost, call, future))
+        self._has_work.set()
+        return await future
+    
+    async def _dispatch(self) -> None:
+        while True:
+            await self._slots.acquire()
+            while not self._pending:
+                self._has_work.clear()
+                await self._has_work.wait()
+            
+            # Credits for the most urgent job now; a more urgent one may
+            # have been queued while waiting, it is the one sent
+            reserved = self._pending[0].cost
+            await self.bucket.acquire(reserved)
+            job = heapq.heappop(self._pending)
+            if job.cost > reserved:
+                await self.bucket.acquire(job.cost - reserved)
+            elif job.cost < reserved:
+                self.bucket.refund(reserved - job.cost)
+            task = asyncio.get_running_loop().create_task(self._run(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _run(self, job: _Job) -> None:
+        try:
+            result = await job.call()
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._slots.release()
@@ -0,0 +1,155 @@
+"""
+Fund Search - trigram inverted index over the fund universe
+
+Built once per FundUniverse data version, next to the FundColumns.
+Covers ISIN, name, management company and description. Texts are
+normalized (lowercase, no accents, punctuation -> space) and split into
+trigrams; each field keeps postings over its distinct values only, so
+repeated companies and descriptions are indexed once.
+
+A fund matches when one of its fields contains all the query trigrams but
+TYPO_TRIGRAMS, the most one wrong letter can break. Short queries get a
+smaller budget: up to SHORT_TYPO_QUERY trigrams may miss one (a typo at a
+word edge), up to TYPO_TRIGRAMS need all of them. ISINs are codes, not
+words: they need all the query trigrams. Queries too short for a trigram
+fall back to the substring match of the old filter, on ISIN and name.
+Results are ranked by field weight x coverage, an exact ISIN first.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+# Query trigrams a match may miss: one wrong letter breaks at most 3
+TYPO_TRIGRAMS = 3
+# Longest query that may only miss one trigram: missing 3 of 4-6 would
+# match nearly any text sharing a single trigram with the query
+SHORT_TYPO_QUERY = 6
+
+# Relevance weight per field; an exact ISIN match ranks above everything
+FIELD_WEIGHTS = {"isin": 1.0, "name": 1.0, "company": 0.8, "description": 0.6}
+EXACT_ISIN_RELEVANCE = 2.0
+
+# Fields that need every query trigram (a near-miss ISIN is another fund)
+EXACT_FIELDS = {"isin"}
+
+# Fields searched by queries shorter than a trigram, as the old filter did
+SHORT_QUERY_FIELDS = {"isin", "name"}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase, strip accents, collapse punctuation and spaces"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def min_matched(n_grams: int, exact: bool = False) -> int:
+    """Query trigrams a field value must hold to match"""
+    if exact or n_grams <= TYPO_TRIGRAMS:
+        return n_grams
+    if n_grams <= SHORT_TYPO_QUERY:
+        return n_grams - 1
+    return n_grams - TYPO_TRIGRAMS
+
+
+class _FieldIndex:
+    """Trigram postings over the distinct values of one field"""
+    
+    def __init__(self, values: Sequence[Optional[str]], codes: np.ndarray):
+        # values: distinct strings, codes: row -> value (-1 = missing)
+        self._texts = [normalize(v) for v in values]
+        
+        postings: Dict[str, List[int]] = {}
+        for v, text in enumerate(self._texts):
+            for gram in trigrams(text):
+                postings.setdefault(gram, []).append(v)
+        self._postings = {gram: np.array(p, dtype=np.int32) for gram, p in postings.items()}
+        
+        # Rows of each value, CSR: value v owns _rows[_offsets[v]:_offsets[v + 1]]
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = np.asarray(codes)[order]
+        self._rows = order
+        self._offsets = np.searchsorted(sorted_codes, np.arange(len(self._texts) + 1))
+    
+    def _rows_of(self, values: np.ndarray, scores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Expand per-value scores to (rows, scores)"""
+        starts = self._offsets[values]
+        lengths = self._offsets[values + 1] - starts
+        total = int(lengths.sum())
+        # Concatenated ranges starts[k]:starts[k] + lengths[k]
+        shift = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self._rows[shift + np.arange(total)], np.repeat(scores, lengths)
+    
+    def matches(self, grams: set, required: int) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """(rows, coverage) where the value holds at least `required` of the query trigrams"""
+        lists = [p for p in (self._postings.get(g) for g in grams) if p is not None]
+        if len(lists) < required:
+            return None
+        counts = np.bincount(np.concatenate(lists), minlength=len(self._texts))
+        values = np.flatnonzero(counts >= required)
+        return self._rows_of(values, counts[values] / len(grams))
+    
+    def contains(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        """(rows, 1.0) where the value contains the query (queries too short for trigrams)"""
+        values = np.array([v for v, text in enumerate(self._texts) if query in text], dtype=np.intp)
+        return self._rows_of(values, np.ones(len(values)))
+
+
+class FundSearchIndex:
+    """
+    Search index over a FundColumns table (row i == fund i).
+    search() returns matching rows, most relevant first.
+    """
+    
+    def __init__(self, columns):
+        n = columns.size
+        description_codes, descriptions = pd.factorize(pd.Series(columns.description, dtype=object), use_na_sentinel=True)
+        
+        self._size = n
+        self._positions = columns.positions
+        self._fields = {
+            "isin": _FieldIndex(list(columns.isin), np.arange(n)),
+            "name": _FieldIndex(columns.names, columns.name_codes),
+            "company": _FieldIndex(columns.companies, columns.company_codes),
+            "description": _FieldIndex(list(descriptions), description_codes)
+        }
+    
+    def search(self, query: str) -> np.ndarray:
+        """Rows matching the query, ordered by relevance (ties in universe order)"""
+        text = normalize(query)
+        if not text:
+            return np.empty(0, dtype=np.intp)
+        grams = trigrams(text)
+        
+        relevance = np.zeros(self._size)
+        for field, index in self._fields.items():
+            if grams:
+                found = index.matches(grams, min_matched(len(grams), field in EXACT_FIELDS))
+                if found is None:
+                    continue
+            elif field in SHORT_QUERY_FIELDS:
+                found = index.contains(text)
+            else:
+                continue
+            rows, coverage = found
+            np.maximum.at(relevance, rows, FIELD_WEIGHTS[field] * coverage)
+        
+        exact = self._positions.get(query.strip().upper())
+        if exact is not None:
+            relevance[exact] = EXACT_ISIN_RELEVANCE
+        
+        rows = np.flatnonzero(relevance > 0)
+        return rows[np.argsort(-relevance[rows], kind="stable")]
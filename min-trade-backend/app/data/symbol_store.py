@@ -0,0 +1,113 @@
+"""
+Symbol Store - persistent ISIN -> Twelve Data symbol resolutions (SQLite)
+
+Resolving an ISIN costs one or two /symbol_search calls. The store keeps
+every resolution across restarts, positive or negative, with the time of
+the last attempt and the candidate symbols it returned:
+- resolved ISINs never hit the API again
+- unresolvable ISINs are retried only once their entry is older than
+  negative_ttl (listings do appear later)
+Failed requests (network, rate limit) are not recorded.
+
+Mappings can be bulk preloaded from a CSV file (isin,symbol; an empty
+symbol marks a known unresolvable ISIN).
+"""
+
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import csv
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+
+NEGATIVE_TTL = timedelta(days=7)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbols (
+    isin TEXT PRIMARY KEY,
+    symbol TEXT,
+    attempted_at REAL NOT NULL,
+    candidates TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+"""
+
+
+class SymbolResolution(NamedTuple):
+    symbol: Optional[str]  # None: no match
+    attempted_at: float    # unix time of the last search (or preload)
+    candidates: List[str]
+    source: str            # "search" or "preload"
+
+
+class SymbolStore:
+    """SQLite resolution table with negative caching, safe to share between threads"""
+    
+    def __init__(
+        self,
+        path: str,
+        negative_ttl: timedelta = NEGATIVE_TTL,
+        clock: Callable[[], float] = time.time
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._negative_ttl = negative_ttl.total_seconds()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._resolutions: Dict[str, SymbolResolution] = {
+            isin: SymbolResolution(symbol, attempted_at, json.loads(candidates), source)
+            for isin, symbol, attempted_at, candidates, source in self._connection.execute(
+                "SELECT isin, symbol, attempted_at, candidates, source FROM symbols"
+            )
+        }
+        self.logger = logging.getLogger("SymbolStore")
+        self.logger.info(f"Symbol store {path}: {len(self._resolutions)} ISINs")
+    
+    def get(self, isin: str) -> Optional[SymbolResolution]:
+        return self._resolutions.get(isin)
+    
+    def lookup(self, isin: str) -> Tuple[bool, Optional[str]]:
+        """(known, symbol): known is False if never resolved or the negative entry expired"""
+        resolution = self._resolutions.get(isin)
+        if resolution is None:
+            return False, None
+        if resolution.symbol is None and self._clock() - resolution.attempted_at >= self._negative_ttl:
+            return False, None
+        return True, resolution.symbol
+    
+    def record(self, isin: str, symbol: Optional[str], candidates: List[str], source: str = "search") -> None:
+        self._write({isin: SymbolResolution(symbol, self._clock(), list(candidates), source)})
+    
+    def preload(self, path: str) -> int:
+        """Load isin,symbol rows from a CSV file; returns the number of ISINs"""
+        now = self._clock()
+        resolutions = {}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                isin = (row.get("isin") or "").strip()
+                if not isin:
+                    continue
+                symbol = (row.get("symbol") or "").strip() or None
+                resolutions[isin] = SymbolResolution(symbol, now, [symbol] if symbol else [], "preload")
+        self._write(resolutions)
+        self.logger.info(f"Preloaded {len(resolutions)} symbol resolutions from {path}")
+        return len(resolutions)
+    
+    def _write(self, resolutions: Dict[str, SymbolResolution]) -> None:
+        rows = [
+            (isin, r.symbol, r.attempted_at, json.dumps(r.candidates), r.source)
+            for isin, r in resolutions.items()
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO symbols VALUES (?, ?, ?, ?, ?)", rows)
+            self._resolutions.update(resolutions)
+    
+    def stats(self) -> Dict[str, int]:
+        resolved = sum(1 for r in self._resolutions.values() if r.symbol)
+        return {"resolved": resolved, "unresolvable": len(self._resolutions) - resolved}
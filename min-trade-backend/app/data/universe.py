@@ -0,0 +1,207 @@
+"""
+Fund Universe - process-wide store of the ingested and enriched funds
+
+Both the /api router (TroncCommun) and the /trunk router (TrunkEngine) read
+from the same FundUniverse, so the xlsx is ingested and the provider
+enrichment runs exactly once per data version.
+
+- One row per ISIN (duplicate sheet rows are merged)
+- FundColumns struct-of-arrays table, the only resident copy of the funds:
+  pydantic Fund models are built per response (FundColumns.to_fund)
+- FundSearchIndex (trigram index) for the fund search
+- FundFilterIndex (bitsets) for the fund filters and facet counts
+- FundData view for the brains, built once per version and shared
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+import logging
+import os
+import threading
+
+from ..models.fund import Fund, FundData
+from .columns import FundColumns
+from .ingestion import DataIngestion
+from .filters import FundFilterIndex
+from .search import FundSearchIndex
+from .nav_store import NavStore
+from .symbol_store import SymbolStore
+from .provider import (
+    FundDataProvider, MockDataProvider, TwelveDataProvider, AsyncTwelveDataProvider,
+    TWELVEDATA_API_KEY, NAV_STORE_PATH, SYMBOL_STORE_PATH, SYMBOL_PRELOAD_PATH
+)
+
+
+def create_default_provider() -> FundDataProvider:
+    """
+    Select the data provider based on environment.
+    
+    TwelveData free plan has only 8 API credits/minute - enriching 2916 funds takes hours.
+    Use MockDataProvider by default, AsyncTwelveDataProvider only with paid plan (HITRADE_ENV=prod_paid,
+    plan limit in TWELVEDATA_CREDITS_PER_MINUTE). NAV histories and ISIN -> symbol resolutions persist
+    in NAV_STORE_PATH / SYMBOL_STORE_PATH across restarts.
+    """
+    hitrade_env = os.getenv("HITRADE_ENV", "dev")
+    
+    # TODO: Switch to TwelveDataProvider when user upgrades to paid Twelve Data plan
+    # For now, use MockDataProvider to avoid API rate limits
+    if TWELVEDATA_API_KEY and hitrade_env == "prod_paid":
+        symbol_store = SymbolStore(SYMBOL_STORE_PATH)
+        if SYMBOL_PRELOAD_PATH:
+            symbol_store.preload(SYMBOL_PRELOAD_PATH)
+        return AsyncTwelveDataProvider(nav_store=NavStore(NAV_STORE_PATH), symbol_store=symbol_store)
+    return MockDataProvider()
+
+
+class UniverseSnapshot(NamedTuple):
+    """Fund columns and the indexes derived from them, all from the same data version"""
+    columns: Optional[FundColumns]
+    search_index: Optional[FundSearchIndex]
+    filter_index: Optional[FundFilterIndex]
+
+
+class FundUniverse:
+    """
+    Canonical in-memory fund universe.
+    
+    Holds one FundColumns row per ISIN and the derived indexes / FundData view.
+    Views are rebuilt only when the data version changes, never per request.
+    The Fund list parsed and enriched by a load is dropped once the columns
+    are built.
+    """
+    
+    def __init__(
+        self,
+        data_file_path: str,
+        provider: Optional[FundDataProvider] = None,
+        snapshot_path: Optional[str] = None
+    ):
+        self._data_file_path = data_file_path
+        self._snapshot_path = snapshot_path
+        self._provider = provider or create_default_provider()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("FundUniverse")
+        
+        self._version = 0
+        self._fund_data: Optional[List[FundData]] = None
+        self._columns: Optional[FundColumns] = None
+        self._snapshot = UniverseSnapshot(None, None, None)
+    
+    @property
+    def provider(self) -> FundDataProvider:
+        return self._provider
+    
+    @property
+    def provider_name(self) -> str:
+        return "TwelveData" if isinstance(self._provider, TwelveDataProvider) else "Mock"
+    
+    @property
+    def version(self) -> int:
+        """Data version, incremented on every (re)load. 0 means not loaded yet."""
+        return self._version
+    
+    def load(self) -> None:
+        """Ingest and enrich the universe once; later calls are no-ops."""
+        if self._version:
+            return
+        with self._lock:
+            if not self._version:
+                self._load_locked()
+    
+    def reload(self) -> None:
+        """Re-ingest and re-enrich, publishing a new data version."""
+        with self._lock:
+            self._load_locked()
+    
+    def _load_locked(self) -> None:
+        # A fresh DataIngestion per load: its parsed frame and Fund list are not kept
+        funds = DataIngestion(self._data_file_path, snapshot_path=self._snapshot_path).normalize_and_parse()
+        funds = self._deduplicate(funds)
+        funds = self._provider.enrich_funds(funds)
+        
+        # Publish atomically: readers see either the old or the new version
+        columns = FundColumns(funds)
+        search_index = FundSearchIndex(columns)
+        filter_index = FundFilterIndex(columns)
+        self._fund_data = None
+        self._snapshot = UniverseSnapshot(columns, search_index, filter_index)
+        self._columns = columns
+        self._version += 1
+        self.logger.info(f"Fund universe v{self._version} loaded: {len(funds)} funds")
+    
+    def _deduplicate(self, funds: List[Fund]) -> List[Fund]:
+        """Keep the first record per ISIN and merge platforms from duplicate rows."""
+        by_isin: Dict[str, Fund] = {}
+        for fund in funds:
+            canonical = by_isin.get(fund.isin)
+            if canonical is None:
+                by_isin[fund.isin] = fund
+                continue
+            for platform in fund.available_platforms:
+                if platform not in canonical.available_platforms:
+                    canonical.available_platforms.append(platform)
+        
+        merged = len(funds) - len(by_isin)
+        if merged:
+            self.logger.info(f"Merged {merged} duplicate ISIN rows")
+        return list(by_isin.values())
+    
+    @property
+    def columns(self) -> FundColumns:
+        """Struct-of-arrays table of the universe, one row per fund."""
+        self.load()
+        return self._columns
+    
+    def snapshot(self) -> UniverseSnapshot:
+        """Columns and indexes from the same data version (safe across a reload)."""
+        self.load()
+        return self._snapshot
+    
+    @property
+    def fund_data(self) -> List[FundData]:
+        """FundData view of the universe for the brains, built once per version."""
+        self.load()
+        fund_data = self._fund_data
+        if fund_data is None:
+            columns = self._columns
+            fund_data = [self._to_fund_data(columns.to_fund(i)) for i in range(columns.size)]
+            self._fund_data = fund_data
+        return fund_data
+    
+    @staticmethod
+    def _to_fund_data(fund: Fund) -> FundData:
+        # Fund fields are already validated: construct without re-validating so
+        # the view shares the platform list instead of copying it
+        metrics = fund.metrics
+        return FundData.model_construct(
+            fund_id=fund.isin,
+            fund_name=fund.name,
+            isin=fund.isin,
+            category=fund.asset_class if isinstance(fund.asset_class, str) else fund.asset_class.value,
+            manager=fund.management_company,
+            sri=fund.sri,
+            volatility_annualized=metrics.vol_60d if metrics else None,
+            max_drawdown=metrics.max_drawdown if metrics else None,
+            sharpe_ratio=metrics.sharpe_ratio if metrics else None,
+            sortino_ratio=metrics.sortino_ratio if metrics else None,
+            returns_1y=metrics.perf_1y if metrics else None,
+            returns_3y=metrics.perf_3y if metrics else None,
+            available_platforms=fund.available_platforms,
+            is_standard_isin=fund.is_standard_isin,
+            label=fund.label
+        )
+
+
+_universes: Dict[str, FundUniverse] = {}
+_universes_lock = threading.Lock()
+
+
+def get_fund_universe(data_file_path: str) -> FundUniverse:
+    """Get the process-wide FundUniverse for a data file."""
+    universe = _universes.get(data_file_path)
+    if universe is None:
+        with _universes_lock:
+            universe = _universes.get(data_file_path)
+            if universe is None:
+                universe = FundUniverse(data_file_path)
+                _universes[data_file_path] = universe
+    return universe
@@ -10,8 +10,8 @@ Modular brain architecture ("Minecraft-style mods"):
 - TrunkRankingEntry: Entry in the global ranking
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer
+from typing import Any, Optional, List, Dict
 from enum import Enum
 from datetime import datetime
 
@@ -143,6 +143,17 @@ class TrunkOutput(BaseModel):
     brain_weights_used: Dict[str, float] = Field(default_factory=dict)
     active_brains: List[str] = Field(default_factory=list)
     total_funds: int = Field(default=0)
+    
+    # Secondary indexes built once per run by the TrunkEngine, not part of
+    # the serialized output: RankingIndex over global_ranking and
+    # fund_id -> position in fund_composite_scores
+    _ranking_index: Any = PrivateAttr(default=None)
+    _fund_positions: Optional[Dict[str, int]] = PrivateAttr(default=None)
+    
+    @field_serializer("fund_composite_scores", mode="wrap")
+    def _serialize_composites(self, value, handler):
+        # The columnar engine stores a lazy sequence, only materialized here
+        return handler(list(value))
 
 
 class ContradictionLog(BaseModel):
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from enum import Enum
 from datetime import date
 
@@ -20,6 +20,20 @@ class InvestmentHorizon(str, Enum):
     LONG = "long"  # 7+ years
 
 
+class AllocationMethod(str, Enum):
+    SCORE = "score"  # proportional to fundamental score (V1)
+    MIN_VARIANCE = "min_variance"
+    RISK_PARITY = "risk_parity"
+    SCORE_TILTED = "score_tilted"  # minimum variance tilted towards high scores
+
+
+class RebalanceFrequency(str, Enum):
+    NONE = "none"  # buy and hold
+    MONTHLY = "monthly"
+    QUARTERLY = "quarterly"
+    YEARLY = "yearly"
+
+
 class Priority(str, Enum):
     HIGH = "high"
     MEDIUM = "medium"
@@ -156,6 +170,17 @@ class FundListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    facets: Optional[Dict[str, Dict[str, int]]] = None
+
+
+class FundBatchRequest(BaseModel):
+    isins: List[str] = Field(min_length=1, max_length=1000, description="ISINs to resolve")
+    with_scores: bool = Field(default=False, description="Include Cerveau Fondamental scores")
+
+
+class FundBatchResponse(BaseModel):
+    funds: List[Fund]
+    missing: List[str] = Field(default_factory=list, description="Requested ISINs not found")
 
 
 class PortfolioRequest(BaseModel):
@@ -163,6 +188,7 @@ class PortfolioRequest(BaseModel):
     horizon: InvestmentHorizon
     target_sri: int = Field(ge=1, le=7, description="Target risk level (SRI)")
     sri_tolerance: int = Field(default=1, ge=0, le=2, description="Tolerance around target SRI")
+    allocation_method: AllocationMethod = Field(default=AllocationMethod.SCORE, description="How weights are allocated")
 
 
 class FundAllocation(BaseModel):
@@ -180,3 +206,61 @@ class PortfolioSuggestion(BaseModel):
     explanation: str
     average_confidence: Optional[float] = None
     consensus_summary: Optional[str] = None
+
+
+class BacktestRequest(BaseModel):
+    """Backtest of a risk profile's suggested allocation, or of explicit weights"""
+    horizon: InvestmentHorizon = InvestmentHorizon.MEDIUM
+    target_sri: int = Field(default=4, ge=1, le=7, description="Target risk level (SRI)")
+    sri_tolerance: int = Field(default=1, ge=0, le=2, description="Tolerance around target SRI")
+    allocation_method: AllocationMethod = Field(default=AllocationMethod.SCORE, description="How weights are allocated")
+    weights: Optional[Dict[str, float]] = Field(default=None, description="ISIN -> allocation percent, replaces the profile")
+    start_date: Optional[date] = Field(default=None, description="Defaults to 3 years before end_date")
+    end_date: Optional[date] = Field(default=None, description="Defaults to today")
+    rebalance: RebalanceFrequency = RebalanceFrequency.MONTHLY
+    initial_amount: float = Field(default=10000.0, gt=0, description="Starting value in EUR")
+
+
+class BacktestResult(BaseModel):
+    start_date: date
+    end_date: date
+    rebalance: RebalanceFrequency
+    weights: Dict[str, float]  # ISIN -> allocation percent
+    dates: List[date]
+    equity: List[float]  # portfolio value in EUR at each date
+    total_return: float
+    annualized_return: float
+    annualized_volatility: float
+    max_drawdown: float
+    sharpe_ratio: Optional[float] = None
+
+
+class ProjectionRequest(BaseModel):
+    """Monte Carlo projection of a risk profile's suggested allocation, or of explicit weights"""
+    horizon: InvestmentHorizon = InvestmentHorizon.MEDIUM
+    target_sri: int = Field(default=4, ge=1, le=7, description="Target risk level (SRI)")
+    sri_tolerance: int = Field(default=1, ge=0, le=2, description="Tolerance around target SRI")
+    allocation_method: AllocationMethod = Field(default=AllocationMethod.SCORE, description="How weights are allocated")
+    weights: Optional[Dict[str, float]] = Field(default=None, description="ISIN -> allocation percent, replaces the profile")
+    years: Optional[int] = Field(default=None, ge=1, le=40, description="Defaults to the horizon: 3, 7 or 10 years")
+    initial_amount: float = Field(default=10000.0, gt=0, description="Starting value in EUR")
+
+
+class ProjectionBand(BaseModel):
+    percentile: int
+    final_value: float  # EUR
+    annualized_return: float
+    max_drawdown: float
+
+
+class ProjectionResult(BaseModel):
+    horizon: InvestmentHorizon
+    years: int
+    paths: int
+    initial_amount: float
+    weights: Dict[str, float]  # ISIN -> allocation percent
+    history_start: date
+    history_end: date
+    probability_of_loss: float
+    bands: List[ProjectionBand]
+    yearly_values: Dict[int, List[float]]  # percentile -> value in EUR at each year end
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
+from typing import Dict, Optional, List
 from ..models.fund import (
-    Fund, FundListResponse, AssetClass, InvestmentHorizon,
-    PortfolioRequest, PortfolioSuggestion
+    Fund, FundListResponse, FundBatchRequest, FundBatchResponse,
+    AssetClass, InvestmentHorizon, PortfolioRequest, PortfolioSuggestion,
+    BacktestRequest, BacktestResult, ProjectionRequest, ProjectionResult
 )
 from ..core.tronc_commun import TroncCommun
 import os
@@ -35,26 +36,50 @@ async def get_funds(
     asset_class: Optional[AssetClass] = None,
     max_sri: Optional[int] = Query(None, ge=1, le=7),
     min_sri: Optional[int] = Query(None, ge=1, le=7),
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    platform: Optional[str] = None,
+    label: Optional[str] = None
 ):
-    """Get paginated list of all funds with optional filters."""
+    """
+    Get paginated list of all funds with optional filters.
+    
+    `search` matches ISIN, name, management company and description,
+    tolerates typos and returns the most relevant funds first.
+    `facets` counts the matching funds per asset class, SRI, platform and
+    label; each dimension ignores its own filter.
+    """
     tc = get_tronc_commun()
-    funds, total = tc.get_all_funds(
+    funds, total, facets = tc.get_all_funds(
         page=page,
         page_size=page_size,
         asset_class=asset_class,
         max_sri=max_sri,
         min_sri=min_sri,
-        search=search
+        search=search,
+        platform=platform,
+        label=label
     )
     return FundListResponse(
         funds=funds,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        facets=facets
     )
 
 
+@router.post("/funds/batch", response_model=FundBatchResponse)
+def get_funds_batch(request: FundBatchRequest):
+    """
+    Resolve a list of ISINs in a single round trip.
+    
+    Funds are returned in request order; unknown ISINs are listed in `missing`.
+    """
+    tc = get_tronc_commun()
+    funds, missing = tc.get_funds_by_isins(request.isins, with_scores=request.with_scores)
+    return FundBatchResponse(funds=funds, missing=missing)
+
+
 @router.get("/funds/{isin}", response_model=Fund)
 async def get_fund(isin: str):
     """Get a single fund by ISIN."""
@@ -66,7 +91,7 @@ async def get_fund(isin: str):
 
 
 @router.get("/top-week", response_model=List[Fund])
-async def get_top_week(
+def get_top_week(
     limit: int = Query(20, ge=1, le=50)
 ):
     """
@@ -80,7 +105,7 @@ async def get_top_week(
 
 
 @router.get("/ranked", response_model=List[Fund])
-async def get_ranked_funds(
+def get_ranked_funds(
     target_sri: int = Query(4, ge=1, le=7),
     horizon: InvestmentHorizon = InvestmentHorizon.MEDIUM,
     limit: int = Query(100, ge=1, le=500)
@@ -103,7 +128,7 @@ async def get_ranked_funds(
 
 
 @router.post("/portfolio/suggest", response_model=PortfolioSuggestion)
-async def suggest_portfolio(request: PortfolioRequest):
+def suggest_portfolio(request: PortfolioRequest):
     """
     Generate a portfolio suggestion based on user requirements.
     
@@ -112,33 +137,71 @@ async def suggest_portfolio(request: PortfolioRequest):
     2. Scores remaining funds with Cerveau Fondamental
     3. Selects top funds ensuring diversification
     4. Allocates amounts based on scores (max 20% per fund)
+    
+    Steps 1-4 are precomputed per risk profile (target_sri, sri_tolerance,
+    horizon, allocation_method); a request only scales the allocation to its amount.
+    
+    `allocation_method` min_variance / risk_parity / score_tilted replaces
+    steps 3-4 with an optimizer over the funds' NAV return covariance.
     """
     tc = get_tronc_commun()
     return tc.suggest_portfolio(request)
 
 
+@router.post("/portfolio/backtest", response_model=BacktestResult)
+def backtest_portfolio(request: BacktestRequest):
+    """
+    Simulate how a suggested portfolio would have performed.
+    
+    Backtests the allocation of the risk profile (same fields as
+    /portfolio/suggest), or the explicit `weights` (ISIN -> percent), over
+    past NAV histories with periodic rebalancing.
+    """
+    tc = get_tronc_commun()
+    _check_weights(tc, request.weights)
+    try:
+        return tc.backtest_portfolio(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/portfolio/projection", response_model=ProjectionResult)
+def project_portfolio(request: ProjectionRequest):
+    """
+    Monte Carlo projection of a suggested portfolio.
+    
+    Percentile bands (5/25/50/75/95) of the final value, annualized return
+    and maximum drawdown over the horizon (3, 7 or 10 years, or `years`),
+    from 10,000 paths bootstrapped on the portfolio's NAV history.
+    """
+    tc = get_tronc_commun()
+    _check_weights(tc, request.weights)
+    try:
+        return tc.project_portfolio(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _check_weights(tc: TroncCommun, weights: Optional[Dict[str, float]]) -> None:
+    """400/404 for explicit weights that cannot be simulated"""
+    if weights is None:
+        return
+    if sum(weights.values()) <= 0 or min(weights.values()) < 0:
+        raise HTTPException(status_code=400, detail="Weights must be non-negative with a positive total")
+    _, missing = tc.get_funds_by_isins(list(weights))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Funds not found: {', '.join(missing)}")
+
+
 @router.get("/stats")
 async def get_stats():
     """Get statistics about the fund database."""
     tc = get_tronc_commun()
-    funds = tc.funds
-    
-    sri_distribution = {}
-    asset_class_distribution = {}
-    platform_distribution = {}
-    
-    for fund in funds:
-        sri_distribution[fund.sri] = sri_distribution.get(fund.sri, 0) + 1
-        asset_class = fund.asset_class if isinstance(fund.asset_class, str) else fund.asset_class.value
-        asset_class_distribution[asset_class] = asset_class_distribution.get(asset_class, 0) + 1
-        for platform in fund.available_platforms:
-            platform_distribution[platform] = platform_distribution.get(platform, 0) + 1
+    stats = tc.get_universe_stats()
     
     return {
-        "total_funds": len(funds),
-        "standard_isin_funds": len([f for f in funds if f.is_standard_isin]),
-        "special_funds": len([f for f in funds if not f.is_standard_isin]),
-        "sri_distribution": dict(sorted(sri_distribution.items())),
-        "asset_class_distribution": asset_class_distribution,
-        "top_platforms": dict(sorted(platform_distribution.items(), key=lambda x: x[1], reverse=True)[:10])
+        **stats,
+        "score_cache": tc.get_score_cache_stats(),
+        "portfolio_plans": tc.get_portfolio_plan_stats(),
+        "projections": tc.get_projection_stats()
     }
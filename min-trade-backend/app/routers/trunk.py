@@ -14,14 +14,13 @@ from typing import Optional, List, Dict
 import logging
 
 from ..models.brain import (
-    BrainRegistryItem, TrunkRankingEntry, TrunkOutput,
+    BrainRegistryItem, BrainOutput, TrunkRankingEntry, TrunkOutput,
     AdaptiveWeights, ConsensusLevel, FundScoreComposite
 )
 from ..models.fund import FundData
-from ..core.trunk_engine import TrunkEngine
+from ..core.trunk_matrix import ColumnarTrunkEngine
 from ..brains.fundamental import CerveauFondamental
-from ..data.ingestion import DataIngestion
-from ..data.provider import MockDataProvider
+from ..data.universe import get_fund_universe
 import os
 from pathlib import Path
 
@@ -35,18 +34,24 @@ DATA_FILE_PATH = os.environ.get(
     str(_current_dir / "data" / "files" / "funds_data.xlsx")
 )
 
-_trunk_engine: Optional[TrunkEngine] = None
+_trunk_engine: Optional[ColumnarTrunkEngine] = None
 _fundamental_brain: Optional[CerveauFondamental] = None
-_fund_data_cache: Optional[List[FundData]] = None
 _trunk_output_cache: Optional[TrunkOutput] = None
+_trunk_output_version: int = 0  # FundUniverse version the cached output was built from
 
+# Brain outputs do not depend on trunk weights or activation: cached per brain
+# and per FundUniverse version, separately from the aggregated TrunkOutput
+_brain_output_cache: Dict[str, BrainOutput] = {}
+_fund_sri_map: Dict[str, int] = {}
+_brain_outputs_version: int = 0
 
-def get_trunk_engine() -> TrunkEngine:
+
+def get_trunk_engine() -> ColumnarTrunkEngine:
     """Get or initialize the TrunkEngine singleton"""
     global _trunk_engine
     if _trunk_engine is None:
-        _trunk_engine = TrunkEngine()
-        logger.info("TrunkEngine initialized")
+        _trunk_engine = ColumnarTrunkEngine()
+        logger.info("TrunkEngine initialized (columnar)")
     return _trunk_engine
 
 
@@ -60,65 +65,51 @@ def get_fundamental_brain() -> CerveauFondamental:
 
 
 def get_fund_data() -> List[FundData]:
-    """Load and cache fund data"""
-    global _fund_data_cache
-    if _fund_data_cache is None:
-        ingestion = DataIngestion(DATA_FILE_PATH)
-        ingestion.load_data()
-        funds = ingestion.normalize_and_parse()
-        
-        # Enrich with mock data
-        provider = MockDataProvider()
-        funds = provider.enrich_funds(funds)
-        
-        # Convert Fund to FundData
-        _fund_data_cache = []
-        for fund in funds:
-            fund_data = FundData(
-                fund_id=fund.isin,
-                fund_name=fund.name,
-                isin=fund.isin,
-                category=fund.asset_class if isinstance(fund.asset_class, str) else fund.asset_class.value,
-                manager=fund.management_company,
-                sri=fund.sri,
-                volatility_annualized=fund.metrics.vol_60d if fund.metrics else None,
-                max_drawdown=fund.metrics.max_drawdown if fund.metrics else None,
-                sharpe_ratio=fund.metrics.sharpe_ratio if fund.metrics else None,
-                sortino_ratio=fund.metrics.sortino_ratio if fund.metrics else None,
-                returns_1y=fund.metrics.perf_1y if fund.metrics else None,
-                returns_3y=fund.metrics.perf_3y if fund.metrics else None,
-                available_platforms=fund.available_platforms,
-                is_standard_isin=fund.is_standard_isin,
-                label=fund.label
-            )
-            _fund_data_cache.append(fund_data)
-        
-        logger.info(f"Loaded {len(_fund_data_cache)} funds")
+    """FundData view of the shared fund universe (same store as the /api router)"""
+    return get_fund_universe(DATA_FILE_PATH).fund_data
+
+
+def get_brain_outputs() -> List[BrainOutput]:
+    """
+    Output of each brain for the current fund data.
+    A brain only re-runs when the fund universe version changes.
+    """
+    global _fund_sri_map, _brain_outputs_version
+    
+    universe = get_fund_universe(DATA_FILE_PATH)
+    fund_data = universe.fund_data
     
-    return _fund_data_cache
+    if _brain_outputs_version != universe.version:
+        _brain_output_cache.clear()
+        _fund_sri_map = {fd.fund_id: fd.sri for fd in fund_data}
+        _brain_outputs_version = universe.version
+    
+    for brain in (get_fundamental_brain(),):
+        if brain.brain_id not in _brain_output_cache:
+            # Get brain output using the modular interface
+            _brain_output_cache[brain.brain_id] = brain.analyze_all_funds_modular(fund_data)
+            logger.info(f"Brain {brain.brain_id} analyzed {len(fund_data)} funds")
+    
+    return list(_brain_output_cache.values())
 
 
 def get_trunk_output() -> TrunkOutput:
     """Process brain outputs and cache the result"""
-    global _trunk_output_cache
+    global _trunk_output_cache, _trunk_output_version
+    
+    universe = get_fund_universe(DATA_FILE_PATH)
     
-    if _trunk_output_cache is None:
+    if _trunk_output_cache is None or _trunk_output_version != universe.version:
         engine = get_trunk_engine()
-        brain = get_fundamental_brain()
-        fund_data = get_fund_data()
+        brain_outputs = get_brain_outputs()
         
-        # Build fund SRI map
-        fund_sri_map = {fd.fund_id: fd.sri for fd in fund_data}
-        engine.set_fund_sri_cache(fund_sri_map)
-        
-        # Get brain output using the modular interface
-        brain_output = brain.analyze_all_funds_modular(fund_data)
-        
-        # Process through trunk engine
+        # Unchanged brain outputs are not re-aggregated by the engine: only
+        # the weighted composite and the ranking are recomputed
         _trunk_output_cache = engine.process_brain_outputs(
-            brain_outputs=[brain_output],
-            fund_sri_map=fund_sri_map
+            brain_outputs=brain_outputs,
+            fund_sri_map=_fund_sri_map
         )
+        _trunk_output_version = universe.version
         
         logger.info(f"Processed {_trunk_output_cache.total_funds} funds through TrunkEngine")
     
@@ -150,7 +141,8 @@ async def get_ranking(
 @router.get("/funds_for_allocation", response_model=List[TrunkRankingEntry])
 async def get_funds_for_allocation(
     sri_target: int = Query(4, ge=1, le=7, description="Target SRI (1-7)"),
-    tolerance: float = Query(0.5, ge=0, le=3, description="Tolerance around target SRI")
+    tolerance: float = Query(0.5, ge=0, le=3, description="Tolerance around target SRI"),
+    limit: Optional[int] = Query(None, ge=1, description="Number of top eligible funds to return")
 ):
     """
     Get funds eligible for allocation based on SRI target.
@@ -164,7 +156,8 @@ async def get_funds_for_allocation(
     eligible = engine.get_funds_for_allocation(
         trunk_output=trunk_output,
         sri_target=sri_target,
-        tolerance=tolerance
+        tolerance=tolerance,
+        limit=limit
     )
     
     return eligible
@@ -217,13 +210,13 @@ async def get_fund_composite(fund_id: str):
     
     Shows scores from each brain, consensus level, and final composite.
     """
+    engine = get_trunk_engine()
     trunk_output = get_trunk_output()
     
-    for score in trunk_output.fund_composite_scores:
-        if score.fund_id == fund_id:
-            return score
-    
-    raise HTTPException(status_code=404, detail=f"Fund {fund_id} not found")
+    composite = engine.get_composite(trunk_output, fund_id)
+    if composite is None:
+        raise HTTPException(status_code=404, detail=f"Fund {fund_id} not found")
+    return composite
 
 
 @router.post("/weights")
@@ -241,7 +234,7 @@ async def update_weights(weights: AdaptiveWeights):
     try:
         engine.update_weights(weights)
         
-        # Invalidate cache to force reprocessing with new weights
+        # Brain outputs are kept: only the weighted step is redone
         _trunk_output_cache = None
         
         return {
@@ -261,7 +254,7 @@ async def activate_brain(brain_id: str):
     engine = get_trunk_engine()
     
     if engine.registry.activate_brain(brain_id):
-        _trunk_output_cache = None  # Invalidate cache
+        _trunk_output_cache = None  # Brain outputs are reused, only re-weighted
         return {"status": "success", "message": f"Brain {brain_id} activated"}
     else:
         raise HTTPException(status_code=404, detail=f"Brain {brain_id} not found")
@@ -275,7 +268,7 @@ async def deactivate_brain(brain_id: str):
     engine = get_trunk_engine()
     
     if engine.registry.deactivate_brain(brain_id):
-        _trunk_output_cache = None  # Invalidate cache
+        _trunk_output_cache = None  # Brain outputs are reused, only re-weighted
         return {"status": "success", "message": f"Brain {brain_id} deactivated"}
     else:
         raise HTTPException(status_code=404, detail=f"Brain {brain_id} not found")
@@ -0,0 +1,86 @@
+"""
+Benchmark and correctness check: vectorized backtest engine
+
+Checks the equity curves against a naive day-by-day loop over holdings
+(reset to value * weights at each rebalancing date) for every frequency,
+then times backtesting many portfolios at once on three years of daily
+returns for a few hundred funds.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_backtest
+"""
+
+import time
+
+import numpy as np
+
+from app.core.backtest import backtest, rebalance_periods
+from app.models.fund import RebalanceFrequency
+
+FUNDS = 300
+DAYS = 756
+PORTFOLIOS = [1, 63, 250, 1_000]
+REPEATS = 5
+
+
+def _returns(rng: np.random.Generator, days: int = DAYS, funds: int = FUNDS) -> tuple[np.ndarray, np.ndarray]:
+    dates = np.datetime64("2022-01-03") + np.arange(days)
+    returns = rng.normal(0.0002, 0.01, (days, funds))
+    # Some funds start late
+    returns[:rng.integers(0, days // 2), rng.random(funds) < 0.1] = np.nan
+    return returns, dates
+
+
+def _weights(rng: np.random.Generator, portfolios: int, funds: int = FUNDS) -> np.ndarray:
+    weights = np.zeros((portfolios, funds))
+    for row in weights:
+        held = rng.choice(funds, 15, replace=False)
+        row[held] = rng.uniform(1, 20, 15)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def _naive(returns: np.ndarray, dates: np.ndarray, weights: np.ndarray, frequency: RebalanceFrequency) -> np.ndarray:
+    periods = rebalance_periods(dates, frequency)
+    returns = np.nan_to_num(returns, nan=0.0)
+    equity = np.ones((len(returns) + 1, len(weights)))
+    for p, w in enumerate(weights):
+        value, holdings = 1.0, None
+        for t in range(len(returns)):
+            if t == 0 or periods[t] != periods[t - 1]:
+                holdings = value * w
+            holdings = holdings * (1 + returns[t])
+            value = holdings.sum()
+            equity[t + 1, p] = value
+    return equity
+
+
+def check_correctness() -> None:
+    rng = np.random.default_rng(3)
+    returns, dates = _returns(rng, days=400, funds=40)
+    weights = _weights(rng, 8, funds=40)
+    for frequency in RebalanceFrequency:
+        equity, metrics = backtest(returns, dates, weights, frequency)
+        assert np.allclose(equity, _naive(returns, dates, weights, frequency), rtol=1e-10), frequency
+        assert np.allclose(metrics.total_return, (equity[-1] - 1) * 100)
+        assert (metrics.max_drawdown >= 0).all()
+
+
+def main() -> None:
+    check_correctness()
+    print("correctness: OK")
+
+    rng = np.random.default_rng(7)
+    returns, dates = _returns(rng)
+    print(f"{DAYS} days x {FUNDS} funds")
+    print(f"{'portfolios':>10} {'total (ms)':>11} {'backtests/s':>12}")
+    for portfolios in PORTFOLIOS:
+        weights = _weights(rng, portfolios)
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            backtest(returns, dates, weights, RebalanceFrequency.MONTHLY)
+        elapsed = (time.perf_counter() - start) / REPEATS
+        print(f"{portfolios:>10} {elapsed * 1000:>11.1f} {portfolios / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark and equivalence check: list-comprehension filters vs bitset filters
+
+Checks that FundFilterIndex selections and facet counts match plain Python
+filters over the Fund list (random selections, with and without a search
+base), then times one filtered /api/funds page with its facets as the
+universe grows.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_filters
+"""
+
+import random
+import time
+
+import numpy as np
+
+from app.data.columns import ASSET_CLASSES, FundColumns
+from app.data.filters import DIMENSIONS, FundFilterIndex
+from app.models.fund import Fund
+
+SIZES = [3_000, 30_000, 100_000]
+PLATFORMS = ["SWISSLIFE", "MMA", "CARDIF", "GENERALI", "VIEPLUS", "NORTIA CT", "NORTIA LM", "NORTIA PEA"]
+LABELS = ["DIVERS", "SELECTION LES ASSOCIES", "UCS GROUPEMENT", None]
+REPEATS = 20
+
+
+def _funds(n: int, seed: int = 7) -> list[Fund]:
+    rng = random.Random(seed)
+    return [
+        Fund(
+            isin=f"FR{i:010d}",
+            name=f"Fund {i}",
+            asset_class=rng.choice(ASSET_CLASSES),
+            sri=rng.randint(1, 7),
+            available_platforms=rng.sample(PLATFORMS, rng.randint(1, 3)),
+            label=rng.choice(LABELS)
+        )
+        for i in range(n)
+    ]
+
+
+def _value(fund: Fund, dimension: str):
+    if dimension == "asset_class":
+        return fund.asset_class if isinstance(fund.asset_class, str) else fund.asset_class.value
+    return getattr(fund, dimension)
+
+
+def _matches(fund: Fund, selection: dict, skip: str = None) -> bool:
+    for dimension, values in selection.items():
+        if dimension == skip:
+            continue
+        if dimension == "platform":
+            if not set(fund.available_platforms) & set(values):
+                return False
+        elif _value(fund, dimension) not in values:
+            return False
+    return True
+
+
+def _expected_facets(funds: list[Fund], selection: dict) -> dict:
+    facets = {}
+    for dimension in DIMENSIONS:
+        counts = {}
+        for fund in funds:
+            if not _matches(fund, selection, skip=dimension):
+                continue
+            values = fund.available_platforms if dimension == "platform" else [_value(fund, dimension)]
+            for value in values:
+                if value is not None:
+                    counts[value] = counts.get(value, 0) + 1
+        facets[dimension] = counts
+    return facets
+
+
+def _selection(rng: random.Random) -> dict:
+    choices = {
+        "asset_class": ASSET_CLASSES,
+        "sri": list(range(1, 8)),
+        "platform": PLATFORMS,
+        "label": LABELS[:-1]
+    }
+    return {
+        dimension: rng.sample(values, rng.randint(1, 3))
+        for dimension, values in choices.items()
+        if rng.random() < 0.5
+    }
+
+
+def check_equivalence() -> None:
+    rng = random.Random(3)
+    funds = _funds(2_000)
+    index = FundFilterIndex(FundColumns(funds))
+    for _ in range(200):
+        selection = _selection(rng)
+        base_rows = np.array(sorted(rng.sample(range(len(funds)), 300)))
+        for base, subset in ((None, funds), (index.from_rows(base_rows), [funds[i] for i in base_rows])):
+            bits = index.select(selection, base)
+            expected = [f.isin for f in subset if _matches(f, selection)]
+            assert [funds[i].isin for i in index.rows(bits)] == expected, selection
+            assert index.facets(selection, base) == _expected_facets(subset, selection), selection
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main() -> None:
+    check_equivalence()
+    print("equivalence: OK")
+
+    # Actions, SRI 3..5, one platform: first page plus facet counts
+    selection = {"asset_class": ["actions"], "sri": [3, 4, 5], "platform": ["CARDIF"]}
+    print(f"{'funds':>8} {'lists (ms)':>11} {'bitsets (ms)':>13} {'speedup':>8}")
+    for size in SIZES:
+        funds = _funds(size)
+        index = FundFilterIndex(FundColumns(funds))
+
+        def lists():
+            page = [f for f in funds if _matches(f, selection)][:50]
+            return page, _expected_facets(funds, selection)
+
+        def bitsets():
+            page = [funds[i] for i in index.rows(index.select(selection))[:50]]
+            return page, index.facets(selection)
+
+        linear = _time(lists)
+        indexed = _time(bitsets)
+        print(f"{size:>8} {linear * 1000:>11.3f} {indexed * 1000:>13.3f} {linear / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
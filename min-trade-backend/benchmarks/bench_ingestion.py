@@ -0,0 +1,44 @@
+"""
+Benchmark: row vs columnar ingestion in DataIngestion.normalize_and_parse
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_ingestion [path/to/funds_data.xlsx]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.data.ingestion import DataIngestion
+
+DEFAULT_FILE = Path(__file__).parent.parent / "app" / "data" / "files" / "funds_data.xlsx"
+SIZES = [3_000, 30_000, 300_000]
+
+
+def _time_parse(ingestion: DataIngestion, columnar: bool) -> float:
+    start = time.perf_counter()
+    ingestion.normalize_and_parse(columnar=columnar)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    file_path = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_FILE)
+    base = DataIngestion(file_path, use_snapshot=False).load_data()
+
+    print(f"{'rows':>8} {'row (s)':>10} {'columnar (s)':>13} {'speedup':>8}")
+    for size in SIZES:
+        repeats = -(-size // len(base))
+        frame = pd.concat([base] * repeats, ignore_index=True).iloc[:size]
+
+        ingestion = DataIngestion(file_path, use_snapshot=False)
+        ingestion._raw_data = frame
+
+        row_time = _time_parse(ingestion, columnar=False)
+        columnar_time = _time_parse(ingestion, columnar=True)
+        print(f"{size:>8} {row_time:>10.3f} {columnar_time:>13.3f} {row_time / columnar_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
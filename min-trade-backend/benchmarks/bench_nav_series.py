@@ -0,0 +1,200 @@
+"""
+Benchmark and equivalence check: List[NavPoint] vs columnar NavSeries
+
+Builds 3-year daily NAV histories for a universe both ways and compares
+memory (tracemalloc) and the time of the metric helpers of
+TwelveDataProvider. The per-object helpers the provider used before
+NavSeries are kept below as the reference: metrics must be identical,
+including on edge cases (zero and negative NAVs, flat and short series).
+Also checks that NavSeries.between() slices without copying.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_nav_series
+"""
+
+from datetime import date, timedelta
+import logging
+import math
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.data.nav_series import NavSeries
+from app.data.provider import MockDataProvider, TwelveDataProvider
+from app.models.fund import FundMetrics, NavPoint
+
+SIZES = [1_000, 3_000]
+END = date(2026, 6, 12)
+START = END - timedelta(days=365 * 3 + 30)
+
+
+# Reference: metric helpers on List[NavPoint]
+
+def _returns(nav_points: list[NavPoint]) -> list[float]:
+    returns = []
+    for i in range(1, len(nav_points)):
+        prev_nav = nav_points[i - 1].value
+        if prev_nav > 0:
+            returns.append((nav_points[i].value - prev_nav) / prev_nav)
+    return returns
+
+
+def _performance(nav_points: list[NavPoint], days: int):
+    if len(nav_points) < 2:
+        return None
+    target_date = nav_points[-1].date - timedelta(days=days)
+    closest_point, min_diff = None, float("inf")
+    for point in nav_points:
+        diff = abs((point.date - target_date).days)
+        if diff < min_diff:
+            min_diff, closest_point = diff, point
+    if closest_point and closest_point.value > 0:
+        return round(((nav_points[-1].value - closest_point.value) / closest_point.value) * 100, 2)
+    return None
+
+
+def _volatility(returns: list[float], window: int = 60):
+    window = min(window, len(returns))
+    if window < 5:
+        return None
+    recent = returns[-window:]
+    mean = sum(recent) / len(recent)
+    return round(math.sqrt(sum((r - mean) ** 2 for r in recent) / len(recent)) * math.sqrt(252) * 100, 2)
+
+
+def _max_drawdown(nav_points: list[NavPoint]):
+    if len(nav_points) < 2:
+        return None
+    peak, max_dd = nav_points[0].value, 0.0
+    for point in nav_points:
+        if point.value > peak:
+            peak = point.value
+        if peak > 0:
+            max_dd = max(max_dd, (peak - point.value) / peak)
+    return round(max_dd * 100, 2)
+
+
+def _sharpe(returns: list[float], risk_free_rate: float = 0.02):
+    if len(returns) < 30:
+        return None
+    mean = sum(returns) / len(returns)
+    vol = math.sqrt(sum((r - mean) ** 2 for r in returns) / len(returns)) * math.sqrt(252)
+    return None if vol == 0 else round((mean * 252 - risk_free_rate) / vol, 2)
+
+
+def _sortino(returns: list[float], risk_free_rate: float = 0.02):
+    if len(returns) < 30:
+        return None
+    mean = sum(returns) / len(returns)
+    negative = [r for r in returns if r < 0]
+    if not negative:
+        return None
+    downside = math.sqrt(sum(r ** 2 for r in negative) / len(returns)) * math.sqrt(252)
+    return None if downside == 0 else round((mean * 252 - risk_free_rate) / downside, 2)
+
+
+def reference_metrics(nav_points: list[NavPoint]):
+    if len(nav_points) < 10:
+        return None
+    returns = _returns(nav_points)
+    if not returns:
+        return None
+    return FundMetrics(
+        perf_1w=_performance(nav_points, 7),
+        perf_1m=_performance(nav_points, 30),
+        perf_3m=_performance(nav_points, 90),
+        perf_1y=_performance(nav_points, 365),
+        perf_3y=_performance(nav_points, 365 * 3),
+        vol_60d=_volatility(returns, 60),
+        max_drawdown=_max_drawdown(nav_points),
+        sharpe_ratio=_sharpe(returns),
+        sortino_ratio=_sortino(returns),
+    )
+
+
+def columnar_metrics(provider: TwelveDataProvider, nav: NavSeries):
+    if len(nav) < 10 or not len(provider._calculate_returns(nav)):
+        return None
+    provider._metrics_cache.clear()
+    return provider._metrics_from_nav("bench", nav)
+
+
+def _edge_cases(rng: random.Random) -> list[NavSeries]:
+    base = MockDataProvider().get_nav_history("FR0000000001", START, END)
+    values = base.values.copy()
+    zeros = values.copy()
+    zeros[rng.sample(range(len(values)), 20)] = 0.0
+    negative = values - 101.0
+    flat = np.full(len(values), 100.0)
+    gaps = base.dates[::3], values[::3]
+    return [
+        NavSeries(base.dates, zeros),
+        NavSeries(base.dates, negative),
+        NavSeries(base.dates, flat),
+        NavSeries(*gaps),
+        base.between(END - timedelta(days=14), END),
+        base.between(END - timedelta(days=60), END),
+    ]
+
+
+def check_equivalence(provider: TwelveDataProvider, series: list[NavSeries]) -> None:
+    for nav in series:
+        assert NavSeries.from_points(nav.to_points()) == nav
+        expected = reference_metrics(nav.to_points())
+        actual = columnar_metrics(provider, nav)
+        assert expected == actual, (nav, expected, actual)
+
+
+def check_slicing(nav: NavSeries) -> None:
+    window = nav.between(END - timedelta(days=365), END - timedelta(days=30))
+    assert np.shares_memory(window.values, nav.values) and np.shares_memory(window.dates, nav.dates)
+    expected = [p for p in nav.to_points() if END - timedelta(days=365) <= p.date <= END - timedelta(days=30)]
+    assert window.to_points() == expected
+    assert not window.values.flags.writeable
+
+
+def _measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, memory
+
+
+def main() -> None:
+    logging.disable(logging.WARNING)
+    mock = MockDataProvider()
+    provider = TwelveDataProvider(api_key="")
+
+    sample = [mock.get_nav_history(f"FR{i:010d}", START, END) for i in range(200)]
+    check_equivalence(provider, sample + _edge_cases(random.Random(3)))
+    check_slicing(sample[0])
+    print("metrics and slicing: OK")
+
+    print(f"{'funds':>6} {'points':>10} {'layout':>8} {'memory (MB)':>12} {'build (s)':>10} {'metrics (s)':>12}")
+    for n in SIZES:
+        histories = [mock.get_nav_history(f"FR{i:010d}", START, END) for i in range(n)]
+        points = sum(len(nav) for nav in histories)
+
+        objects, build, memory = _measure(lambda: [nav.to_points() for nav in histories])
+        start = time.perf_counter()
+        for nav_points in objects:
+            reference_metrics(nav_points)
+        metrics = time.perf_counter() - start
+        print(f"{n:>6} {points:>10} {'objects':>8} {memory / 1e6:>12.1f} {build:>10.2f} {metrics:>12.2f}")
+        del objects
+
+        columns, build, memory = _measure(lambda: [NavSeries(nav.dates.copy(), nav.values.copy()) for nav in histories])
+        start = time.perf_counter()
+        for nav in columns:
+            columnar_metrics(provider, nav)
+        metrics = time.perf_counter() - start
+        print(f"{n:>6} {points:>10} {'columns':>8} {memory / 1e6:>12.1f} {build:>10.2f} {metrics:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: NAV store (SQLite) vs full history downloads
+
+Fetches the 3-year metrics window of a universe from the fake Twelve Data
+API of bench_twelvedata on two consecutive days, with a restart in between.
+Without a store the second day downloads every history again; with a
+NavStore only the new day is requested per fund, and with a SymbolStore
+the ISIN -> symbol resolutions survive the restart too. Checks that the
+histories read back from the store equal the downloaded ones.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_nav_store
+"""
+
+from datetime import date, timedelta
+from pathlib import Path
+import logging
+import tempfile
+import time
+
+import httpx
+
+from app.data.nav_store import NavStore
+from app.data.provider import AsyncTwelveDataProvider
+from app.data.symbol_store import SymbolStore
+from benchmarks.bench_twelvedata import FakeTwelveData
+
+FUNDS = 500
+DAY_ONE = date(2026, 6, 11)
+DAY_TWO = date(2026, 6, 12)
+WINDOW_DAYS = 365 * 3 + 30
+CREDITS = 1_000_000
+
+
+def _provider(server: FakeTwelveData, store: NavStore = None, symbols: SymbolStore = None) -> AsyncTwelveDataProvider:
+    return AsyncTwelveDataProvider(
+        api_key="bench",
+        base_url="https://fake.twelvedata",
+        credits_per_minute=CREDITS,
+        max_concurrency=32,
+        transport=httpx.MockTransport(server.handle_async),
+        nav_store=store,
+        symbol_store=symbols
+    )
+
+
+def _fetch(provider: AsyncTwelveDataProvider, server: FakeTwelveData, isins: list, day: date) -> tuple:
+    calls, points = server.calls, server.points
+    start = time.perf_counter()
+    histories = provider.get_nav_histories(isins, day - timedelta(days=WINDOW_DAYS), day)
+    return histories, server.calls - calls, server.points - points, time.perf_counter() - start
+
+
+def main() -> None:
+    logging.disable(logging.WARNING)
+    isins = [f"FR{i:010d}" for i in range(FUNDS)]
+    print(f"{FUNDS} funds, {WINDOW_DAYS}-day metrics window")
+    print(f"{'scenario':<38} {'requests':>9} {'points':>9} {'time (s)':>9}")
+
+    def report(name: str, calls: int, points: int, elapsed: float) -> None:
+        print(f"{name:<38} {calls:>9} {points:>9} {elapsed:>9.2f}")
+
+    server = FakeTwelveData(CREDITS)
+    _, calls, points, elapsed = _fetch(_provider(server), server, isins, DAY_ONE)
+    report("no store, day 1", calls, points, elapsed)
+    expected, calls, points, elapsed = _fetch(_provider(server), server, isins, DAY_TWO)
+    report("no store, day 2 after restart", calls, points, elapsed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "nav_store.sqlite")
+        server = FakeTwelveData(CREDITS)
+        provider = _provider(server, NavStore(path))
+        _, calls, points, elapsed = _fetch(provider, server, isins, DAY_ONE)
+        report("store, day 1", calls, points, elapsed)
+        _, calls, points, elapsed = _fetch(provider, server, isins, DAY_ONE)
+        report("store, day 1 again", calls, points, elapsed)
+
+        store = NavStore(path)
+        histories, calls, points, elapsed = _fetch(_provider(server, store), server, isins, DAY_TWO)
+        report("store, day 2 after restart", calls, points, elapsed)
+        assert histories == expected
+        print(f"store: {store.stats()}, {Path(path).stat().st_size / 1e6:.1f} MB, histories match: OK")
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = FakeTwelveData(CREDITS)
+        paths = str(Path(directory) / "nav_store.sqlite"), str(Path(directory) / "symbols.sqlite")
+        _, calls, points, elapsed = _fetch(_provider(server, NavStore(paths[0]), SymbolStore(paths[1])), server, isins, DAY_ONE)
+        report("store + symbols, day 1", calls, points, elapsed)
+        provider = _provider(server, NavStore(paths[0]), SymbolStore(paths[1]))
+        histories, calls, points, elapsed = _fetch(provider, server, isins, DAY_TWO)
+        report("store + symbols, day 2 after restart", calls, points, elapsed)
+        assert histories == expected
+
+
+if __name__ == "__main__":
+    main()
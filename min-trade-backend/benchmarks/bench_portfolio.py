@@ -0,0 +1,137 @@
+"""
+Benchmark and equivalence check: list-based vs index-based diversified selection
+
+Checks that select_diversified picks the same funds, in the same order, as
+the original Fund-list algorithm (membership tests on Fund objects), with
+and without company / platform caps, then times both as the candidate list
+grows.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_portfolio
+"""
+
+import random
+import time
+
+import numpy as np
+
+from app.core.portfolio import select_diversified
+from app.data.columns import ASSET_CLASSES, FundColumns
+from app.models.fund import AssetClass, Fund
+
+SIZES = [300, 3_000, 30_000]
+PLATFORMS = ["SWISSLIFE", "MMA", "CARDIF", "GENERALI", "VIEPLUS", "NORTIA CT"]
+COMPANIES = ["AXA IM", "AMUNDI", "CARMIGNAC", "COMGEST", "DNCA", "EDRAM", "ODDO BHF", "SYCOMORE"]
+TARGETS = [AssetClass.DIVERSIFIE, AssetClass.OBLIGATIONS, AssetClass.IMMOBILIER, AssetClass.ACTIONS]
+REPEATS = 5
+
+
+def _funds(n: int, seed: int = 7) -> list[Fund]:
+    rng = random.Random(seed)
+    # Skewed class mix, like the real universe (mostly equity)
+    classes = rng.choices(ASSET_CLASSES, weights=[50, 18, 16, 2, 1, 1, 9], k=n)
+    return [
+        Fund(
+            isin=f"FR{i:010d}",
+            name=f"Fund {i}",
+            asset_class=classes[i],
+            sri=rng.randint(1, 7),
+            management_company=rng.choice(COMPANIES),
+            available_platforms=rng.sample(PLATFORMS, rng.randint(1, 3)),
+            description="Allocation flexible internationale " * 10
+        )
+        for i in range(n)
+    ]
+
+
+def _reference(
+    funds: list[Fund],
+    targets: list[AssetClass],
+    max_per_company: int = None,
+    max_per_platform: int = None
+) -> list[str]:
+    """Original TroncCommun._select_diversified_funds, plus the optional caps"""
+    selected = []
+    asset_class_counts = {}
+
+    def fits(fund):
+        if max_per_company is not None:
+            if sum(f.management_company == fund.management_company for f in selected) >= max_per_company:
+                return False
+        if max_per_platform is not None:
+            for platform in fund.available_platforms:
+                if sum(platform in f.available_platforms for f in selected) >= max_per_platform:
+                    return False
+        return True
+
+    for asset_class in targets:
+        class_funds = [f for f in funds if f.asset_class == asset_class]
+        for fund in class_funds:
+            if asset_class_counts.get(asset_class, 0) == 2:
+                break
+            if fund not in selected and fits(fund):
+                selected.append(fund)
+                asset_class_counts[asset_class] = asset_class_counts.get(asset_class, 0) + 1
+
+    for fund in funds:
+        if len(selected) >= 15:
+            break
+        if fund in selected:
+            continue
+        class_count = asset_class_counts.get(fund.asset_class, 0)
+        if class_count < 4 and fits(fund):
+            selected.append(fund)
+            asset_class_counts[fund.asset_class] = class_count + 1
+
+    while len(selected) < 5 and funds:
+        for fund in funds:
+            if fund not in selected:
+                selected.append(fund)
+                break
+        else:
+            break
+
+    return [f.isin for f in selected]
+
+
+def _select(columns: FundColumns, order: np.ndarray, targets: list[AssetClass], **caps) -> list[str]:
+    codes = [ASSET_CLASSES.index(ac.value) for ac in targets]
+    positions = select_diversified(columns, order, codes, max_funds=15, min_funds=5, max_per_class=4, **caps)
+    return [columns.isin[order[p]] for p in positions]
+
+
+def check_equivalence() -> None:
+    rng = random.Random(3)
+    for seed in range(100):
+        funds = _funds(rng.choice([0, 3, 8, 40, 400]), seed)
+        columns = FundColumns(funds)
+        order = np.array(rng.sample(range(len(funds)), len(funds)), dtype=np.intp)
+        ranked = [funds[i] for i in order]
+        targets = rng.sample(TARGETS, rng.randint(1, 4))
+        for caps in ({}, {"max_per_company": 2}, {"max_per_platform": 5}, {"max_per_company": 1, "max_per_platform": 3}):
+            assert _select(columns, order, targets, **caps) == _reference(ranked, targets, **caps), (seed, caps)
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main() -> None:
+    check_equivalence()
+    print("equivalence: OK")
+
+    print(f"{'funds':>8} {'lists (ms)':>11} {'indices (ms)':>13} {'speedup':>8}")
+    for size in SIZES:
+        funds = _funds(size)
+        columns = FundColumns(funds)
+        order = np.arange(size)
+        lists = _time(lambda: _reference(funds, TARGETS))
+        indices = _time(lambda: _select(columns, order, TARGETS))
+        print(f"{size:>8} {lists * 1000:>11.3f} {indices * 1000:>13.3f} {lists / indices:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark and correctness check: Monte Carlo projection
+
+Checks the vectorized drawdowns and yearly values against a per-path loop,
+that the bootstrap reproduces the history's mean monthly log return and
+volatility, and that projections are deterministic per seed. Then times
+10,000 paths for each horizon.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_projection
+"""
+
+import time
+
+import numpy as np
+
+from app.core.projection import (
+    PERCENTILES, PROJECTION_BLOCK, PROJECTION_PATHS, TRADING_DAYS,
+    block_log_returns, project, simulate_paths
+)
+
+HISTORY_DAYS = 1_260
+YEARS = [3, 7, 10, 30]
+REPEATS = 10
+
+
+def _history(seed: int = 4) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0.0002, 0.006, HISTORY_DAYS)
+
+
+def check_correctness() -> None:
+    daily = _history()
+    blocks = block_log_returns(daily)
+    naive = [np.log1p(daily[i:i + PROJECTION_BLOCK]).sum() for i in range(len(daily) - PROJECTION_BLOCK + 1)]
+    assert np.allclose(blocks, naive)
+
+    values = simulate_paths(blocks, 84, 200, np.random.default_rng(1))
+    for path in values:
+        peak, worst = path[0], 0.0
+        for value in path:
+            peak = max(peak, value)
+            worst = max(worst, 1 - value / peak)
+        assert np.isclose(worst, 1 - (path / np.maximum.accumulate(path)).min())
+
+    # Bootstrap moments vs history
+    steps = np.diff(np.log(simulate_paths(blocks, 120, 10_000, np.random.default_rng(2))), axis=1)
+    assert abs(steps.mean() - blocks.mean()) < 3 * blocks.std() / np.sqrt(steps.size) + 1e-12
+    assert abs(steps.std() / blocks.std() - 1) < 0.01
+
+    first, second = project(daily, 7, seed=42), project(daily, 7, seed=42)
+    assert np.array_equal(first.final_values, second.final_values)
+    assert first.yearly_values.shape == (7, len(PERCENTILES))
+    assert np.all(np.diff(first.final_values) >= 0)
+    assert np.isclose(first.yearly_values[-1], first.final_values).all()
+
+
+def main() -> None:
+    check_correctness()
+    print("correctness: OK")
+
+    daily = _history()
+    steps_per_year = TRADING_DAYS // PROJECTION_BLOCK
+    print(f"{PROJECTION_PATHS} paths, {HISTORY_DAYS} days of history")
+    print(f"{'years':>6} {'steps':>6} {'time (ms)':>10} {'median x':>9} {'p5 x':>7} {'p95 dd %':>9}")
+    for years in YEARS:
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            projection = project(daily, years, seed=0)
+        elapsed = (time.perf_counter() - start) / REPEATS
+        print(
+            f"{years:>6} {years * steps_per_year:>6} {elapsed * 1000:>10.1f} "
+            f"{projection.final_values[2]:>9.3f} {projection.final_values[0]:>7.3f} {projection.max_drawdowns[-1]:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark and equivalence check: full sort vs top-K selection for rankings
+
+Checks that top_k_indices / top_k return exactly what a stable descending
+sort followed by a slice returns (ties and NaN included), and that the
+RankingIndex views match the linear filters over a ranking, then times
+both as the universe grows.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_ranking
+"""
+
+import random
+import time
+
+import numpy as np
+
+from app.core.ranking import RankingIndex, top_k_indices, top_k
+
+SIZES = [3_000, 30_000, 300_000]
+LIMITS = [20, 100, 500]
+REPEATS = 20
+
+
+def _scores(n: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Rounded like the brain scores, so ties are frequent
+    values = np.round(rng.normal(55, 15, n), 2)
+    values[rng.random(n) < 0.01] = np.nan
+    return values
+
+
+def check_equivalence() -> None:
+    rng = random.Random(3)
+    for _ in range(2_000):
+        n = rng.randint(0, 60)
+        values = np.array([rng.choice([np.nan, 0.0, -0.0, 1.0, 2.0, 2.5, rng.random()]) for _ in range(n)])
+        for k in (0, 1, 3, n // 2, n, n + 5):
+            expected = np.argsort(-values, kind="stable")[:k]
+            assert np.array_equal(top_k_indices(values, k), expected), (values, k)
+
+            items = [(i, v) for i, v in enumerate(np.nan_to_num(values).tolist())]
+            assert top_k(items, k, key=lambda x: x[1]) == sorted(items, key=lambda x: x[1], reverse=True)[:k]
+
+    for _ in range(200):
+        n = rng.randint(0, 300)
+        scores = sorted((round(rng.uniform(0, 100), 1) for _ in range(n)), reverse=True)
+        sris = [rng.randint(1, 7) for _ in range(n)]
+        index = RankingIndex(scores, sris)
+        for min_score in (0, 33.3, 50, 100, 101):
+            assert index.count_at_least(min_score) == len([s for s in scores if s >= min_score])
+        for sri_min, sri_max in ((1, 7), (3, 4), (5, 5), (7, 7)):
+            expected = [i for i, sri in enumerate(sris) if sri_min <= sri <= sri_max]
+            assert index.sri_range_positions(sri_min, sri_max) == expected
+            assert index.sri_range_positions(sri_min, sri_max, limit=10) == expected[:10]
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main() -> None:
+    check_equivalence()
+    print("equivalence: OK")
+
+    print(f"{'funds':>8} {'limit':>6} {'sort (ms)':>10} {'top-k (ms)':>11} {'speedup':>8}")
+    for size in SIZES:
+        values = _scores(size)
+        for limit in LIMITS:
+            full = _time(lambda: np.argsort(-values, kind="stable")[:limit])
+            partial = _time(lambda: top_k_indices(values, limit))
+            print(f"{size:>8} {limit:>6} {full * 1000:>10.3f} {partial * 1000:>11.3f} {full / partial:>7.1f}x")
+
+    # SRI range 3..5, best 100 funds: linear filter vs RankingIndex merge
+    print(f"{'funds':>8} {'filter (ms)':>12} {'index (ms)':>11} {'speedup':>8}")
+    for size in SIZES:
+        scores = np.sort(np.nan_to_num(_scores(size)))[::-1].tolist()
+        sris = np.random.default_rng(1).integers(1, 8, size).tolist()
+        index = RankingIndex(scores, sris)
+        linear = _time(lambda: [i for i, sri in enumerate(sris) if 3 <= sri <= 5][:100])
+        indexed = _time(lambda: index.sri_range_positions(3, 5, limit=100))
+        print(f"{size:>8} {linear * 1000:>12.3f} {indexed * 1000:>11.3f} {linear / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark and accuracy check: sample vs Ledoit-Wolf vs factor-model covariances
+
+Simulates one year of daily returns with a known factor structure, checks
+that FactorRiskModel.covariance() matches the dense B B' + D matrix, and
+compares each estimator's error against the true covariance for a candidate
+set. Then times building the model and assembling candidate covariances
+as the universe grows.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_risk_model
+"""
+
+import time
+
+import numpy as np
+
+from app.core.risk_model import FactorRiskModel
+from app.data.nav import ReturnMatrix
+
+SIZES = [300, 3_000, 10_000]
+DAYS = 260
+CANDIDATES = 200
+REPEATS = 20
+
+
+def _returns(n: int, seed: int = 7) -> tuple[ReturnMatrix, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.006, (n, 5))
+    specific = (0.01 * rng.uniform(0.3, 1.5, n)) ** 2
+    returns = rng.normal(0, 1, (DAYS, 5)) @ loadings.T + rng.normal(0, np.sqrt(specific), (DAYS, n))
+    # Some funds start late
+    returns[:rng.integers(0, DAYS // 2), rng.random(n) < 0.1] = np.nan
+    true = loadings @ loadings.T + np.diag(specific)
+    return ReturnMatrix([f"FR{i:010d}" for i in range(n)], np.arange(DAYS), returns), true
+
+
+def _error(estimate: np.ndarray, true: np.ndarray) -> float:
+    return float(np.linalg.norm(estimate - true) / np.linalg.norm(true))
+
+
+def check_accuracy() -> None:
+    returns, true = _returns(1_000)
+    model = FactorRiskModel.from_returns(returns, version=0)
+    rows = model.rows(returns.isins[:CANDIDATES])
+    dense = model.loadings @ model.loadings.T + np.diag(model.specific_variances)
+    assert np.allclose(model.covariance(rows), dense[np.ix_(rows, rows)])
+    assert np.allclose(model.volatility(rows), np.sqrt(np.diag(dense)[rows]))
+
+    candidates = returns.subset(range(CANDIDATES))
+    truth = true[:CANDIDATES, :CANDIDATES]
+    print(f"relative error vs true covariance ({CANDIDATES} funds, {DAYS} days):")
+    print(f"  sample       {_error(candidates.covariance(), truth):.3f}")
+    print(f"  ledoit-wolf  {_error(candidates.shrunk_covariance(), truth):.3f}")
+    print(f"  factor model {_error(model.covariance(rows), truth):.3f}")
+
+
+def _time(fn, repeats: int = REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    check_accuracy()
+
+    print(f"{'funds':>8} {'build (s)':>10} {'model (KB)':>11} {'dense (KB)':>11} {'sample (ms)':>12} {'factor (ms)':>12}")
+    for size in SIZES:
+        returns, _ = _returns(size)
+        build = _time(lambda: FactorRiskModel.from_returns(returns, version=0), repeats=1)
+        model = FactorRiskModel.from_returns(returns, version=0)
+        rows = model.rows(returns.isins[:CANDIDATES])
+        candidates = returns.subset(range(CANDIDATES))
+        sample = _time(candidates.covariance)
+        factor = _time(lambda: model.covariance(rows))
+        stored = (model.loadings.nbytes + model.specific_variances.nbytes) / 1024
+        dense = size * size * 8 / 1024
+        print(f"{size:>8} {build:>10.3f} {stored:>11.0f} {dense:>11.0f} {sample * 1000:>12.3f} {factor * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
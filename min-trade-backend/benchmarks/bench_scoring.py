@@ -0,0 +1,103 @@
+"""
+Benchmark and equivalence check: per-fund vs batch CerveauFondamental scoring
+
+Checks that analyze_universe / analyze_all_funds reproduce the per-fund
+calculate_score / analyze_fund results exactly, on the real universe and on
+synthetic inputs hitting the fallbacks (None, 0, negative, out of range).
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_scoring
+"""
+
+import random
+import time
+from pathlib import Path
+
+from app.brains.fundamental import CerveauFondamental
+from app.brains.score_cache import ScoreCache
+from app.data.columns import FundColumns
+from app.data.universe import FundUniverse
+from app.models.fund import Fund, FundMetrics, AssetClass
+
+DEFAULT_FILE = Path(__file__).parent.parent / "app" / "data" / "files" / "funds_data.xlsx"
+SIZES = [3_000, 30_000, 300_000]
+
+
+def _synthetic_funds(n: int, seed: int = 7) -> list[Fund]:
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return rng.choice([None, 0.0, value, value, value])
+
+    funds = []
+    for i in range(n):
+        metrics = None if rng.random() < 0.05 else FundMetrics(
+            perf_1w=maybe(round(rng.gauss(0.1, 2), 2)),
+            perf_1y=maybe(round(rng.gauss(5, 15), 2)),
+            perf_3y=maybe(round(rng.gauss(15, 25), 2)),
+            vol_60d=maybe(round(abs(rng.gauss(12, 8)), 2)),
+            max_drawdown=maybe(round(abs(rng.gauss(20, 15)), 2)),
+            sharpe_ratio=maybe(round(rng.gauss(0.3, 1.5), 2)),
+            sortino_ratio=maybe(round(rng.gauss(0.4, 2.0), 2)),
+        )
+        funds.append(Fund(
+            isin=f"FR{i:010d}",
+            name=f"Fund {i}",
+            sri=rng.randint(1, 7),
+            asset_class=rng.choice(list(AssetClass)).value,
+            metrics=metrics,
+        ))
+    return funds
+
+
+def check_equivalence(brain: CerveauFondamental, funds: list[Fund]) -> None:
+    scored = brain.score_universe(FundColumns(funds))
+
+    for i, fund in enumerate(funds):
+        expected = (*brain.calculate_score(fund), brain.calculate_top_week_score(fund))
+        actual = tuple(scored.record(i))
+        assert expected == actual, (fund.isin, expected, actual)
+
+    # Per-fund scoring returns copies and leaves the shared funds untouched
+    sample = funds[:500]
+    before = [f.model_dump() for f in sample]
+    by_isin = {f.isin: f for f in brain.score_funds(sample)}
+    assert [f.model_dump() for f in sample] == before
+    for i, fund in enumerate(sample):
+        assert by_isin[fund.isin] == scored.fund(i), fund.isin
+
+    fund_data = [FundUniverse._to_fund_data(f) for f in funds]
+    batch = brain.analyze_all_funds(fund_data).fund_scores
+    for fd, result in zip(fund_data, batch):
+        assert brain.analyze_fund(fd) == result, fd.fund_id
+
+
+def main() -> None:
+    brain = CerveauFondamental()
+    # Measure the scoring itself, not score cache lookups
+    brain.score_cache = ScoreCache(max_entries=0)
+
+    columns = FundUniverse(str(DEFAULT_FILE)).columns
+    check_equivalence(brain, [columns.to_fund(i) for i in range(columns.size)])
+    check_equivalence(brain, _synthetic_funds(20_000))
+    print("equivalence: OK")
+
+    print(f"{'funds':>8} {'per-fund (s)':>13} {'batch (s)':>10} {'speedup':>8}")
+    for size in SIZES:
+        funds = _synthetic_funds(size)
+        columns = FundColumns(funds)
+
+        start = time.perf_counter()
+        for fund in funds:
+            brain.calculate_score(fund)
+            brain.calculate_top_week_score(fund)
+        per_fund = time.perf_counter() - start
+
+        start = time.perf_counter()
+        brain.analyze_universe(columns)
+        batch = time.perf_counter() - start
+        print(f"{size:>8} {per_fund:>13.3f} {batch:>10.4f} {per_fund / batch:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
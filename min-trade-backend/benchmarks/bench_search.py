@@ -0,0 +1,69 @@
+"""
+Benchmark: linear substring scan vs FundSearchIndex for /api/funds?search=
+
+Replicates the real universe up to 100k funds (new ISINs per copy), checks
+that every fund the old substring filter found is still returned, then
+times both on a few queries, typos included.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_search
+"""
+
+import time
+from pathlib import Path
+
+from app.data.columns import FundColumns
+from app.data.search import FundSearchIndex
+from app.data.universe import FundUniverse
+
+DEFAULT_FILE = Path(__file__).parent.parent / "app" / "data" / "files" / "funds_data.xlsx"
+SIZES = [3_000, 30_000, 100_000]
+QUERIES = ["axa", "amundi", "amundy", "carmignac patrimoine", "carmignak patrimoin", "FR0010011171", "actions europe"]
+REPEATS = 20
+
+
+def _replicate(funds, size):
+    out = []
+    copy = 0
+    while len(out) < size:
+        for fund in funds[:size - len(out)]:
+            isin = fund.isin if copy == 0 else f"{fund.isin[:2]}{copy:02d}{fund.isin[4:]}"
+            out.append(fund.model_copy(update={"isin": isin}))
+        copy += 1
+    return out
+
+
+def _linear(funds, query):
+    query = query.lower()
+    return [i for i, f in enumerate(funds) if query in f.name.lower() or query in f.isin.lower()]
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main() -> None:
+    columns = FundUniverse(str(DEFAULT_FILE)).columns
+    base = [columns.to_fund(i) for i in range(columns.size)]
+
+    print(f"{'funds':>8} {'query':>22} {'hits':>6} {'scan (ms)':>10} {'index (ms)':>11}")
+    for size in SIZES:
+        funds = _replicate(base, size)
+        start = time.perf_counter()
+        index = FundSearchIndex(FundColumns(funds))
+        print(f"{size:>8} {'(index build)':>22} {'':>6} {'':>10} {(time.perf_counter() - start) * 1000:>11.1f}")
+
+        for query in QUERIES:
+            hits = index.search(query)
+            missing = set(_linear(funds, query)) - set(hits.tolist())
+            assert not missing, (query, len(missing))
+            scan = _time(lambda: _linear(funds, query))
+            indexed = _time(lambda: index.search(query))
+            print(f"{size:>8} {query:>22} {len(hits):>6} {scan * 1000:>10.3f} {indexed * 1000:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark and correctness check: persistent ISIN -> symbol resolution
+
+Resolves a universe where some ISINs have no Twelve Data listing against
+the fake API of bench_twelvedata and counts /symbol_search calls:
+- first run: one search per resolvable ISIN, two per unresolvable one
+- after a restart with a SymbolStore: none (positive and negative entries)
+- once negative entries are older than the TTL: only the unresolvable
+  ISINs are searched again
+- request errors are not recorded as negative results
+- a CSV preload resolves ISINs without any search
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_symbols
+"""
+
+from datetime import timedelta
+from pathlib import Path
+import logging
+import tempfile
+
+import httpx
+
+from app.data.provider import TwelveDataProvider
+from app.data.symbol_store import NEGATIVE_TTL, SymbolStore
+from benchmarks.bench_twelvedata import FakeTwelveData
+
+FUNDS = 1_000
+UNRESOLVABLE_SHARE = 0.1
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _provider(server: FakeTwelveData, symbols: SymbolStore = None) -> TwelveDataProvider:
+    provider = TwelveDataProvider(api_key="bench", base_url="https://fake.twelvedata", symbol_store=symbols)
+    provider._client = httpx.Client(transport=httpx.MockTransport(server.handle))
+    return provider
+
+
+def _searches(provider: TwelveDataProvider, server: FakeTwelveData, isins: list) -> tuple[int, int]:
+    before = server.searches
+    resolved = sum(1 for isin in isins if provider._resolve_symbol(isin))
+    return server.searches - before, resolved
+
+
+def main() -> None:
+    # Resolution misses and the simulated request errors
+    logging.disable(logging.ERROR)
+    isins = [f"FR{i:010d}" for i in range(FUNDS)]
+    unresolvable = frozenset(isins[::int(1 / UNRESOLVABLE_SHARE)])
+    server = FakeTwelveData(10_000_000, unresolvable)
+    clock = Clock()
+
+    print(f"{FUNDS} ISINs, {len(unresolvable)} without listing, negative TTL {NEGATIVE_TTL.days} days")
+    print(f"{'scenario':<36} {'searches':>9} {'resolved':>9}")
+    searches, resolved = _searches(_provider(server), server, isins)
+    print(f"{'no store, every restart':<36} {searches:>9} {resolved:>9}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "symbols.sqlite")
+        searches, resolved = _searches(_provider(server, SymbolStore(path, clock=clock)), server, isins)
+        print(f"{'store, first run':<36} {searches:>9} {resolved:>9}")
+        assert searches == FUNDS + len(unresolvable)
+
+        store = SymbolStore(path, clock=clock)
+        searches, resolved = _searches(_provider(server, store), server, isins)
+        print(f"{'store, after restart':<36} {searches:>9} {resolved:>9}")
+        assert searches == 0 and resolved == FUNDS - len(unresolvable)
+        entry = store.get(next(iter(unresolvable)))
+        assert entry.symbol is None and entry.candidates == [] and entry.source == "search"
+
+        clock.now += (NEGATIVE_TTL + timedelta(hours=1)).total_seconds()
+        searches, resolved = _searches(_provider(server, SymbolStore(path, clock=clock)), server, isins)
+        print(f"{'store, negative entries expired':<36} {searches:>9} {resolved:>9}")
+        assert searches == 2 * len(unresolvable)
+
+        # A failing API must not poison the store
+        failing = TwelveDataProvider(api_key="bench", base_url="https://fake.twelvedata", symbol_store=store)
+        failing._client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+        assert failing._resolve_symbol("LU9999999999") is None
+        assert store.get("LU9999999999") is None
+
+        csv_path = Path(directory) / "symbols.csv"
+        csv_path.write_text("isin,symbol\nLU0000000001,TLU01\nLU0000000002,\n")
+        preloaded = SymbolStore(str(Path(directory) / "preloaded.sqlite"), clock=clock)
+        preloaded.preload(str(csv_path))
+        searches, resolved = _searches(_provider(server, preloaded), server, ["LU0000000001", "LU0000000002"])
+        print(f"{'preloaded CSV':<36} {searches:>9} {resolved:>9}")
+        assert searches == 0 and resolved == 1
+    print("correctness: OK")
+
+
+if __name__ == "__main__":
+    main()
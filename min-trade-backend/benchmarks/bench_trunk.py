@@ -0,0 +1,119 @@
+"""
+Benchmark and equivalence check: per-fund TrunkEngine vs ColumnarTrunkEngine
+
+Feeds both engines the same synthetic brain outputs (5 brains, partial
+coverage, frequent contradictions) and checks the TrunkOutput and the
+contradiction logs are identical, then times both as the universe grows.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_trunk
+"""
+
+import logging
+import random
+import time
+
+from app.core.trunk_engine import TrunkEngine
+from app.core.trunk_matrix import BrainScoreMatrix, ColumnarTrunkEngine
+from app.models.brain import AdaptiveWeights, BrainOutput, BrainType, FundScoreEntry
+
+SIZES = [3_000, 30_000, 300_000]
+
+
+def _brain_outputs(engine: TrunkEngine, n: int, seed: int = 7) -> list[BrainOutput]:
+    rng = random.Random(seed)
+    outputs = []
+    for item in engine.registry.get_all_brains():
+        fund_scores = [
+            FundScoreEntry(
+                fund_id=f"FR{i:010d}",
+                score=round(rng.uniform(0, 100), 2),
+                confidence=round(rng.choice([0.5, 0.85, rng.uniform(0.3, 1.0)]), 2)
+            )
+            for i in rng.sample(range(n), int(n * 0.9))
+        ]
+        outputs.append(BrainOutput(
+            brain_id=item.brain_id,
+            label=item.label,
+            brain_type=BrainType(item.brain_type),
+            fund_scores=fund_scores
+        ))
+    return outputs
+
+
+def _engines() -> tuple[TrunkEngine, ColumnarTrunkEngine]:
+    engines = TrunkEngine(), ColumnarTrunkEngine()
+    for engine in engines:
+        for item in engine.registry.get_all_brains():
+            engine.registry.activate_brain(item.brain_id)
+        engine.update_weights(AdaptiveWeights(weights=engine.registry.get_default_weights(), reason="bench"))
+    return engines
+
+
+def _dump(engine: TrunkEngine, output) -> tuple:
+    logs = [log.model_dump(exclude={"timestamp"}) for log in engine.get_contradiction_logs()]
+    return output.model_dump(exclude={"timestamp"}), logs
+
+
+def check_equivalence() -> None:
+    reference, columnar = _engines()
+    for seed in range(5):
+        outputs = _brain_outputs(reference, 2_000, seed)
+        sri_map = {f"FR{i:010d}": 1 + i % 7 for i in range(0, 2_000, 3)}
+        expected = _dump(reference, reference.process_brain_outputs(outputs, sri_map))
+        actual = _dump(columnar, columnar.process_brain_outputs(outputs, sri_map))
+        assert expected == actual, seed
+
+        # Weight and activation changes only redo the weighted step
+        for engine in (reference, columnar):
+            engine.update_weights(AdaptiveWeights(weights={"fundamental_v1": 0.1, "quant_v1": 0.6, "macro_v1": 0.3}))
+            engine.registry.deactivate_brain("macro_v1")
+        reference_output = reference.process_brain_outputs(outputs, sri_map)
+        output = columnar.process_brain_outputs(outputs, sri_map)
+        assert _dump(columnar, output) == _dump(reference, reference_output), seed
+        assert columnar.get_consensus_stats(output) == reference.get_consensus_stats(reference_output), seed
+        assert output.fund_composite_scores[3] == reference_output.fund_composite_scores[3], seed
+        for engine in (reference, columnar):
+            engine.registry.activate_brain("macro_v1")
+            engine.update_weights(AdaptiveWeights(weights=engine.registry.get_default_weights()))
+
+    # Single brain and no brain at all
+    outputs = _brain_outputs(reference, 500)[:1]
+    assert _dump(reference, reference.process_brain_outputs(outputs)) == _dump(columnar, columnar.process_brain_outputs(outputs))
+    assert _dump(reference, reference.process_brain_outputs([])) == _dump(columnar, columnar.process_brain_outputs([]))
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _matrix_math(engine: ColumnarTrunkEngine, matrix: BrainScoreMatrix) -> None:
+    engine._composite_scores(matrix, engine.registry.get_default_weights())
+    engine._consensus_levels(matrix)
+    engine._contradictions(matrix, "")
+
+
+def main() -> None:
+    logging.disable(logging.WARNING)
+    check_equivalence()
+    print("equivalence: OK")
+
+    reference, columnar = _engines()
+    # "math" excludes packing the matrix and building the pydantic TrunkOutput,
+    # "reweight" is a weight update on already processed brain outputs
+    print(f"{'funds':>8} {'per-fund (s)':>13} {'matrix (s)':>11} {'speedup':>8} {'math (s)':>9} {'reweight (s)':>13}")
+    for size in SIZES:
+        outputs = _brain_outputs(reference, size)
+        per_fund = _time(lambda: reference.process_brain_outputs(outputs))
+        matrix = _time(lambda: columnar.process_brain_outputs(outputs))
+        packed = BrainScoreMatrix.from_outputs(outputs)
+        math = _time(lambda: _matrix_math(columnar, packed))
+        columnar.update_weights(AdaptiveWeights(weights={"fundamental_v1": 0.5, "quant_v1": 0.5}))
+        reweight = _time(lambda: columnar.process_brain_outputs(outputs))
+        print(f"{size:>8} {per_fund:>13.3f} {matrix:>11.3f} {per_fund / matrix:>7.1f}x {math:>9.3f} {reweight:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark: sequential vs scheduled (async) Twelve Data enrichment
+
+Runs both providers against an in-process fake Twelve Data API (httpx mock
+transport) with network latency and a per-window credit limit enforced over
+a sliding window: over the limit, it answers with a 429 error like the real
+API. A "minute" is compressed to WINDOW seconds so plans can be compared
+quickly. Multi-symbol /time_series requests cost one credit per symbol and
+fail for some symbols (FLAKY), which the providers must retry alone.
+
+Reports enrichment time, HTTP requests, rate limit errors and, for the
+scheduled provider, the latency of an interactive NAV lookup issued
+mid-enrichment. The batching behaviour itself is asserted in
+tests/test_twelvedata_batches.py.
+
+Usage (from min-trade-backend/):
+    python -m benchmarks.bench_twelvedata
+"""
+
+from collections import deque
+from datetime import date, timedelta
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+
+from app.data.provider import AsyncTwelveDataProvider, TwelveDataProvider
+from app.models.fund import AssetClass, Fund
+
+WINDOW = 1.0       # seconds standing for one minute
+LATENCY = 0.02     # seconds per API call
+# Symbols ending with this digit fail inside multi-symbol requests
+FLAKY = "7"
+# (plan, credits per window, funds)
+PLANS = [("free", 8, 12), ("grow", 80, 100), ("pro", 610, 300)]
+
+
+class FakeTwelveData:
+    """Credit-limited fake of /symbol_search and (multi-symbol) /time_series"""
+
+    def __init__(self, credits_per_window: int, unresolvable: frozenset = frozenset()):
+        self.credits_per_window = credits_per_window
+        self.unresolvable = unresolvable
+        self.spent = deque()
+        self.calls = 0
+        self.searches = 0
+        self.errors = 0
+        self.points = 0
+        self.lock = threading.Lock()
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        symbols = request.url.params["symbol"].split(",")
+        now = time.monotonic()
+        with self.lock:
+            while self.spent and self.spent[0] <= now - WINDOW:
+                self.spent.popleft()
+            self.calls += 1
+            if len(self.spent) + len(symbols) > self.credits_per_window:
+                self.errors += 1
+                return httpx.Response(200, json={"code": 429, "status": "error", "message": "API credits exhausted"})
+            self.spent.extend([now] * len(symbols))
+            left = self.credits_per_window - len(self.spent)
+
+        headers = {"api-credits-left": str(left)}
+        if request.url.path == "/symbol_search":
+            with self.lock:
+                self.searches += 1
+            if symbols[0] in self.unresolvable:
+                return httpx.Response(200, json={"data": [], "status": "ok"}, headers=headers)
+            return httpx.Response(200, json={"data": [{"symbol": f"T{symbols[0][-6:]}"}]}, headers=headers)
+        start = date.fromisoformat(request.url.params["start_date"])
+        end = date.fromisoformat(request.url.params["end_date"])
+        if len(symbols) == 1:
+            return httpx.Response(200, json=self._series(symbols[0], start, end), headers=headers)
+        return httpx.Response(200, json={
+            symbol: {"code": 500, "status": "error", "message": "Internal error"} if symbol.endswith(FLAKY) else self._series(symbol, start, end)
+            for symbol in symbols
+        }, headers=headers)
+
+    def _series(self, symbol: str, start: date, end: date) -> dict:
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        values = [
+            {"datetime": day.isoformat(), "close": f"{100 + (day.toordinal() * 7 + int(symbol[-3:])) % 5:.2f}"}
+            for day in days
+            if day.weekday() < 5
+        ]
+        if not values:
+            return {"code": 400, "status": "error", "message": "No data is available on the specified dates"}
+        with self.lock:
+            self.points += len(values)
+        return {"meta": {"symbol": symbol}, "values": values, "status": "ok"}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        time.sleep(LATENCY)
+        return self._respond(request)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(LATENCY)
+        return self._respond(request)
+
+
+def _funds(n: int) -> list[Fund]:
+    return [
+        Fund(isin=f"FR{i:010d}", name=f"Fund {i}", asset_class=AssetClass.ACTIONS.value, sri=4)
+        for i in range(n)
+    ]
+
+
+def _sequential(server: FakeTwelveData, batch_size: int = TwelveDataProvider.TIME_SERIES_BATCH_SIZE) -> TwelveDataProvider:
+    provider = TwelveDataProvider(api_key="bench", base_url="https://fake.twelvedata")
+    provider._client = httpx.Client(transport=httpx.MockTransport(server.handle))
+    provider.TIME_SERIES_BATCH_SIZE = batch_size
+    return provider
+
+
+def run_sequential(credits: int, funds: int, batch_size: int) -> tuple[float, int, int]:
+    server = FakeTwelveData(credits)
+    provider = _sequential(server, batch_size)
+    start = time.perf_counter()
+    provider.enrich_funds(_funds(funds))
+    return time.perf_counter() - start, server.calls, server.errors
+
+
+def run_scheduled(credits: int, funds: int) -> tuple[float, int, int, float]:
+    server = FakeTwelveData(credits)
+    provider = AsyncTwelveDataProvider(
+        api_key="bench",
+        base_url="https://fake.twelvedata",
+        credits_per_minute=credits,
+        transport=httpx.MockTransport(server.handle_async),
+        window=WINDOW
+    )
+    interactive = []
+
+    def lookup() -> None:
+        time.sleep(WINDOW / 2)
+        start = time.perf_counter()
+        provider.get_nav_history("LU0000000001", date.today() - timedelta(days=30), date.today())
+        interactive.append(time.perf_counter() - start)
+
+    thread = threading.Thread(target=lookup)
+    start = time.perf_counter()
+    thread.start()
+    provider.enrich_funds(_funds(funds))
+    elapsed = time.perf_counter() - start
+    thread.join()
+    return elapsed, server.calls, server.errors, interactive[0]
+
+
+def main() -> None:
+    # Fallback and rate limit messages of the sequential provider
+    logging.disable(logging.ERROR)
+    print(f"1 minute = {WINDOW:.1f}s, {LATENCY * 1000:.0f} ms latency, 2 credits per fund")
+    print(f"{'plan':>6} {'credits':>8} {'funds':>6} {'provider':>18} {'time (s)':>9} {'requests':>9} {'429s':>5} {'lookup (s)':>11}")
+    for plan, credits, funds in PLANS:
+        for name, batch_size in (("sequential", 1), ("sequential batched", TwelveDataProvider.TIME_SERIES_BATCH_SIZE)):
+            elapsed, calls, errors = run_sequential(credits, funds, batch_size)
+            print(f"{plan:>6} {credits:>8} {funds:>6} {name:>18} {elapsed:>9.2f} {calls:>9} {errors:>5} {'':>11}")
+        elapsed, calls, errors, lookup = run_scheduled(credits, funds)
+        print(f"{plan:>6} {credits:>8} {funds:>6} {'scheduled batched':>18} {elapsed:>9.2f} {calls:>9} {errors:>5} {lookup:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from app.data.ingestion import DataIngestion
+
+
+def _ingestion(df: pd.DataFrame) -> DataIngestion:
+    ingestion = DataIngestion("unused.xlsx", use_snapshot=False)
+    ingestion._raw_data = df
+    return ingestion
+
+
+def _sheet(sri_values) -> pd.DataFrame:
+    n = len(sri_values)
+    return pd.DataFrame({
+        "CODE ISIN": [f"FR{i:010d}" for i in range(n)],
+        "Nom du fonds": [f"Fonds {i}" for i in range(n)],
+        "SRI": sri_values,
+    })
+
+
+def test_columnar_sri_matches_row_path():
+    # Strings int() rejects ("5.0", "4.7", "x") drop the row on both paths; numbers are truncated
+    df = _sheet(["5.0", "4.7", 4.7, "5", " 6 ", "x", np.nan, None, 9, -3, 3.0, float("inf")])
+    ingestion = _ingestion(df)
+
+    rows = ingestion.normalize_and_parse(columnar=False)
+    columns = ingestion.normalize_and_parse(columnar=True)
+
+    assert columns == rows
+    assert [(f.isin, f.sri) for f in columns] == [
+        ("FR0000000002", 4),
+        ("FR0000000003", 5),
+        ("FR0000000004", 6),
+        ("FR0000000008", 7),
+        ("FR0000000009", 1),
+        ("FR0000000010", 3),
+    ]
+
+
+def test_missing_sri_column_defaults_to_4():
+    df = _sheet([1, 2]).drop(columns="SRI")
+    ingestion = _ingestion(df)
+
+    assert ingestion.normalize_and_parse(columnar=True) == ingestion.normalize_and_parse(columnar=False)
+    assert {f.sri for f in ingestion.normalize_and_parse(columnar=True)} == {4}
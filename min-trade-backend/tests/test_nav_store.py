@@ -0,0 +1,51 @@
+from datetime import date
+
+import numpy as np
+
+from app.data.nav_series import NavSeries
+from app.data.nav_store import NavStore
+
+
+def _series(*days: str) -> NavSeries:
+    return NavSeries(np.array(days, dtype="datetime64[D]"), np.arange(len(days), dtype=np.float64) + 100.0)
+
+
+def test_series_leaves_caller_arrays_writeable():
+    dates = np.array(["2026-10-01", "2026-10-02"], dtype="datetime64[D]")
+    values = np.array([100.0, 101.0])
+    series = NavSeries(dates, values)
+
+    assert dates.flags.writeable and values.flags.writeable
+    assert not series.dates.flags.writeable and not series.values.flags.writeable
+    values[0] = 0.0
+    assert series.values[0] == 100.0
+    # Slices of a series are views, not copies
+    assert np.shares_memory(series.between(date(2026, 10, 2), date(2026, 10, 2)).values, series.values)
+
+
+def test_late_nav_is_fetched_on_next_refresh(tmp_path):
+    store = NavStore(str(tmp_path / "nav.sqlite"))
+    # Refresh on the 13th before that day's NAV is published
+    store.append({"X": _series("2026-10-01", "2026-10-12")}, date(2026, 10, 1), date(2026, 10, 13))
+
+    assert store.coverage("X") == (date(2026, 10, 1), date(2026, 10, 12))
+    assert store.missing_ranges(["X"], date(2026, 10, 1), date(2026, 10, 14)) == {date(2026, 10, 13): ["X"]}
+
+
+def test_coverage_start_is_the_requested_start(tmp_path):
+    store = NavStore(str(tmp_path / "nav.sqlite"))
+    # Fund launched after the start of the window: not refetched from the start
+    store.append({"X": _series("2026-10-05", "2026-10-09")}, date(2026, 9, 1), date(2026, 10, 9))
+
+    assert store.missing_ranges(["X"], date(2026, 9, 1), date(2026, 10, 9)) == {}
+    # Weekend only: nothing to request
+    assert store.missing_ranges(["X"], date(2026, 9, 1), date(2026, 10, 11)) == {}
+
+
+def test_coverage_survives_restart(tmp_path):
+    path = str(tmp_path / "nav.sqlite")
+    NavStore(path).append({"X": _series("2026-10-01", "2026-10-02")}, date(2026, 10, 1), date(2026, 10, 2))
+
+    store = NavStore(path)
+    assert store.coverage("X") == (date(2026, 10, 1), date(2026, 10, 2))
+    assert store.load(["X"], date(2026, 10, 1), date(2026, 10, 2))["X"] == _series("2026-10-01", "2026-10-02")
@@ -0,0 +1,51 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.risk_model import FactorRiskModel, RiskModelStore
+from app.core.tronc_commun import TroncCommun
+from app.data.universe import FundUniverse
+from app.models.fund import AllocationMethod, InvestmentHorizon
+
+DATA_FILE = Path(__file__).parent.parent / "app" / "data" / "files" / "funds_data.xlsx"
+SCORE_PROFILE = (4, 1, InvestmentHorizon.MEDIUM, AllocationMethod.SCORE)
+OPTIMIZED_PROFILE = (4, 1, InvestmentHorizon.MEDIUM, AllocationMethod.MIN_VARIANCE)
+
+
+def _empty_risk_model(version) -> FactorRiskModel:
+    return FactorRiskModel(version, [], np.zeros((0, 1)), np.zeros(0))
+
+
+@pytest.fixture
+def tronc_commun(tmp_path):
+    # Own universe: the ingestion snapshot goes to tmp_path, not app/data/files
+    universe = FundUniverse(str(DATA_FILE), snapshot_path=str(tmp_path / "funds.snapshot.pkl"))
+    tronc_commun = TroncCommun(str(DATA_FILE), universe=universe)
+    # Instant stub build: the background build thread ends with the test
+    tronc_commun._risk_models = RiskModelStore(_empty_risk_model)
+    yield tronc_commun
+    for thread in threading.enumerate():
+        if thread.name == "risk-model-build":
+            thread.join()
+
+
+def test_risk_model_publication_keeps_score_plans(tronc_commun):
+    plan = tronc_commun._portfolio_plan(SCORE_PROFILE)
+    assert tronc_commun._plan_key(OPTIMIZED_PROFILE)[-1] is False
+
+    tronc_commun._risk_models.build_now(tronc_commun._risk_model_version())
+
+    assert tronc_commun._portfolio_plan(SCORE_PROFILE) is plan
+    # Optimized plans are redone with the published model
+    assert tronc_commun._plan_key(OPTIMIZED_PROFILE)[-1] is True
+
+
+def test_risk_model_is_only_built_for_optimized_plans(tronc_commun):
+    tronc_commun.warm_portfolio_plans()
+    tronc_commun._portfolio_plan(SCORE_PROFILE)
+    assert tronc_commun._risk_models._building is None
+
+    tronc_commun._portfolio_plan(OPTIMIZED_PROFILE)
+    assert tronc_commun._risk_models._building == tronc_commun._risk_model_version()
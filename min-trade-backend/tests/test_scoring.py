@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.brains.fundamental import CerveauFondamental, _py_round
+from app.brains.score_cache import ScoreCache
+from app.data.columns import FundColumns
+from app.models.fund import AssetClass, Fund, FundMetrics
+
+
+def _near_ties(ndigits: int, count: int) -> list[float]:
+    """Values where np.round and round() disagree (just next to a .5 tie)"""
+    rng = random.Random(11)
+    ties = []
+    while len(ties) < count:
+        value = (rng.randint(-10**6, 10**6) + 0.5) / 10 ** ndigits
+        if np.round(value, ndigits) != round(value, ndigits):
+            ties.append(value)
+    return ties
+
+
+def _fund(i: int, rng: random.Random, metrics) -> Fund:
+    return Fund(
+        isin=f"FR{i:010d}",
+        name=f"Fund {i}",
+        sri=rng.randint(1, 7),
+        asset_class=rng.choice(list(AssetClass)).value,
+        metrics=metrics
+    )
+
+
+@pytest.fixture(scope="module")
+def universe() -> list[Fund]:
+    rng = random.Random(5)
+    grid = lambda lo, hi: rng.randint(lo, hi) / 100
+    funds = []
+    # Metrics on a 0.01 grid: many quality and total scores land next to a rounding tie
+    for i in range(3_000):
+        metrics = None if rng.random() < 0.05 else FundMetrics(
+            perf_1w=grid(-500, 500),
+            perf_1y=rng.choice([None, grid(-3000, 3000)]),
+            vol_60d=rng.choice([None, 0.0, grid(100, 4000)]),
+            max_drawdown=rng.choice([None, 0.0, grid(0, 6000)]),
+            sharpe_ratio=rng.choice([None, 0.0, grid(-300, 500)]),
+            sortino_ratio=rng.choice([None, 0.0, grid(-300, 500)]),
+        )
+        funds.append(_fund(i, rng, metrics))
+    # Top of the week = perf_1w / 2 with vol_60d = 100: exact near-ties at 4 digits
+    for value in _near_ties(4, 50):
+        funds.append(_fund(len(funds), rng, FundMetrics(perf_1w=2 * value, vol_60d=100.0)))
+    return funds
+
+
+@pytest.fixture
+def brain() -> CerveauFondamental:
+    brain = CerveauFondamental()
+    brain.score_cache = ScoreCache(max_entries=0)
+    return brain
+
+
+def test_py_round_matches_round():
+    for ndigits in (2, 4):
+        values = np.array(_near_ties(ndigits, 200) + [0.125, -0.125, 2.675, 1e-9, 0.0])
+        assert _py_round(values, ndigits).tolist() == [round(float(v), ndigits) for v in values]
+
+
+def test_analyze_universe_matches_per_fund_scoring(brain, universe):
+    scored = brain.score_universe(FundColumns(universe))
+
+    # The fixture must exercise the near-tie fallback of _py_round
+    raw = scored.scores.quality_raw
+    weights = brain.WEIGHTS
+    total = weights['quality'] * raw + weights['valuation'] * scored.scores.valuation_raw + weights['stability'] * scored.scores.stability_raw
+    assert any(np.round(v, 2) != round(float(v), 2) for v in raw)
+    assert any(np.round(v, 2) != round(float(v), 2) for v in total)
+
+    for i, fund in enumerate(universe):
+        expected = (*brain.calculate_score(fund), brain.calculate_top_week_score(fund))
+        assert tuple(scored.record(i)) == expected, fund.isin
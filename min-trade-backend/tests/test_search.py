@@ -0,0 +1,63 @@
+import pytest
+
+from app.data.columns import FundColumns
+from app.data.search import FundSearchIndex, min_matched
+from app.models.fund import AssetClass, Fund
+
+
+FUNDS = [
+    ("FR0010135103", "Carmignac Patrimoine A EUR Acc", "Carmignac", "Diversified fund, euro and global bonds"),
+    ("FR0010148981", "Carmignac Investissement A EUR Acc", "Carmignac", "Global equities"),
+    ("LU1681043599", "Amundi MSCI Europe UCITS ETF", "Amundi", "Tracks the MSCI Europe index"),
+    ("FR0010315770", "Lyxor Euro Stoxx 50", "Lyxor", "Tracks the Euro Stoxx 50 index"),
+    ("IE00B4L5Y983", "iShares Core MSCI World", "BlackRock", "Developed markets, tax exempt"),
+    ("LU0048578792", "Fidelity European Growth", "Fidelity", "European equities"),
+]
+
+
+@pytest.fixture(scope="module")
+def index() -> FundSearchIndex:
+    funds = [
+        Fund(
+            isin=isin, name=name, sri=4, asset_class=AssetClass.ACTIONS.value,
+            management_company=company, description=description
+        )
+        for isin, name, company, description in FUNDS
+    ]
+    return FundSearchIndex(FundColumns(funds))
+
+
+def _isins(index: FundSearchIndex, query: str) -> list[str]:
+    return [FUNDS[row][0] for row in index.search(query)]
+
+
+def test_typo_budget_grows_with_the_query():
+    assert [min_matched(n) for n in range(1, 4)] == [1, 2, 3]
+    assert [min_matched(n) for n in range(4, 7)] == [3, 4, 5]
+    assert min_matched(7) == 4 and min_matched(20) == 17
+    assert min_matched(20, exact=True) == 20
+
+
+def test_short_query_matches_isin_and_name_only(index):
+    # "x" is in "Stoxx" (name) and "tax exempt" (description only)
+    assert _isins(index, "x") == ["FR0010315770"]
+    assert _isins(index, "  ") == [] and _isins(index, "-!") == []
+
+
+def test_query_of_few_trigrams_needs_all_of_them(index):
+    # "eurp" shares "eur" with every Euro / Europe fund but is none of them
+    assert _isins(index, "eurp") == []
+    assert set(_isins(index, "euro")) == {"FR0010135103", "LU1681043599", "FR0010315770", "LU0048578792"}
+
+
+def test_one_typo_still_matches(index):
+    assert _isins(index, "carmignak patrimoin")[0] == "FR0010135103"
+    assert _isins(index, "amundy") == ["LU1681043599"]
+    assert _isins(index, "patrimone") == ["FR0010135103"]
+
+
+def test_isin_prefix_and_exact_isin(index):
+    assert set(_isins(index, "FR0010")) == {"FR0010135103", "FR0010148981", "FR0010315770"}
+    # A near-miss ISIN is another fund
+    assert _isins(index, "FR0010135104") == []
+    assert _isins(index, "fr0010148981")[0] == "FR0010148981"
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app.data.provider import AsyncTwelveDataProvider, MockDataProvider, TwelveDataProvider
+
+START, END = date(2026, 9, 1), date(2026, 9, 30)
+# Symbols ending with FLAKY fail inside multi-symbol requests, DOWN always fails
+FLAKY = "7"
+DOWN = "T000013"
+
+
+class StubTwelveData:
+    """Local stub of /symbol_search and (multi-symbol) /time_series, recording requests"""
+
+    def __init__(self):
+        self.time_series = []
+        self.lock = threading.Lock()
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        symbols = request.url.params["symbol"].split(",")
+        if request.url.path == "/symbol_search":
+            return httpx.Response(200, json={"data": [{"symbol": f"T{symbols[0][-6:]}"}], "status": "ok"})
+        with self.lock:
+            self.time_series.append(symbols)
+        if len(symbols) == 1:
+            return httpx.Response(200, json=self._series(symbols[0]))
+        return httpx.Response(200, json={
+            symbol: {"code": 500, "status": "error", "message": "Internal error"} if symbol.endswith(FLAKY) else self._series(symbol)
+            for symbol in symbols
+        })
+
+    def _series(self, symbol: str) -> dict:
+        if symbol == DOWN:
+            return {"code": 500, "status": "error", "message": "Internal error"}
+        days = [START + timedelta(days=i) for i in range((END - START).days + 1)]
+        values = [
+            {"datetime": day.isoformat(), "close": f"{100 + (day.toordinal() + int(symbol[-3:])) % 7:.2f}"}
+            for day in days
+            if day.weekday() < 5
+        ]
+        return {"meta": {"symbol": symbol}, "values": values, "status": "ok"}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0)
+        return self._respond(request)
+
+
+def _sequential(server: StubTwelveData, batch_size: int) -> TwelveDataProvider:
+    provider = TwelveDataProvider(api_key="test", base_url="https://stub.twelvedata")
+    provider._client = httpx.Client(transport=httpx.MockTransport(server.handle))
+    provider.TIME_SERIES_BATCH_SIZE = batch_size
+    return provider
+
+
+def _scheduled(server: StubTwelveData) -> AsyncTwelveDataProvider:
+    return AsyncTwelveDataProvider(
+        api_key="test",
+        base_url="https://stub.twelvedata",
+        credits_per_minute=10_000,
+        transport=httpx.MockTransport(server.handle_async)
+    )
+
+
+ISINS = [f"FR{i:010d}" for i in range(40)] + ["FR0000000003"]
+
+
+@pytest.mark.parametrize("batched", [
+    lambda server: _sequential(server, batch_size=16),
+    lambda server: _scheduled(server),
+], ids=["sequential", "scheduled"])
+def test_batched_histories_match_single_requests(batched):
+    single = _sequential(StubTwelveData(), batch_size=1).get_nav_histories(ISINS, START, END)
+    histories = batched(StubTwelveData()).get_nav_histories(ISINS, START, END)
+
+    assert list(histories) == list(single) == list(dict.fromkeys(ISINS))
+    assert histories == single
+
+
+def test_multi_symbol_response_is_split_per_symbol():
+    server = StubTwelveData()
+    histories = _sequential(server, batch_size=16).get_nav_histories(ISINS, START, END)
+
+    batches = [symbols for symbols in server.time_series if len(symbols) > 1]
+    assert [len(symbols) for symbols in batches] == [16, 16, 8]
+    # Each symbol gets its own series
+    assert histories["FR0000000001"] != histories["FR0000000002"]
+    # The duplicated trailing ISIN gets its own series, fetched once
+    duplicate = ISINS[-1]
+    assert histories[duplicate] == _sequential(StubTwelveData(), batch_size=1).get_nav_history(duplicate, START, END)
+    requested = [symbol for symbols in server.time_series for symbol in symbols]
+    assert requested.count(f"T{duplicate[-6:]}") == 1
+
+
+def test_failed_symbols_are_retried_alone_then_fall_back():
+    server = StubTwelveData()
+    histories = _sequential(server, batch_size=16).get_nav_histories(ISINS, START, END)
+
+    retried = sorted(symbols[0] for symbols in server.time_series if len(symbols) == 1)
+    assert retried == sorted(f"T{isin[-6:]}" for isin in ISINS[:40] if isin.endswith(FLAKY) or isin.endswith("13"))
+    # Retried alone successfully: a real series
+    assert histories["FR0000000007"] == _sequential(StubTwelveData(), batch_size=1).get_nav_history("FR0000000007", START, END)
+    # Failing alone too: mock fallback
+    assert histories["FR0000000013"] == MockDataProvider().get_nav_history("FR0000000013", START, END)